@@ -0,0 +1,68 @@
+"""
+LINC agent bundle - POLICYLINC, RADIOLINC and TTLINC in one process
+Mounts the three apps under path prefixes so they share one interpreter,
+one event loop and one pooled n8n connection
+"""
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
+
+from shared.config.settings import settings
+from shared.utils.logger import get_logger
+from shared.integrations.n8n_client import create_n8n_client
+from shared.utils.http import create_http_client
+from shared.utils.server import run_agent
+from agents.policylinc.main import app as policylinc_app
+from agents.radiolinc.main import app as radiolinc_app
+from agents.ttlinc.main import app as ttlinc_app
+
+logger = get_logger(__name__)
+
+# Mounted apps don't run their own lifespan; state is injected from here
+_MOUNTS = {
+    "/policylinc": policylinc_app,
+    "/radiolinc": radiolinc_app,
+    "/ttlinc": ttlinc_app,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build one HTTP pool and n8n client and share them with every mount"""
+    logger.info("Starting LINC agent bundle", mounts=list(_MOUNTS))
+    http = create_http_client(
+        timeout=settings.n8n.timeout,
+        connect_timeout=settings.n8n.connection_timeout
+    )
+    n8n = create_n8n_client(http)
+    for sub_app in _MOUNTS.values():
+        sub_app.state.http = http
+        sub_app.state.n8n = n8n
+    yield
+    await n8n.aclose()
+    await http.aclose()
+    logger.info("Shutting down LINC agent bundle")
+
+
+app = FastAPI(
+    title="LINC Agent Bundle",
+    description="POLICYLINC, RADIOLINC and TTLINC served from one process",
+    version=settings.app_version,
+    lifespan=lifespan,
+    docs_url=None,
+    default_response_class=ORJSONResponse,
+)
+
+for prefix, sub_app in _MOUNTS.items():
+    app.mount(prefix, sub_app)
+
+
+@app.get("/health")
+async def health_check():
+    """Liveness of the bundle process"""
+    return {"status": "healthy", "mounts": list(_MOUNTS)}
+
+
+if __name__ == "__main__":
+    run_agent("agents.bundle.main:app", settings.agents.bundle_port)
@@ -3,21 +3,37 @@ CLAIMLINC - Claims Rejection Analysis
 AI-powered claims rejection analysis and resolution
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Tuple
 
-from shared.config.settings import settings
+from pydantic import ValidationError
+
+from shared.config.settings import MODEL_GPT4, settings
 from shared.models.base import HealthCheckResponse
 from shared.models.claims import (
     ClaimAnalysisRequest,
     ClaimAnalysis,
-    ClaimResubmissionRequest
+    ClaimResubmissionRequest,
+    ClaimResubmissionResponse
 )
 from shared.utils.logger import get_logger
+from shared.utils.uuidpool import pooled_uuid4
+from shared.utils.cors import FrozenCORSMiddleware
+from shared.utils.errors import INTERNAL_ERROR, register_error_handlers
+from fastapi.middleware.gzip import GZipMiddleware
+from shared.utils.cache import TTLCache
+from shared.utils.server import run_agent
 
 logger = get_logger(__name__)
 
+analysis_cache: TTLCache[ClaimAnalysis] = TTLCache(
+    maxsize=settings.agents.claimlinc_analysis_cache_size,
+    ttl=settings.agents.claimlinc_analysis_cache_ttl,
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,25 +49,49 @@ app = FastAPI(
     version=settings.app_version,
     lifespan=lifespan,
     docs_url="/docs" if settings.api_docs_enabled else None,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
-    CORSMiddleware,
+    FrozenCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+register_error_handlers(app, logger)
+
+
+# Static payloads, built once at import
+_HEALTH_TEMPLATE = HealthCheckResponse(
+    status="healthy",
+    version=settings.app_version,
+    environment=settings.environment,
+)
+
+_MOCK_ROOT_CAUSES = ("Incorrect diagnosis code", "Missing authorization")
+_MOCK_RECOMMENDATIONS_EN = ("Update ICD-10 code", "Obtain prior authorization")
+_MOCK_RECOMMENDATIONS_AR = ("تحديث رمز ICD-10", "الحصول على تفويض مسبق")
+_MOCK_NEXT_ACTIONS = ("Review coding", "Contact payer")
+
+_ROOT_RESPONSE = ORJSONResponse({
+    "name": "CLAIMLINC",
+    "description": "Claims Rejection Analysis",
+    "version": settings.app_version,
+    "features": [
+        "AI-powered analysis",
+        "Automated corrections",
+        "NPHIES integration",
+        "Bilingual support"
+    ]
+})
 
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """Health check endpoint"""
-    return HealthCheckResponse(
-        status="healthy",
-        version=settings.app_version,
-        environment=settings.environment,
-    )
+    return _HEALTH_TEMPLATE.model_copy(update={"timestamp": datetime.now(timezone.utc)})
 
 
 @app.post("/api/v1/analyze", response_model=ClaimAnalysis)
@@ -63,32 +103,65 @@ async def analyze_claim(request: ClaimAnalysisRequest):
     try:
         logger.info(
             "Analyzing claim",
-            claim_id=str(request.claim.id),
+            claim_id=request.claim.id,
             payer=request.claim.payer_id
         )
         
-        # TODO: Implement actual AI analysis with OpenAI
-        # For now, return mock response
-        analysis = ClaimAnalysis(
-            claim_id=request.claim.id,
-            confidence_score=0.85,
-            automation_available=False,
-            manual_review_required=True,
-            root_causes=["Incorrect diagnosis code", "Missing authorization"],
-            recommendations_en=["Update ICD-10 code", "Obtain prior authorization"],
-            recommendations_ar=["تحديث رمز ICD-10", "الحصول على تفويض مسبق"],
-            next_actions=["Review coding", "Contact payer"],
-            ai_model_used=settings.openai.model_gpt4
-        )
+        # Identical rejections share an analysis; only the claim identity differs
+        cache_key = analysis_cache_key(request)
+        analysis = analysis_cache.get(cache_key)
+        if analysis is None:
+            analysis = await run_claim_analysis(request)
+            analysis_cache.set(cache_key, analysis)
         
-        return analysis
+        return analysis.model_copy(update={
+            "claim_id": request.claim.id,
+            "analysis_id": pooled_uuid4(),
+            "timestamp": datetime.utcnow(),
+        })
         
-    except Exception as e:
+    except (ValidationError, ValueError) as e:
         logger.error("Claim analysis failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
+
+
+def analysis_cache_key(request: ClaimAnalysisRequest) -> Tuple:
+    """Normalized key over the claim fields that drive the analysis"""
+    claim = request.claim
+    return (
+        claim.payer_id,
+        tuple(sorted(
+            item.rejection_reason.code
+            for item in claim.items
+            if item.rejection_reason is not None
+        )),
+        tuple(sorted(d.diagnosis_code for d in claim.diagnoses)),
+        tuple(sorted(item.service_code for item in claim.items)),
+        request.include_ai_recommendations,
+        request.include_coding_suggestions,
+        request.check_payer_policies,
+        request.response_language,
+    )
 
 
-@app.post("/api/v1/resubmit")
+async def run_claim_analysis(request: ClaimAnalysisRequest) -> ClaimAnalysis:
+    """Analyze a claim (cache miss path)"""
+    # TODO: Implement actual AI analysis with OpenAI
+    # For now, return mock response
+    return ClaimAnalysis(
+        claim_id=request.claim.id,
+        confidence_score=0.85,
+        automation_available=False,
+        manual_review_required=True,
+        root_causes=_MOCK_ROOT_CAUSES,
+        recommendations_en=_MOCK_RECOMMENDATIONS_EN,
+        recommendations_ar=_MOCK_RECOMMENDATIONS_AR,
+        next_actions=_MOCK_NEXT_ACTIONS,
+        ai_model_used=MODEL_GPT4
+    )
+
+
+@app.post("/api/v1/resubmit", response_model=ClaimResubmissionResponse)
 async def resubmit_claim(request: ClaimResubmissionRequest):
     """
     Resubmit corrected claim to NPHIES
@@ -96,44 +169,28 @@ async def resubmit_claim(request: ClaimResubmissionRequest):
     try:
         logger.info(
             "Resubmitting claim",
-            original_claim_id=str(request.original_claim_id),
+            original_claim_id=request.original_claim_id,
             is_appeal=request.is_appeal
         )
         
         # TODO: Implement NPHIES resubmission
-        return {
-            "status": "submitted",
-            "claim_id": str(request.corrected_claim.id),
-            "nphies_claim_id": "NPH-12345",
-            "message": "Claim resubmitted successfully"
-        }
+        return ClaimResubmissionResponse(
+            status="submitted",
+            claim_id=str(request.corrected_claim.id),
+            nphies_claim_id="NPH-12345",
+            message="Claim resubmitted successfully"
+        )
         
-    except Exception as e:
+    except (ValidationError, ValueError) as e:
         logger.error("Claim resubmission failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "name": "CLAIMLINC",
-        "description": "Claims Rejection Analysis",
-        "version": settings.app_version,
-        "features": [
-            "AI-powered analysis",
-            "Automated corrections",
-            "NPHIES integration",
-            "Bilingual support"
-        ]
-    }
+    return _ROOT_RESPONSE
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.agents.claimlinc_port,
-        reload=settings.debug
-    )
+    run_agent("main:app", settings.agents.claimlinc_port)
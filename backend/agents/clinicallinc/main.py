@@ -3,12 +3,18 @@ CLINICALLINC - Clinical Decision Support System
 AI-powered clinical decision support, drug interactions, and care pathways
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from typing import Dict, Any, List
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from uuid import UUID
 
-from shared.config.settings import settings
+import msgspec
+
+from pydantic import ValidationError
+
+from shared.config.settings import MODEL_GPT4, settings
 from shared.models.base import HealthCheckResponse
 from shared.models.clinical import (
     ClinicalDecisionRequest,
@@ -17,19 +23,83 @@ from shared.models.clinical import (
     DrugInteractionResponse,
     CarePathwayRequest,
     CarePathwayResponse,
-    DiagnosticSuggestion
+    DiagnosticSuggestion,
+    DiagnosticSuggestionRequest
 )
 from shared.utils.logger import get_logger
-from shared.integrations.n8n_client import N8NClient
+from shared.utils.cors import FrozenCORSMiddleware
+from shared.utils.errors import INTERNAL_ERROR, register_error_handlers
+from fastapi.middleware.gzip import GZipMiddleware
+from shared.integrations.n8n_client import N8NClient, N8NError, create_n8n_client, get_n8n_client
+from shared.utils.http import create_http_client
+from shared.utils.drug_interactions import DrugInteractionTable
+from shared.utils.server import run_agent
 
 logger = get_logger(__name__)
 
 
+# n8n payloads: fixed-shape structs encoded straight to bytes, skipping
+# the per-request model_dump()/dict building and the client's re-encode
+class ClinicalDecisionPayload(msgspec.Struct):
+    request_id: UUID
+    patient_id: UUID
+    chief_complaint: str
+    symptoms: List[str]
+    vital_signs: Dict[str, Any]
+    lab_results: Dict[str, Any]
+    medical_history: List[str]
+    medications: List[str]
+    model: str
+    use_ai: bool = True
+
+
+class DrugInteractionPayload(msgspec.Struct):
+    request_id: UUID
+    patient_id: Optional[UUID]
+    medications: List[str]
+    check_allergies: bool = True
+    check_contraindications: bool = True
+    severity_threshold: str = "moderate"
+
+
+class CarePathwayPayload(msgspec.Struct):
+    request_id: UUID
+    patient_id: UUID
+    condition: str
+    severity: str
+    patient_age: int
+    comorbidities: List[str]
+    include_medications: bool = True
+    include_monitoring: bool = True
+    bilingual: bool = True
+
+
+class DiagnosticSuggestionPayload(msgspec.Struct):
+    symptoms: List[str]
+    patient_age: int
+    gender: str
+    vital_signs: Dict[str, float]
+    model: str
+    use_ai: bool = True
+
+
+_encode_payload = msgspec.json.Encoder().encode
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle management"""
     logger.info("Starting CLINICALLINC")
+    app.state.http = create_http_client(
+        timeout=settings.n8n.timeout,
+        connect_timeout=settings.n8n.connection_timeout
+    )
+    app.state.n8n = create_n8n_client(app.state.http)
+    table_path = settings.agents.clinicallinc_interaction_table_path
+    app.state.drug_interactions = DrugInteractionTable.from_file(table_path) if table_path else None
     yield
+    await app.state.n8n.aclose()
+    await app.state.http.aclose()
     logger.info("Shutting down CLINICALLINC")
 
 
@@ -39,32 +109,54 @@ app = FastAPI(
     version=settings.app_version,
     lifespan=lifespan,
     docs_url="/docs" if settings.api_docs_enabled else None,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
-    CORSMiddleware,
+    FrozenCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+register_error_handlers(app, logger)
+
+
+# Static payloads, built once at import
+_HEALTH_TEMPLATE = HealthCheckResponse(
+    status="healthy",
+    version=settings.app_version,
+    environment=settings.environment,
+)
 
-# Initialize n8n client
-n8n_client = N8NClient(settings.n8n.server_url)
+_ROOT_RESPONSE = ORJSONResponse({
+    "name": "CLINICALLINC",
+    "description": "Clinical Decision Support System",
+    "version": settings.app_version,
+    "features": [
+        "AI-powered clinical decision support",
+        "Drug interaction checking",
+        "Care pathway generation",
+        "Diagnostic suggestions",
+        "Evidence-based guidelines",
+        "Bilingual support",
+        "n8n automation integration"
+    ]
+})
 
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """Health check endpoint"""
-    return HealthCheckResponse(
-        status="healthy",
-        version=settings.app_version,
-        environment=settings.environment,
-    )
+    return _HEALTH_TEMPLATE.model_copy(update={"timestamp": datetime.now(timezone.utc)})
 
 
 @app.post("/api/v1/clinical-decision", response_model=ClinicalDecisionResponse)
-async def clinical_decision_support(request: ClinicalDecisionRequest):
+async def clinical_decision_support(
+    request: ClinicalDecisionRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Provide clinical decision support based on patient data
     Uses AI to analyze symptoms, labs, and history
@@ -72,25 +164,24 @@ async def clinical_decision_support(request: ClinicalDecisionRequest):
     try:
         logger.info(
             "Processing clinical decision request",
-            request_id=str(request.request_id),
-            patient_id=str(request.patient_id)
+            request_id=request.request_id,
+            patient_id=request.patient_id
         )
         
         # Trigger n8n workflow for clinical decision support
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="clinical_decision_support",
-            data={
-                "request_id": str(request.request_id),
-                "patient_id": str(request.patient_id),
-                "chief_complaint": request.chief_complaint,
-                "symptoms": request.symptoms,
-                "vital_signs": request.vital_signs,
-                "lab_results": request.lab_results,
-                "medical_history": request.medical_history,
-                "medications": request.current_medications,
-                "use_ai": True,
-                "model": settings.openai.model_gpt4
-            }
+            data=_encode_payload(ClinicalDecisionPayload(
+                request_id=request.request_id,
+                patient_id=request.patient_id,
+                chief_complaint=request.chief_complaint,
+                symptoms=request.symptoms,
+                vital_signs=request.vital_signs,
+                lab_results=request.lab_results,
+                medical_history=request.medical_history,
+                medications=request.current_medications,
+                model=MODEL_GPT4
+            ))
         )
         
         # Parse clinical decision response
@@ -106,17 +197,26 @@ async def clinical_decision_support(request: ClinicalDecisionRequest):
             confidence_score=decision_data.get("confidence_score", 0.8),
             clinical_notes=decision_data.get("clinical_notes", ""),
             evidence_based_guidelines=decision_data.get("guidelines", []),
-            ai_model_used=settings.openai.model_gpt4,
+            ai_model_used=MODEL_GPT4,
             n8n_workflow_id=n8n_response.get("workflow_id")
         )
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Clinical decision support failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
+
+
+def get_interaction_table(request: Request) -> Optional[DrugInteractionTable]:
+    """Local interaction table, if one is configured"""
+    return request.app.state.drug_interactions
 
 
 @app.post("/api/v1/drug-interactions", response_model=DrugInteractionResponse)
-async def check_drug_interactions(request: DrugInteractionCheck):
+async def check_drug_interactions(
+    request: DrugInteractionCheck,
+    n8n_client: N8NClient = Depends(get_n8n_client),
+    interaction_table: Optional[DrugInteractionTable] = Depends(get_interaction_table)
+):
     """
     Check for drug interactions between medications
     Real-time safety analysis
@@ -124,21 +224,25 @@ async def check_drug_interactions(request: DrugInteractionCheck):
     try:
         logger.info(
             "Checking drug interactions",
-            request_id=str(request.request_id),
+            request_id=request.request_id,
             num_medications=len(request.medications)
         )
         
+        # Patient-less checks over known drugs are answered locally;
+        # allergy/contraindication checks need the patient record in n8n
+        if interaction_table is not None and request.patient_id is None:
+            interactions = interaction_table.find_interactions(request.medications)
+            if interactions is not None:
+                return build_local_interaction_response(request, interactions)
+        
         # Trigger n8n workflow for drug interaction check
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="drug_interaction_check",
-            data={
-                "request_id": str(request.request_id),
-                "patient_id": str(request.patient_id) if request.patient_id else None,
-                "medications": request.medications,
-                "check_allergies": True,
-                "check_contraindications": True,
-                "severity_threshold": "moderate"
-            }
+            data=_encode_payload(DrugInteractionPayload(
+                request_id=request.request_id,
+                patient_id=request.patient_id,
+                medications=request.medications
+            ))
         )
         
         # Parse interaction response
@@ -156,13 +260,36 @@ async def check_drug_interactions(request: DrugInteractionCheck):
             n8n_workflow_id=n8n_response.get("workflow_id")
         )
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Drug interaction check failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
+
+
+def build_local_interaction_response(
+    request: DrugInteractionCheck,
+    interactions: List[Dict[str, Any]]
+) -> DrugInteractionResponse:
+    """Build a response from locally resolved interactions"""
+    severity_summary: Dict[str, int] = {}
+    for interaction in interactions:
+        severity = interaction.get("severity", "unknown")
+        severity_summary[severity] = severity_summary.get(severity, 0) + 1
+    
+    return DrugInteractionResponse(
+        request_id=request.request_id,
+        has_interactions=bool(interactions),
+        interactions=interactions,
+        severity_summary=severity_summary,
+        warnings=[i["description"] for i in interactions if i.get("description")],
+        safe_to_prescribe=DrugInteractionTable.is_safe(interactions)
+    )
 
 
 @app.post("/api/v1/care-pathway", response_model=CarePathwayResponse)
-async def generate_care_pathway(request: CarePathwayRequest):
+async def generate_care_pathway(
+    request: CarePathwayRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Generate evidence-based care pathway for a condition
     Provides step-by-step clinical protocol
@@ -170,24 +297,21 @@ async def generate_care_pathway(request: CarePathwayRequest):
     try:
         logger.info(
             "Generating care pathway",
-            request_id=str(request.request_id),
+            request_id=request.request_id,
             condition=request.condition
         )
         
         # Trigger n8n workflow for care pathway generation
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="care_pathway_generation",
-            data={
-                "request_id": str(request.request_id),
-                "patient_id": str(request.patient_id),
-                "condition": request.condition,
-                "severity": request.severity,
-                "patient_age": request.patient_age,
-                "comorbidities": request.comorbidities,
-                "include_medications": True,
-                "include_monitoring": True,
-                "bilingual": True
-            }
+            data=_encode_payload(CarePathwayPayload(
+                request_id=request.request_id,
+                patient_id=request.patient_id,
+                condition=request.condition,
+                severity=request.severity,
+                patient_age=request.patient_age,
+                comorbidities=request.comorbidities
+            ))
         )
         
         # Parse care pathway response
@@ -209,67 +333,45 @@ async def generate_care_pathway(request: CarePathwayRequest):
             n8n_workflow_id=n8n_response.get("workflow_id")
         )
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Care pathway generation failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
-@app.post("/api/v1/diagnostic-suggestions")
+@app.post("/api/v1/diagnostic-suggestions", response_model=List[DiagnosticSuggestion])
 async def get_diagnostic_suggestions(
-    symptoms: List[str],
-    patient_age: int,
-    gender: str,
-    vital_signs: Dict[str, Any] = None
-) -> List[DiagnosticSuggestion]:
+    request: DiagnosticSuggestionRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Get AI-powered diagnostic suggestions based on symptoms
     """
     try:
         # Trigger n8n workflow for diagnostic suggestions
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="diagnostic_suggestions",
-            data={
-                "symptoms": symptoms,
-                "patient_age": patient_age,
-                "gender": gender,
-                "vital_signs": vital_signs or {},
-                "use_ai": True,
-                "model": settings.openai.model_gpt4
-            }
+            data=_encode_payload(DiagnosticSuggestionPayload(
+                symptoms=request.symptoms,
+                patient_age=request.patient_age,
+                gender=request.gender,
+                vital_signs=request.vital_signs or {},
+                model=MODEL_GPT4
+            ))
         )
         
         suggestions = n8n_response.get("data", {}).get("suggestions", [])
         return [DiagnosticSuggestion(**s) for s in suggestions]
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Diagnostic suggestions failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "name": "CLINICALLINC",
-        "description": "Clinical Decision Support System",
-        "version": settings.app_version,
-        "features": [
-            "AI-powered clinical decision support",
-            "Drug interaction checking",
-            "Care pathway generation",
-            "Diagnostic suggestions",
-            "Evidence-based guidelines",
-            "Bilingual support",
-            "n8n automation integration"
-        ]
-    }
+    return _ROOT_RESPONSE
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.agents.clinicallinc_port,
-        reload=settings.debug
-    )
+    run_agent("main:app", settings.agents.clinicallinc_port)
@@ -3,10 +3,13 @@ HEALTHCARELINC - Healthcare Workflow Automation
 FHIR R4 validation and NPHIES compliance
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, Awaitable, Callable
+
+from pydantic import ValidationError
 
 from shared.config.settings import settings
 from shared.models.base import HealthCheckResponse
@@ -16,6 +19,10 @@ from shared.models.healthcare import (
     EncounterType
 )
 from shared.utils.logger import get_logger
+from shared.utils.cors import FrozenCORSMiddleware
+from shared.utils.errors import INTERNAL_ERROR, register_error_handlers
+from shared.utils.server import run_agent
+from fastapi.middleware.gzip import GZipMiddleware
 
 logger = get_logger(__name__)
 
@@ -34,25 +41,39 @@ app = FastAPI(
     version=settings.app_version,
     lifespan=lifespan,
     docs_url="/docs" if settings.api_docs_enabled else None,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
-    CORSMiddleware,
+    FrozenCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+register_error_handlers(app, logger)
+
+
+# Static payloads, built once at import
+_HEALTH_TEMPLATE = HealthCheckResponse(
+    status="healthy",
+    version=settings.app_version,
+    environment=settings.environment,
+)
+
+_ROOT_RESPONSE = ORJSONResponse({
+    "name": "HEALTHCARELINC",
+    "description": "Healthcare Workflow Automation",
+    "version": settings.app_version,
+    "workflows": ["emergency", "admission", "discharge", "referral"]
+})
 
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """Health check endpoint"""
-    return HealthCheckResponse(
-        status="healthy",
-        version=settings.app_version,
-        environment=settings.environment,
-    )
+    return _HEALTH_TEMPLATE.model_copy(update={"timestamp": datetime.now(timezone.utc)})
 
 
 @app.post("/api/v1/process", response_model=HealthcareWorkflowResponse)
@@ -62,29 +83,24 @@ async def process_workflow(request: HealthcareWorkflowRequest):
     Supports: Emergency, Admission, Discharge, Referral
     """
     try:
+        workflow_type = EncounterType(request.workflow_type)
         logger.info(
             "Processing healthcare workflow",
-            request_id=str(request.request_id),
-            workflow_type=request.workflow_type.value
+            request_id=request.request_id,
+            workflow_type=workflow_type.value
         )
         
         # Route to appropriate workflow handler
-        if request.workflow_type == EncounterType.EMERGENCY:
-            result = await process_emergency(request)
-        elif request.workflow_type == EncounterType.ADMISSION:
-            result = await process_admission(request)
-        elif request.workflow_type == EncounterType.DISCHARGE:
-            result = await process_discharge(request)
-        elif request.workflow_type == EncounterType.REFERRAL:
-            result = await process_referral(request)
-        else:
-            raise ValueError(f"Unsupported workflow type: {request.workflow_type}")
+        handler = _WORKFLOW_HANDLERS.get(workflow_type)
+        if handler is None:
+            raise ValueError(f"Unsupported workflow type: {workflow_type.value}")
+        result = await handler(request)
         
         return result
         
-    except Exception as e:
+    except (ValidationError, ValueError) as e:
         logger.error("Workflow processing failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 async def process_emergency(request: HealthcareWorkflowRequest) -> HealthcareWorkflowResponse:
@@ -143,22 +159,19 @@ async def process_referral(request: HealthcareWorkflowRequest) -> HealthcareWork
     )
 
 
+_WORKFLOW_HANDLERS: Dict[EncounterType, Callable[[HealthcareWorkflowRequest], Awaitable[HealthcareWorkflowResponse]]] = {
+    EncounterType.EMERGENCY: process_emergency,
+    EncounterType.ADMISSION: process_admission,
+    EncounterType.DISCHARGE: process_discharge,
+    EncounterType.REFERRAL: process_referral,
+}
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "name": "HEALTHCARELINC",
-        "description": "Healthcare Workflow Automation",
-        "version": settings.app_version,
-        "workflows": ["emergency", "admission", "discharge", "referral"]
-    }
+    return _ROOT_RESPONSE
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.agents.healthcarelinc_port,
-        reload=settings.debug
-    )
+    run_agent("main:app", settings.agents.healthcarelinc_port)
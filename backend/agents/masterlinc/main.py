@@ -4,21 +4,35 @@ Routes requests to specialized agents based on context
 """
 
 from fastapi import FastAPI, Request, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
-import time
-from typing import Dict, Any
-from uuid import uuid4
+from datetime import datetime, timezone
+import asyncio
+from time import perf_counter_ns
+from typing import Dict, Any, List, Optional, Set, Union
+from uuid import UUID, uuid4
+
+import httpx
+import msgspec
+import structlog
+from pydantic import ValidationError
 
 from shared.config.settings import settings
 from shared.models.base import (
     OrchestrationContext, 
+    OrchestrateResponse,
+    MultiAgentOrchestrateResponse,
     HealthCheckResponse, 
     ErrorResponse,
     AgentType
 )
 from shared.utils.logger import get_logger
+from shared.utils.cors import FrozenCORSMiddleware
+from shared.utils.errors import INTERNAL_ERROR, register_error_handlers
+from fastapi.middleware.gzip import GZipMiddleware
+from shared.utils.batching import DynamicBatcher
+from shared.utils.http import create_http_client
+from shared.utils.server import run_agent
 
 logger = get_logger(__name__)
 
@@ -27,7 +41,10 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     """Lifecycle management"""
     logger.info("Starting MASTERLINC orchestration hub")
+    app.state.http = create_http_client(timeout=settings.agents.masterlinc_timeout)
     yield
+    await agent_batcher.aclose()
+    await app.state.http.aclose()
     logger.info("Shutting down MASTERLINC")
 
 
@@ -37,119 +54,296 @@ app = FastAPI(
     version=settings.app_version,
     lifespan=lifespan,
     docs_url="/docs" if settings.api_docs_enabled else None,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
 app.add_middleware(
-    CORSMiddleware,
+    FrozenCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+register_error_handlers(app, logger)
+
+
+def _resolve_request_id(header_value: Optional[str]) -> str:
+    """Reuse an upstream request ID if it is a valid UUID, else mint one"""
+    if header_value:
+        try:
+            UUID(header_value)
+            return header_value
+        except ValueError:
+            pass
+    return uuid4().hex
 
 
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    """Add processing time header"""
-    start_time = time.time()
+    """
+    Add processing time header (milliseconds, monotonic clock)
+    Binds the request ID to request.state and the log context, and echoes it
+    back as X-Request-ID
+    """
+    start_ns = perf_counter_ns()
+    request_id = _resolve_request_id(request.headers.get("x-request-id"))
+    request.state.request_id = request_id
+    structlog.contextvars.clear_contextvars()
+    structlog.contextvars.bind_contextvars(request_id=request_id)
     response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-Process-Time"] = f"{(perf_counter_ns() - start_ns) / 1e6:.3f}"
+    response.headers["X-Request-ID"] = request_id
     return response
 
 
+# Static payloads, built once at import
+_HEALTH_TEMPLATE = HealthCheckResponse(
+    status="healthy",
+    version=settings.app_version,
+    environment=settings.environment,
+    database=True,  # TODO: Implement actual checks
+    redis=True,
+    external_apis={
+        "openai": True,
+        "nphies": True,
+    }
+)
+
+_ROOT_RESPONSE = ORJSONResponse({
+    "name": "MASTERLINC",
+    "description": "BrainSAIT Central Orchestration Hub",
+    "version": settings.app_version,
+    "agents_managed": [agent.value for agent in AgentType],
+    "docs": "/docs" if settings.api_docs_enabled else None
+})
+
+
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """Health check endpoint"""
-    return HealthCheckResponse(
-        status="healthy",
-        version=settings.app_version,
-        environment=settings.environment,
-        database=True,  # TODO: Implement actual checks
-        redis=True,
-        external_apis={
-            "openai": True,
-            "nphies": True,
-        }
-    )
+    return _HEALTH_TEMPLATE.model_copy(update={"timestamp": datetime.now(timezone.utc)})
+
+
+class OrchestrationRequest(msgspec.Struct, frozen=True):
+    """Orchestrate request body, decoded with msgspec on the hot path"""
+    agent_type: str = AgentType.HEALTHCARELINC.value
+    agent_types: List[str] = []
+    source: str = "api"
+    priority: str = "normal"
 
 
-@app.post("/api/v1/orchestrate")
-async def orchestrate_request(request: Dict[str, Any]):
+_ORCHESTRATION_DECODER = msgspec.json.Decoder(OrchestrationRequest)
+
+
+@app.post(
+    "/api/v1/orchestrate",
+    response_model=Union[OrchestrateResponse, MultiAgentOrchestrateResponse]
+)
+async def orchestrate_request(raw: Request):
     """
     Main orchestration endpoint
     Routes requests to appropriate agents
     """
-    request_id = str(uuid4())
+    request_id = raw.state.request_id
     
     try:
+        request = _ORCHESTRATION_DECODER.decode(await raw.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    try:
+        if request.agent_types:
+            return await orchestrate_multi_agent(request_id, request)
+        
         # Determine agent type
-        agent_type = AgentType(request.get("agent_type", "HEALTHCARELINC"))
+        agent_type = AgentType(request.agent_type)
         
         # Create orchestration context
         context = OrchestrationContext(
             request_id=request_id,
             agent_type=agent_type,
-            source=request.get("source", "api"),
-            priority=request.get("priority", "normal"),
+            source=request.source,
+            priority=request.priority,
         )
         
-        logger.info(
-            "Orchestrating request",
-            request_id=request_id,
-            agent_type=agent_type.value
-        )
+        logger.info("Orchestrating request", agent_type=agent_type.value)
         
         # Route to appropriate agent
-        result = await route_to_agent(context, request)
+        result = await route_to_agent(context)
         
-        return {
-            "request_id": request_id,
-            "status": "success",
-            "agent": agent_type.value,
-            "result": result
-        }
+        return OrchestrateResponse(
+            request_id=request_id,
+            status="success",
+            agent=agent_type.value,
+            result=result
+        )
         
-    except Exception as e:
-        logger.error("Orchestration failed", error=str(e), request_id=request_id)
-        raise HTTPException(status_code=500, detail=str(e))
+    except (httpx.HTTPError, ValidationError, ValueError) as e:
+        logger.error("Orchestration failed", error=str(e))
+        return INTERNAL_ERROR
 
 
-async def route_to_agent(context: OrchestrationContext, request: Dict[str, Any]) -> Dict[str, Any]:
-    """Route request to appropriate agent"""
+async def orchestrate_multi_agent(request_id: str, request: OrchestrationRequest) -> MultiAgentOrchestrateResponse:
+    """
+    Fan a request out to several agents in parallel
+    Latency is bounded by the slowest agent rather than the sum of hops
+    """
+    agent_types = [AgentType(a) for a in request.agent_types]
     
-    agent_urls = {
-        AgentType.HEALTHCARELINC: settings.get_agent_base_url("healthcarelinc"),
-        AgentType.CLAIMLINC: settings.get_agent_base_url("claimlinc"),
-        AgentType.TTLINC: settings.get_agent_base_url("ttlinc"),
-    }
+    contexts = [
+        OrchestrationContext(
+            request_id=request_id,
+            agent_type=agent_type,
+            agents_chain=agent_types,
+            source=request.source,
+            priority=request.priority,
+        )
+        for agent_type in agent_types
+    ]
+    
+    logger.info(
+        "Orchestrating multi-agent request",
+        agent_types=[a.value for a in agent_types]
+    )
+    
+    results = await asyncio.gather(
+        *(route_to_agent(c) for c in contexts),
+        return_exceptions=True
+    )
+    
+    agent_results = {}
+    failed = 0
+    for agent_type, result in zip(agent_types, results):
+        if isinstance(result, Exception):
+            failed += 1
+            logger.error(
+                "Agent call failed",
+                agent_type=agent_type.value,
+                error=str(result)
+            )
+            agent_results[agent_type.value] = {"error": str(result)}
+        else:
+            agent_results[agent_type.value] = result
+    
+    return MultiAgentOrchestrateResponse(
+        request_id=request_id,
+        status="success" if not failed else "partial",
+        agents=[a.value for a in agent_types],
+        results=agent_results
+    )
+
+
+async def route_to_agent(context: OrchestrationContext) -> Dict[str, Any]:
+    """
+    Route request to appropriate agent
+    Concurrent requests for the same agent are coalesced into one batch
+    """
+    agent_type = AgentType(context.agent_type)
+    payload = context.model_dump(mode="json")
+    async with agent_call_semaphore:
+        if settings.agents.masterlinc_forward_requests and agent_type in _batch_agents:
+            return await agent_batcher.submit(agent_type, payload)
+        return await _route_single(agent_type, payload)
+
+
+async def _batched_route(agent_type: AgentType, payloads: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Forward a batch of orchestration payloads to a single agent
+
+    The agent's POST /batch takes {"batch": [...]}, each payload carrying
+    its own request_id, and answers {"results": [...]} with one result per
+    payload, in order. If /batch answers 404 the agent is taken out of
+    batching and its payloads are routed one by one.
+    """
+    if len(payloads) == 1 or agent_type not in _batch_agents:
+        return await _route_each(agent_type, payloads)
+    
+    response = await app.state.http.post(
+        f"{_agent_url(agent_type)}/batch",
+        json={"batch": payloads}
+    )
+    if response.status_code == 404:
+        logger.warning("Agent batch endpoint missing, routing singly", agent_type=agent_type.value)
+        _batch_agents.discard(agent_type)
+        return await _route_each(agent_type, payloads)
+    response.raise_for_status()
+    
+    results = response.json().get("results")
+    if not isinstance(results, list) or len(results) != len(payloads):
+        # Results cannot be matched to callers, so the whole batch fails
+        raise ValueError(
+            f"{agent_type.value} /batch answered {len(payloads)} payloads with "
+            f"{len(results) if isinstance(results, list) else 'no'} results"
+        )
+    return results
+
+
+async def _route_each(agent_type: AgentType, payloads: List[Dict[str, Any]]) -> List[Any]:
+    """Route payloads concurrently; failures are returned per payload"""
+    return await asyncio.gather(
+        *(_route_single(agent_type, payload) for payload in payloads),
+        return_exceptions=True
+    )
+
+
+async def _route_single(agent_type: AgentType, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Forward a single orchestration payload to an agent"""
+    if settings.agents.masterlinc_forward_requests:
+        response = await app.state.http.post(
+            _agent_url(agent_type),
+            json=payload,
+            headers={"X-Request-ID": payload["request_id"]}
+        )
+        response.raise_for_status()
+        return response.json()
     
     # For now, return a mock response
-    # TODO: Implement actual HTTP calls to agents
     return {
-        "message": f"Routed to {context.agent_type.value}",
-        "context": context.dict()
+        "message": f"Routed to {agent_type.value}",
+        "context": payload
     }
 
 
+# Routing table built once at import; agents without a configured port are unroutable
+_AGENT_URLS: Dict[AgentType, str] = {
+    agent: settings.get_agent_base_url(agent.value)
+    for agent in AgentType
+    if agent is not AgentType.MASTERLINC
+    and hasattr(settings.agents, f"{agent.value.lower()}_port")
+}
+
+
+# Agents configured to serve /batch; one that answers 404 is removed
+_batch_agents: Set[AgentType] = {
+    AgentType(agent.upper()) for agent in settings.agents.masterlinc_batch_agents
+}
+
+
+def _agent_url(agent_type: AgentType) -> str:
+    """Resolve the base URL for an agent"""
+    url = _AGENT_URLS.get(agent_type)
+    if url is None:
+        raise ValueError(f"No route configured for agent: {agent_type.value}")
+    return url
+
+
+# Caps in-flight agent calls so fan-out cannot stampede downstream agents
+agent_call_semaphore = asyncio.Semaphore(settings.agents.masterlinc_max_concurrent_calls)
+
+agent_batcher = DynamicBatcher(
+    _batched_route,
+    max_batch_size=settings.agents.masterlinc_batch_max_size,
+    max_wait_ms=settings.agents.masterlinc_batch_max_wait_ms,
+)
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "name": "MASTERLINC",
-        "description": "BrainSAIT Central Orchestration Hub",
-        "version": settings.app_version,
-        "agents_managed": [agent.value for agent in AgentType],
-        "docs": "/docs" if settings.api_docs_enabled else None
-    }
+    return _ROOT_RESPONSE
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.agents.masterlinc_port,
-        reload=settings.debug
-    )
+    run_agent("main:app", settings.agents.masterlinc_port)
@@ -3,14 +3,18 @@ POLICYLINC - Payer Policy Interpretation
 AI-powered interpretation of insurance payer policies and coverage rules
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from uuid import UUID, uuid4
+from uuid import UUID
+import hashlib
 
-from shared.config.settings import settings
+import orjson
+from pydantic import ValidationError
+
+from shared.config.settings import MODEL_GPT4, settings
 from shared.models.base import HealthCheckResponse
 from shared.models.policy import (
     PolicyInterpretationRequest,
@@ -21,7 +25,13 @@ from shared.models.policy import (
     CoverageRule
 )
 from shared.utils.logger import get_logger
-from shared.integrations.n8n_client import N8NClient
+from shared.utils.uuidpool import pooled_uuid4
+from shared.utils.cors import FrozenCORSMiddleware
+from shared.utils.errors import INTERNAL_ERROR, register_error_handlers
+from fastapi.middleware.gzip import GZipMiddleware
+from shared.integrations.n8n_client import N8NClient, N8NError, create_n8n_client, get_n8n_client
+from shared.utils.http import create_http_client, etag_matches
+from shared.utils.server import run_agent
 
 logger = get_logger(__name__)
 
@@ -30,7 +40,14 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     """Lifecycle management"""
     logger.info("Starting POLICYLINC")
+    app.state.http = create_http_client(
+        timeout=settings.n8n.timeout,
+        connect_timeout=settings.n8n.connection_timeout
+    )
+    app.state.n8n = create_n8n_client(app.state.http)
     yield
+    await app.state.n8n.aclose()
+    await app.state.http.aclose()
     logger.info("Shutting down POLICYLINC")
 
 
@@ -40,19 +57,18 @@ app = FastAPI(
     version=settings.app_version,
     lifespan=lifespan,
     docs_url="/docs" if settings.api_docs_enabled else None,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
-    CORSMiddleware,
+    FrozenCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
-
-# Initialize n8n client
-n8n_client = N8NClient(settings.n8n.server_url)
-
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+register_error_handlers(app, logger)
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
@@ -64,8 +80,29 @@ async def health_check():
     )
 
 
-@app.post("/api/v1/interpret-policy", response_model=PolicyInterpretationResponse)
-async def interpret_policy(request: PolicyInterpretationRequest):
+# (response field, n8n data key, default) for policy interpretations;
+# lists are never mutated, so sharing the defaults is safe
+_INTERPRETATION_FIELDS = (
+    ("interpretation_summary", "summary", ""),
+    ("coverage_rules", "coverage_rules", []),
+    ("exclusions", "exclusions", []),
+    ("limitations", "limitations", []),
+    ("prior_authorization_required", "prior_authorization_required", []),
+    ("confidence_score", "confidence_score", 0.85),
+    ("interpretation_en", "interpretation_en", ""),
+    ("interpretation_ar", "interpretation_ar", ""),
+)
+
+
+@app.post(
+    "/api/v1/interpret-policy",
+    response_class=ORJSONResponse,
+    responses={200: {"model": PolicyInterpretationResponse}},
+)
+async def interpret_policy(
+    request: PolicyInterpretationRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Interpret insurance payer policy using AI
     Analyzes policy documents and extracts coverage rules
@@ -73,13 +110,13 @@ async def interpret_policy(request: PolicyInterpretationRequest):
     try:
         logger.info(
             "Interpreting policy",
-            request_id=str(request.request_id),
+            request_id=request.request_id,
             payer_id=request.payer_id,
             policy_type=request.policy_type
         )
         
         # Trigger n8n workflow for policy interpretation
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="policy_interpretation",
             data={
                 "request_id": str(request.request_id),
@@ -87,35 +124,37 @@ async def interpret_policy(request: PolicyInterpretationRequest):
                 "policy_type": request.policy_type,
                 "policy_text": request.policy_text,
                 "use_ai": True,
-                "model": settings.openai.model_gpt4
+                "model": MODEL_GPT4
             }
         )
         
-        # Parse AI response
-        interpretation = await parse_policy_interpretation(n8n_response)
-        
-        return PolicyInterpretationResponse(
+        # Shaped like PolicyInterpretationResponse; serialized directly, not re-validated
+        data = n8n_response.get("data") or {}
+        response = {
+            field: data.get(source, default)
+            for field, source, default in _INTERPRETATION_FIELDS
+        }
+        response.update(
             request_id=request.request_id,
-            policy_id=str(uuid4()),
+            policy_id=str(pooled_uuid4()),
             payer_id=request.payer_id,
-            interpretation_summary=interpretation.get("summary", ""),
-            coverage_rules=interpretation.get("coverage_rules", []),
-            exclusions=interpretation.get("exclusions", []),
-            limitations=interpretation.get("limitations", []),
-            prior_authorization_required=interpretation.get("prior_auth", []),
-            confidence_score=interpretation.get("confidence", 0.85),
-            ai_model_used=settings.openai.model_gpt4,
-            interpretation_en=interpretation.get("interpretation_en", ""),
-            interpretation_ar=interpretation.get("interpretation_ar", "")
+            ai_model_used=MODEL_GPT4,
+            n8n_workflow_id=None,
+            created_at=datetime.utcnow(),
+            updated_at=None,
         )
+        return ORJSONResponse(response)
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Policy interpretation failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.post("/api/v1/check-coverage", response_model=CoverageCheckResponse)
-async def check_coverage(request: CoverageCheckRequest):
+async def check_coverage(
+    request: CoverageCheckRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Check if a procedure/service is covered under a specific policy
     Real-time coverage verification
@@ -123,13 +162,13 @@ async def check_coverage(request: CoverageCheckRequest):
     try:
         logger.info(
             "Checking coverage",
-            request_id=str(request.request_id),
+            request_id=request.request_id,
             payer_id=request.payer_id,
             procedure_code=request.procedure_code
         )
         
         # Trigger n8n workflow for coverage check
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="coverage_check",
             data={
                 "request_id": str(request.request_id),
@@ -156,13 +195,16 @@ async def check_coverage(request: CoverageCheckRequest):
             n8n_workflow_id=n8n_response.get("workflow_id")
         )
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Coverage check failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.post("/api/v1/analyze-policy-document")
-async def analyze_policy_document(document: PolicyDocument):
+async def analyze_policy_document(
+    document: PolicyDocument,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Analyze a complete policy document
     Extracts all coverage rules, exclusions, and requirements
@@ -170,12 +212,12 @@ async def analyze_policy_document(document: PolicyDocument):
     try:
         logger.info(
             "Analyzing policy document",
-            document_id=str(document.document_id),
+            document_id=document.document_id,
             payer_id=document.payer_id
         )
         
         # Trigger n8n workflow for document analysis
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="policy_document_analysis",
             data={
                 "document_id": str(document.document_id),
@@ -196,44 +238,39 @@ async def analyze_policy_document(document: PolicyDocument):
             "estimated_time_seconds": 120
         }
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Policy document analysis failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.get("/api/v1/payer/{payer_id}/policies")
-async def get_payer_policies(payer_id: str):
+async def get_payer_policies(
+    payer_id: str,
+    request: Request,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Get all policies for a specific payer
+    Revalidating clients get a 304 when the policy set is unchanged
     """
     try:
         # Trigger n8n workflow to fetch payer policies
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="fetch_payer_policies",
             data={"payer_id": payer_id}
         )
         
-        return n8n_response.get("data", {})
+        # No local version to check, so the ETag is a hash of the body; a
+        # match still saves the transfer and the client's re-parse
+        body = orjson.dumps(n8n_response.get("data", {}))
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Failed to fetch payer policies", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-async def parse_policy_interpretation(n8n_response: Dict[str, Any]) -> Dict[str, Any]:
-    """Parse n8n response for policy interpretation"""
-    data = n8n_response.get("data", {})
-    
-    return {
-        "summary": data.get("summary", ""),
-        "coverage_rules": data.get("coverage_rules", []),
-        "exclusions": data.get("exclusions", []),
-        "limitations": data.get("limitations", []),
-        "prior_auth": data.get("prior_authorization_required", []),
-        "confidence": data.get("confidence_score", 0.85),
-        "interpretation_en": data.get("interpretation_en", ""),
-        "interpretation_ar": data.get("interpretation_ar", "")
-    }
+        return INTERNAL_ERROR
 
 
 @app.get("/")
@@ -255,10 +292,4 @@ async def root():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.agents.policylinc_port,
-        reload=settings.debug
-    )
+    run_agent("main:app", settings.agents.policylinc_port)
@@ -3,13 +3,16 @@ RADIOLINC - Radiology Report Analysis
 AI-powered analysis of radiology reports and DICOM metadata
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Depends, UploadFile, File
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from datetime import datetime
+import os
 from typing import Dict, Any, List, Optional
-from uuid import uuid4
 
-from shared.config.settings import settings
+from pydantic import ValidationError
+
+from shared.config.settings import MODEL_GPT4, settings
 from shared.models.base import HealthCheckResponse
 from shared.models.radiology import (
     RadiologyReportRequest,
@@ -20,7 +23,13 @@ from shared.models.radiology import (
     ImagingRecommendation
 )
 from shared.utils.logger import get_logger
-from shared.integrations.n8n_client import N8NClient
+from shared.utils.uuidpool import pooled_uuid4
+from shared.utils.cors import FrozenCORSMiddleware
+from shared.utils.errors import INTERNAL_ERROR, register_error_handlers
+from fastapi.middleware.gzip import GZipMiddleware
+from shared.integrations.n8n_client import N8NClient, N8NError, create_n8n_client, get_n8n_client
+from shared.utils.http import create_http_client
+from shared.utils.server import run_agent
 
 logger = get_logger(__name__)
 
@@ -29,7 +38,14 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     """Lifecycle management"""
     logger.info("Starting RADIOLINC")
+    app.state.http = create_http_client(
+        timeout=settings.n8n.timeout,
+        connect_timeout=settings.n8n.connection_timeout
+    )
+    app.state.n8n = create_n8n_client(app.state.http)
     yield
+    await app.state.n8n.aclose()
+    await app.state.http.aclose()
     logger.info("Shutting down RADIOLINC")
 
 
@@ -39,19 +55,18 @@ app = FastAPI(
     version=settings.app_version,
     lifespan=lifespan,
     docs_url="/docs" if settings.api_docs_enabled else None,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
-    CORSMiddleware,
+    FrozenCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
-
-# Initialize n8n client
-n8n_client = N8NClient(settings.n8n.server_url)
-
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+register_error_handlers(app, logger)
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
@@ -63,8 +78,15 @@ async def health_check():
     )
 
 
-@app.post("/api/v1/analyze-report", response_model=RadiologyReportResponse)
-async def analyze_radiology_report(request: RadiologyReportRequest):
+@app.post(
+    "/api/v1/analyze-report",
+    response_class=ORJSONResponse,
+    responses={200: {"model": RadiologyReportResponse}},
+)
+async def analyze_radiology_report(
+    request: RadiologyReportRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Analyze radiology report using AI
     Extracts findings, impressions, and recommendations
@@ -72,12 +94,12 @@ async def analyze_radiology_report(request: RadiologyReportRequest):
     try:
         logger.info(
             "Analyzing radiology report",
-            request_id=str(request.request_id),
+            request_id=request.request_id,
             modality=request.modality
         )
         
         # Trigger n8n workflow for radiology report analysis
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="radiology_report_analysis",
             data={
                 "request_id": str(request.request_id),
@@ -90,39 +112,45 @@ async def analyze_radiology_report(request: RadiologyReportRequest):
                 "detect_critical_findings": True,
                 "bilingual_output": True,
                 "use_ai": True,
-                "model": settings.openai.model_gpt4
+                "model": MODEL_GPT4
             }
         )
         
         # Parse analysis response
         analysis_data = n8n_response.get("data", {})
         
-        return RadiologyReportResponse(
-            request_id=request.request_id,
-            report_id=str(uuid4()),
-            extracted_findings=analysis_data.get("findings", []),
-            impression=analysis_data.get("impression", ""),
-            critical_findings=analysis_data.get("critical_findings", []),
-            structured_report=analysis_data.get("structured_report", {}),
-            recommendations=analysis_data.get("recommendations", []),
-            follow_up_required=analysis_data.get("follow_up_required", False),
-            urgency_level=analysis_data.get("urgency_level", "routine"),
-            radlex_codes=analysis_data.get("radlex_codes", []),
-            icd10_codes=analysis_data.get("icd10_codes", []),
-            confidence_score=analysis_data.get("confidence_score", 0.85),
-            summary_en=analysis_data.get("summary_en", ""),
-            summary_ar=analysis_data.get("summary_ar", ""),
-            ai_model_used=settings.openai.model_gpt4,
-            n8n_workflow_id=n8n_response.get("workflow_id")
-        )
+        # Shaped like RadiologyReportResponse; serialized directly, not re-validated
+        return ORJSONResponse({
+            "request_id": request.request_id,
+            "report_id": str(pooled_uuid4()),
+            "extracted_findings": analysis_data.get("findings", []),
+            "impression": analysis_data.get("impression", ""),
+            "critical_findings": analysis_data.get("critical_findings", []),
+            "structured_report": analysis_data.get("structured_report", {}),
+            "recommendations": analysis_data.get("recommendations", []),
+            "follow_up_required": analysis_data.get("follow_up_required", False),
+            "urgency_level": analysis_data.get("urgency_level", "routine"),
+            "radlex_codes": analysis_data.get("radlex_codes", []),
+            "icd10_codes": analysis_data.get("icd10_codes", []),
+            "confidence_score": analysis_data.get("confidence_score", 0.85),
+            "summary_en": analysis_data.get("summary_en", ""),
+            "summary_ar": analysis_data.get("summary_ar", ""),
+            "ai_model_used": MODEL_GPT4,
+            "n8n_workflow_id": n8n_response.get("workflow_id"),
+            "created_at": datetime.utcnow(),
+            "updated_at": None,
+        })
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Radiology report analysis failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.post("/api/v1/analyze-dicom", response_model=DicomAnalysisResponse)
-async def analyze_dicom(request: DicomAnalysisRequest):
+async def analyze_dicom(
+    request: DicomAnalysisRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Analyze DICOM metadata and images
     Extracts technical parameters and validates quality
@@ -130,12 +158,12 @@ async def analyze_dicom(request: DicomAnalysisRequest):
     try:
         logger.info(
             "Analyzing DICOM",
-            request_id=str(request.request_id),
+            request_id=request.request_id,
             study_id=request.study_instance_uid
         )
         
         # Trigger n8n workflow for DICOM analysis
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="dicom_analysis",
             data={
                 "request_id": str(request.request_id),
@@ -166,19 +194,26 @@ async def analyze_dicom(request: DicomAnalysisRequest):
             n8n_workflow_id=n8n_response.get("workflow_id")
         )
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("DICOM analysis failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.post("/api/v1/upload-dicom")
-async def upload_dicom_file(file: UploadFile = File(...)):
+async def upload_dicom_file(
+    file: UploadFile = File(...),
+    n8n_client: N8NClient = Depends(get_n8n_client)
+):
     """
     Upload DICOM file for analysis
     """
     try:
-        # Read file content
-        content = await file.read()
+        # Hand the spooled upload to httpx as a file object so the multipart
+        # body is streamed in chunks rather than read into memory
+        size_bytes = file.size
+        if size_bytes is None:
+            size_bytes = file.file.seek(0, os.SEEK_END)
+            file.file.seek(0)
         
         # Trigger n8n workflow for DICOM upload
         n8n_response = await n8n_client.trigger_workflow(
@@ -186,9 +221,9 @@ async def upload_dicom_file(file: UploadFile = File(...)):
             data={
                 "filename": file.filename,
                 "content_type": file.content_type,
-                "size_bytes": len(content)
+                "size_bytes": size_bytes
             },
-            files={"dicom_file": (file.filename, content, file.content_type)}
+            files={"dicom_file": (file.filename, file.file, file.content_type)}
         )
         
         return {
@@ -198,22 +233,23 @@ async def upload_dicom_file(file: UploadFile = File(...)):
             "message": "DICOM file uploaded successfully"
         }
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("DICOM upload failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.post("/api/v1/compare-studies")
 async def compare_radiology_studies(
     previous_study_id: str,
-    current_study_id: str
+    current_study_id: str,
+    n8n_client: N8NClient = Depends(get_n8n_client)
 ) -> Dict[str, Any]:
     """
     Compare two radiology studies to detect changes
     """
     try:
         # Trigger n8n workflow for study comparison
-        n8n_response = await n8n_client.trigger_workflow(
+        n8n_response = await n8n_client.trigger_workflow_batched(
             workflow_name="radiology_study_comparison",
             data={
                 "previous_study_id": previous_study_id,
@@ -226,9 +262,9 @@ async def compare_radiology_studies(
         
         return n8n_response.get("data", {})
         
-    except Exception as e:
+    except (N8NError, ValidationError, ValueError) as e:
         logger.error("Study comparison failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.get("/")
@@ -251,10 +287,4 @@ async def root():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.agents.radiolinc_port,
-        reload=settings.debug
-    )
+    run_agent("main:app", settings.agents.radiolinc_port)
@@ -3,11 +3,13 @@ TTLINC - Medical Translation Service
 Bidirectional Arabic-English medical translation
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
-from shared.config.settings import settings
+from pydantic import ValidationError
+
+from shared.config.settings import MODEL_GPT4_TURBO, settings
 from shared.models.base import HealthCheckResponse
 from shared.models.translation import (
     TranslationRequest,
@@ -16,6 +18,10 @@ from shared.models.translation import (
     TranslationStatus
 )
 from shared.utils.logger import get_logger
+from shared.utils.cors import FrozenCORSMiddleware
+from shared.utils.errors import INTERNAL_ERROR, register_error_handlers
+from shared.utils.server import run_agent
+from fastapi.middleware.gzip import GZipMiddleware
 
 logger = get_logger(__name__)
 
@@ -34,15 +40,18 @@ app = FastAPI(
     version=settings.app_version,
     lifespan=lifespan,
     docs_url="/docs" if settings.api_docs_enabled else None,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
-    CORSMiddleware,
+    FrozenCORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+register_error_handlers(app, logger)
 
 
 @app.get("/health", response_model=HealthCheckResponse)
@@ -64,7 +73,7 @@ async def translate(request: TranslationRequest):
     try:
         logger.info(
             "Translating text",
-            request_id=str(request.request_id),
+            request_id=request.request_id,
             source_lang=request.source_language.value,
             target_lang=request.target_language.value,
             document_type=request.document_type.value
@@ -91,16 +100,16 @@ async def translate(request: TranslationRequest):
             source_language=request.source_language,
             target_language=request.target_language,
             quality_metrics=quality_metrics,
-            model_used=settings.openai.model_gpt4_turbo,
+            model_used=MODEL_GPT4_TURBO,
             processing_time_ms=1500,
             confidence_score=0.92
         )
         
         return response
         
-    except Exception as e:
+    except (ValidationError, ValueError) as e:
         logger.error("Translation failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        return INTERNAL_ERROR
 
 
 @app.get("/")
@@ -121,10 +130,4 @@ async def root():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.agents.ttlinc_port,
-        reload=settings.debug
-    )
+    run_agent("main:app", settings.agents.ttlinc_port)
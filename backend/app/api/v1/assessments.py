@@ -1,71 +1,99 @@
 """Assessment endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
-from ...database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import bindparam, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from ...database import get_async_db
 from ...models.assessment import Assessment, UserAssessment
-from ...models.user import User
-from ...core.dependencies import get_current_user
+from ...core.dependencies import CurrentUser, get_current_user
+from ...core.cache import ResponseCache, cached_json, get_response_cache, not_modified
 
 router = APIRouter()
 
+_COURSE_ASSESSMENTS = select(Assessment).where(
+    Assessment.course_id == bindparam("course_id"),
+    Assessment.is_active == True
+)
+_USER_RESULTS = select(UserAssessment).where(UserAssessment.user_id == bindparam("user_id"))
+
 
 @router.get("/course/{course_id}")
-def list_course_assessments(
+async def list_course_assessments(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """List assessments for a course"""
-    assessments = db.query(Assessment).filter(
-        Assessment.course_id == course_id,
-        Assessment.is_active == True
-    ).all()
-    return assessments
+    version = await cache.table_version(db, Assessment)
+    etag = f'"{version}"'
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    
+    # Keyed by table version so an edit never serves a stale listing
+    key = f"courses:assessments:{version}:{course_id}"
+    body = await cache.get(key)
+    if body is None:
+        result = await db.execute(_COURSE_ASSESSMENTS, {"course_id": course_id})
+        body = await cache.set(key, result.scalars().all())
+    return cached_json(body, etag)
 
 
 @router.post("/{assessment_id}/start")
-def start_assessment(
+async def start_assessment(
     assessment_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Start an assessment attempt"""
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
-    if not assessment:
-        raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    # Check attempt count
-    attempts = db.query(UserAssessment).filter(
-        UserAssessment.user_id == current_user.id,
-        UserAssessment.assessment_id == assessment_id
-    ).count()
-    
-    if attempts >= assessment.max_attempts:
-        raise HTTPException(status_code=400, detail="Maximum attempts reached")
+    # Number the next attempt and enforce max_attempts inside a single
+    # INSERT ... SELECT; no row comes back when the limit is reached
+    previous_attempt = (
+        select(func.max(UserAssessment.attempt_number))
+        .where(
+            UserAssessment.user_id == current_user.id,
+            UserAssessment.assessment_id == Assessment.id
+        )
+        .correlate(Assessment)
+        .scalar_subquery()
+    )
+    next_attempt = func.coalesce(previous_attempt, 0) + 1
+    attempt_source = select(
+        literal(current_user.id),
+        Assessment.id,
+        next_attempt,
+        literal(datetime.now(timezone.utc).replace(tzinfo=None))
+    ).where(
+        Assessment.id == assessment_id,
+        next_attempt <= Assessment.max_attempts
+    )
     
-    # Create user assessment
-    user_assessment = UserAssessment(
-        user_id=current_user.id,
-        assessment_id=assessment_id,
-        attempt_number=attempts + 1,
-        started_at=datetime.utcnow()
+    user_assessment = await db.scalar(
+        insert(UserAssessment)
+        .from_select(
+            ["user_id", "assessment_id", "attempt_number", "started_at"],
+            attempt_source
+        )
+        .returning(UserAssessment)
     )
     
-    db.add(user_assessment)
-    db.commit()
-    db.refresh(user_assessment)
+    if user_assessment is None:
+        # Only the failure path pays for a second lookup
+        if await db.get(Assessment, assessment_id) is None:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        raise HTTPException(status_code=400, detail="Maximum attempts reached")
     
+    await db.commit()
     return user_assessment
 
 
 @router.get("/my-results")
-def get_my_assessment_results(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_my_assessment_results(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's assessment results"""
-    results = db.query(UserAssessment).filter(
-        UserAssessment.user_id == current_user.id
-    ).all()
-    return results
+    result = await db.execute(_USER_RESULTS, {"user_id": current_user.id})
+    return result.scalars().all()
@@ -1,14 +1,19 @@
 """Authentication endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import datetime
-from ...database import get_db
+from sqlalchemy import bindparam, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+import asyncio
+from concurrent.futures import Executor
+from ...database import get_async_db
 from ...models.user import User
 from ...schemas.user import UserCreate, UserResponse, Token
+from ...core.dependencies import get_password_pool
 from ...core.security import (
     verify_password,
     get_password_hash,
+    access_token_claims,
     create_access_token,
     create_refresh_token,
     validate_saudi_national_id
@@ -16,13 +21,36 @@ from ...core.security import (
 
 router = APIRouter()
 
+# Logins within this many seconds of the recorded one don't rewrite last_login
+LAST_LOGIN_TTL = 60
+EPOCH = datetime(1970, 1, 1)
+
+# Statements built once; executions reuse SQLAlchemy's compiled cache entry
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_USER_CONFLICTS = select(User.email, User.saudi_national_id).where(
+    or_(
+        User.email == bindparam("email"),
+        User.saudi_national_id == bindparam("national_id")
+    )
+)
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(
+    user_data: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+    password_pool: Executor = Depends(get_password_pool)
+):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    # Check email and national ID in one round-trip; both columns are uniquely indexed
+    matches = (
+        await db.execute(
+            _USER_CONFLICTS,
+            {"email": user_data.email, "national_id": user_data.saudi_national_id}
+        )
+    ).all()
+    
+    if any(email == user_data.email for email, _ in matches):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -36,44 +64,46 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
                 detail="Invalid Saudi National ID or Iqama number"
             )
         
-        # Check if national ID is already registered
-        existing_id = db.query(User).filter(
-            User.saudi_national_id == user_data.saudi_national_id
-        ).first()
-        if existing_id:
+        # Any remaining match is on the national ID
+        if matches:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="National ID already registered"
             )
     
-    # Create user
-    hashed_password = get_password_hash(user_data.password)
-    db_user = User(
-        email=user_data.email,
-        hashed_password=hashed_password,
-        full_name=user_data.full_name,
-        full_name_ar=user_data.full_name_ar,
-        user_type=user_data.user_type,
-        saudi_national_id=user_data.saudi_national_id,
-        phone_number=user_data.phone_number,
-        preferred_language=user_data.preferred_language
+    # Create user; bcrypt is CPU-bound, so hash in the process pool
+    hashed_password = await asyncio.get_running_loop().run_in_executor(
+        password_pool, get_password_hash, user_data.password
     )
-    
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # RETURNING reads back server-side values without a refresh SELECT
+    db_user = await db.scalar(
+        insert(User).values(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            full_name=user_data.full_name,
+            full_name_ar=user_data.full_name_ar,
+            user_type=user_data.user_type,
+            saudi_national_id=user_data.saudi_national_id,
+            phone_number=user_data.phone_number,
+            preferred_language=user_data.preferred_language
+        ).returning(User)
+    )
+    await db.commit()
     
     return db_user
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    password_pool: Executor = Depends(get_password_pool)
 ):
     """Login and get access token"""
     # Find user
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = (
+        await db.execute(_USER_BY_EMAIL, {"email": form_data.username})
+    ).scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,7 +111,10 @@ def login(
         )
     
     # Verify password
-    if not verify_password(form_data.password, user.hashed_password):
+    password_ok = await asyncio.get_running_loop().run_in_executor(
+        password_pool, verify_password, form_data.password, user.hashed_password
+    )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -94,14 +127,16 @@ def login(
             detail="User account is inactive"
         )
     
-    # Update last login
-    from datetime import timezone
-    user.last_login = datetime.now(timezone.utc)
-    db.commit()
+    # Update last login, skipping the write on rapid re-logins.
+    # The column is naive, so store naive UTC.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if (now - (user.last_login or EPOCH)).total_seconds() > LAST_LOGIN_TTL:
+        user.last_login = now
+        await db.commit()
     
     # Create tokens
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data=access_token_claims(user))
+    refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
         "access_token": access_token,
@@ -111,7 +146,7 @@ def login(
 
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(token: str, db: Session = Depends(get_db)):
+async def refresh_token(token: str, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token"""
     from ...core.security import decode_token
     
@@ -122,8 +157,7 @@ def refresh_token(token: str, db: Session = Depends(get_db)):
             detail="Invalid refresh token"
         )
     
-    user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, int(payload["sub"]))
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -132,8 +166,8 @@ def refresh_token(token: str, db: Session = Depends(get_db)):
         )
     
     # Create new tokens
-    access_token = create_access_token(data={"sub": user.id})
-    new_refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data=access_token_claims(user))
+    new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
         "access_token": access_token,
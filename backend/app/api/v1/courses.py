@@ -1,33 +1,66 @@
 """Course management endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from ...database import get_db
+from ...database import get_async_db
 from ...models.course import Course
 from ...models.user import User
 from ...core.dependencies import get_current_user
+from ...core.cache import ResponseCache, cached_json, get_response_cache, not_modified
 
 router = APIRouter()
 
+_PUBLISHED_COURSES = select(Course).where(
+    Course.is_active == True,
+    Course.is_published == True
+).offset(bindparam("skip")).limit(bindparam("limit"))
+
 
 @router.get("/")
-def list_courses(
+async def list_courses(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """List all active courses"""
-    courses = db.query(Course).filter(
-        Course.is_active == True,
-        Course.is_published == True
-    ).offset(skip).limit(limit).all()
-    return courses
+    version = await cache.table_version(db, Course)
+    etag = f'"{version}"'
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    
+    # Keyed by table version so an edit never serves a stale listing
+    key = f"courses:list:{version}:{skip}:{limit}"
+    body = await cache.get(key)
+    if body is None:
+        result = await db.execute(_PUBLISHED_COURSES, {"skip": skip, "limit": limit})
+        body = await cache.set(key, result.scalars().all())
+    return cached_json(body, etag)
 
 
 @router.get("/{course_id}")
-def get_course(course_id: int, db: Session = Depends(get_db)):
+async def get_course(
+    course_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache)
+):
     """Get course by ID"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    version = await cache.table_version(db, Course)
+    etag = f'"{version}"'
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    
+    # Read-through by table version; any course edit moves to fresh keys
+    key = f"courses:detail:{version}:{course_id}"
+    body = await cache.get(key)
+    if body is None:
+        course = await db.get(Course, course_id)
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        body = await cache.set(key, course)
+    return cached_json(body, etag)
@@ -1,64 +1,282 @@
 """Enrollment endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, column, literal, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from ...database import get_db
+from typing import Any, Dict, List
+import enum
+import json
+import redis.asyncio as redis
+from ...database import dialect_insert, get_async_db
 from ...models.enrollment import Enrollment, EnrollmentStatus, SubscriptionTier
-from ...models.user import User
 from ...models.course import Course
-from ...core.dependencies import get_current_user
+from ...models.user import User, UserType
+from ...schemas.enrollment import (
+    BulkEnrollmentResponse,
+    EnrollmentCreate,
+    EnrollmentSummary,
+    QueuedEnrollmentResponse
+)
+from ...core.cache import (
+    PRIVATE_CACHE_CONTROL,
+    cached_json,
+    get_redis,
+    private_not_modified,
+    user_rows_etag
+)
+from ...core.dependencies import CurrentUser, get_current_user, require_role
+from ...services.enrollment_tasks import bulk_enrollment_row, enqueue_enrollments
 
 router = APIRouter()
 
+# Bulk batches above this size are loaded with COPY on PostgreSQL
+COPY_THRESHOLD = 100
+MAX_BULK_ENROLLMENTS = 10000
+
+_OPEN_STATUSES = [EnrollmentStatus.PENDING, EnrollmentStatus.ACTIVE]
+
+# Columns written by bulk enrollment, in bulk_enrollment_row order
+_BULK_COLUMNS = (
+    "user_id", "course_id", "subscription_tier", "modality", "status",
+    "progress_percentage", "completed_modules", "icd10am_mastery", "sbs_mastery",
+    "ardrg_mastery", "enrolled_at", "corporate_account_id", "is_bulk_enrollment",
+    "created_at", "updated_at",
+)
+
+# Large PostgreSQL bulk batches are COPYed here, then moved with one
+# INSERT ... SELECT that can skip conflicts; dropped at commit
+_STAGING = table("enrollments_staging", *(column(c) for c in _BULK_COLUMNS))
+_CREATE_STAGING = (
+    f"CREATE TEMP TABLE {_STAGING.name} ON COMMIT DROP AS "
+    f"SELECT {', '.join(_BULK_COLUMNS)} FROM {Enrollment.__tablename__} WITH NO DATA"
+)
+
+_USER_ENROLLMENTS = select(
+    Enrollment.id,
+    Enrollment.course_id,
+    Enrollment.subscription_tier,
+    Enrollment.status,
+    Enrollment.progress_percentage,
+    Enrollment.enrolled_at
+).where(
+    Enrollment.user_id == bindparam("user_id")
+).order_by(Enrollment.id.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+
+# Built once at import; listings skip FastAPI's per-response model handling
+_ENROLLMENT_LIST = TypeAdapter(List[EnrollmentSummary])
+
+_EXISTING_COURSE_IDS = select(Course.id).where(Course.id.in_(bindparam("ids", expanding=True)))
+_EXISTING_USER_IDS = select(User.id).where(User.id.in_(bindparam("ids", expanding=True)))
+
+# Corporate accounts may enroll themselves and users of their own organization
+_ORGANIZATION_USER_IDS = _EXISTING_USER_IDS.where(
+    or_(
+        User.id == bindparam("caller_id"),
+        User.organization == select(User.organization).where(
+            User.id == bindparam("caller_id")
+        ).scalar_subquery()
+    )
+)
+
+_OPEN_ENROLLMENT_PAIRS = select(Enrollment.user_id, Enrollment.course_id).where(
+    Enrollment.user_id.in_(bindparam("user_ids", expanding=True)),
+    Enrollment.course_id.in_(bindparam("course_ids", expanding=True)),
+    Enrollment.status.in_(_OPEN_STATUSES)
+)
+
+
+def _skip_open_duplicates(statement):
+    """Resolve conflicts on the open-enrollment unique index by skipping the row"""
+    return statement.on_conflict_do_nothing(
+        index_elements=["user_id", "course_id"],
+        index_where=Enrollment.status.in_(_OPEN_STATUSES)
+    )
+
 
 @router.post("/")
-def create_enrollment(
+async def create_enrollment(
     course_id: int,
     subscription_tier: SubscriptionTier,
     modality: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enroll in a course"""
-    # Check if course exists
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
+    # Insert only if the course exists and no open enrollment holds the
+    # unique index; no row comes back otherwise
+    enrollment_source = select(
+        literal(current_user.id),
+        Course.id,
+        literal(subscription_tier, Enrollment.subscription_tier.type),
+        literal(modality),
+        literal(EnrollmentStatus.PENDING, Enrollment.status.type)
+    ).where(Course.id == course_id)
     
-    # Check if already enrolled
-    existing = db.query(Enrollment).filter(
-        Enrollment.user_id == current_user.id,
-        Enrollment.course_id == course_id,
-        Enrollment.status.in_([EnrollmentStatus.PENDING, EnrollmentStatus.ACTIVE])
-    ).first()
+    insert_enrollment = dialect_insert((await db.connection()).dialect.name)
+    enrollment = await db.scalar(
+        _skip_open_duplicates(
+            insert_enrollment(Enrollment).from_select(
+                ["user_id", "course_id", "subscription_tier", "modality", "status"],
+                enrollment_source
+            )
+        ).returning(Enrollment)
+    )
     
-    if existing:
+    if enrollment is None:
+        # Only the failure path pays for a second lookup
+        if await db.get(Course, course_id) is None:
+            raise HTTPException(status_code=404, detail="Course not found")
         raise HTTPException(status_code=400, detail="Already enrolled in this course")
     
-    # Create enrollment
-    enrollment = Enrollment(
-        user_id=current_user.id,
-        course_id=course_id,
-        subscription_tier=subscription_tier,
-        modality=modality,
-        status=EnrollmentStatus.PENDING,
-        enrolled_at=datetime.utcnow()
+    await db.commit()
+    return enrollment
+
+
+@router.get("/my-enrollments", response_model=List[EnrollmentSummary])
+async def get_my_enrollments(
+    request: Request,
+    skip: int = 0,
+    limit: int = 50,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    etag: str = Depends(user_rows_etag(Enrollment))
+):
+    """Get current user's enrollments, newest first"""
+    unchanged = private_not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    
+    result = await db.execute(
+        _USER_ENROLLMENTS, {"user_id": current_user.id, "skip": skip, "limit": limit}
     )
+    # Validate and serialize the page in one pass through pydantic-core
+    body = _ENROLLMENT_LIST.dump_json(_ENROLLMENT_LIST.validate_python(result.mappings().all()))
+    return cached_json(body, etag, PRIVATE_CACHE_CONTROL)
+
+
+@router.post("/bulk", response_model=BulkEnrollmentResponse)
+async def create_bulk_enrollments(
+    enrollments: List[EnrollmentCreate],
+    current_user: CurrentUser = Depends(require_role(UserType.ADMIN, UserType.CORPORATE)),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Enroll many users at once (corporate onboarding)"""
+    payloads = await _new_enrollments(db, enrollments, current_user)
     
-    db.add(enrollment)
-    db.commit()
-    db.refresh(enrollment)
+    created = 0
+    if payloads:
+        now = datetime.utcnow()
+        created = await _insert_enrollments(db, [bulk_enrollment_row(**p, now=now) for p in payloads])
+        await db.commit()
     
-    return enrollment
+    return {"created": created, "skipped": len(enrollments) - created}
 
 
-@router.get("/my-enrollments")
-def get_my_enrollments(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.post("/bulk/queued", status_code=202, response_model=QueuedEnrollmentResponse)
+async def queue_bulk_enrollments(
+    enrollments: List[EnrollmentCreate],
+    current_user: CurrentUser = Depends(require_role(UserType.ADMIN, UserType.CORPORATE)),
+    db: AsyncSession = Depends(get_async_db),
+    client: redis.Redis = Depends(get_redis)
 ):
-    """Get current user's enrollments"""
-    enrollments = db.query(Enrollment).filter(
-        Enrollment.user_id == current_user.id
-    ).all()
-    return enrollments
+    """Validate a bulk enrollment and queue it for a batched background insert"""
+    payloads = await _new_enrollments(db, enrollments, current_user)
+    
+    if payloads:
+        try:
+            await enqueue_enrollments(client, payloads)
+        except redis.RedisError:
+            raise HTTPException(status_code=503, detail="Enrollment queue unavailable")
+    
+    return {"queued": len(payloads), "skipped": len(enrollments) - len(payloads)}
+
+
+async def _new_enrollments(
+    db: AsyncSession,
+    enrollments: List[EnrollmentCreate],
+    current_user: CurrentUser
+) -> List[Dict[str, Any]]:
+    """Validate a bulk request and return bulk_enrollment_row arguments for new pairs"""
+    if len(enrollments) > MAX_BULK_ENROLLMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_ENROLLMENTS} enrollments per request"
+        )
+    
+    course_ids = list({e.course_id for e in enrollments})
+    user_ids = list({e.user_id for e in enrollments})
+    
+    unknown_courses = set(course_ids) - set(await db.scalars(_EXISTING_COURSE_IDS, {"ids": course_ids}))
+    if unknown_courses:
+        raise HTTPException(status_code=404, detail=f"Courses not found: {sorted(unknown_courses)}")
+    
+    if current_user.user_type == UserType.ADMIN:
+        enrollable = await db.scalars(_EXISTING_USER_IDS, {"ids": user_ids})
+    else:
+        enrollable = await db.scalars(
+            _ORGANIZATION_USER_IDS, {"ids": user_ids, "caller_id": current_user.id}
+        )
+    # One answer for missing and out-of-scope users, so IDs cannot be probed
+    if set(user_ids) - set(enrollable):
+        raise HTTPException(status_code=404, detail="Users not found")
+    
+    # Skip pairs already enrolled, and repeats within the request
+    result = await db.execute(
+        _OPEN_ENROLLMENT_PAIRS, {"user_ids": user_ids, "course_ids": course_ids}
+    )
+    seen = set(map(tuple, result.all()))
+    corporate_account_id = current_user.id if current_user.user_type == UserType.CORPORATE else None
+    
+    payloads = []
+    for e in enrollments:
+        pair = (e.user_id, e.course_id)
+        if pair in seen:
+            continue
+        seen.add(pair)
+        payloads.append({
+            "user_id": e.user_id,
+            "course_id": e.course_id,
+            "subscription_tier": e.subscription_tier,
+            "modality": e.modality,
+            "corporate_account_id": corporate_account_id,
+        })
+    return payloads
+
+
+async def _insert_enrollments(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert rows and return how many were created
+
+    Another request may open the same pair after _new_enrollments checked,
+    so the insert itself skips pairs that already hold an open enrollment.
+    Large batches on PostgreSQL are loaded with COPY into a staging table
+    first, since COPY cannot skip conflicts.
+    """
+    connection = await db.connection()
+    insert_enrollment = dialect_insert(connection.dialect.name)
+    if len(rows) < COPY_THRESHOLD or connection.dialect.name != "postgresql":
+        result = await db.execute(
+            _skip_open_duplicates(insert_enrollment(Enrollment)).returning(Enrollment.id), rows
+        )
+        return len(result.all())
+    
+    raw = (await connection.get_raw_connection()).driver_connection
+    await raw.execute(_CREATE_STAGING)
+    records = [tuple(_copy_value(row[c]) for c in _BULK_COLUMNS) for row in rows]
+    await raw.copy_records_to_table(_STAGING.name, records=records, columns=_BULK_COLUMNS)
+    result = await db.execute(
+        _skip_open_duplicates(
+            insert_enrollment(Enrollment).from_select(_BULK_COLUMNS, select(_STAGING))
+        ).returning(Enrollment.id)
+    )
+    return len(result.all())
+
+
+def _copy_value(value: Any) -> Any:
+    """Adapt a value for COPY: native PG enums are labelled by member name, JSON is text"""
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
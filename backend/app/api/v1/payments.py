@@ -1,62 +1,273 @@
 """Payment endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
-from ...database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, case, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Any, AsyncIterator, Dict, List
+import orjson
+import redis.asyncio as redis
+from ...database import get_async_db, get_async_sessionmaker
+from ...models.course import Course
+from ...models.enrollment import Enrollment, EnrollmentStatus, SubscriptionTier
 from ...models.payment import Payment, PaymentStatus
-from ...models.user import User
-from ...core.dependencies import get_current_user
-from ...config import settings
+from ...models.user import UserType
+from ...schemas.payment import (
+    CheckoutItem, CheckoutRequest, CheckoutResponse,
+    CorporateCheckoutRequest, CorporateCheckoutResponse, PaymentSummary
+)
+from ...core.dependencies import CurrentUser, get_current_user, require_role
+from ...core.cache import PRIVATE_CACHE_CONTROL, get_redis, private_not_modified, user_rows_etag
+from ...services.payment_service import PaymentService, to_minor_units, vat_minor_units
 
 router = APIRouter()
 
+_USER_PAYMENTS = select(
+    Payment.id,
+    Payment.enrollment_id,
+    Payment.total_amount,
+    Payment.currency,
+    Payment.status,
+    Payment.created_at,
+    Payment.paid_at
+).where(
+    Payment.user_id == bindparam("user_id")
+).order_by(
+    Payment.id.desc()
+).offset(bindparam("skip")).limit(bindparam("limit")).execution_options(yield_per=200)
+
+# Built once at import; the listing skips FastAPI's per-response model handling
+_PAYMENT_LIST = TypeAdapter(List[PaymentSummary])
+
+# The caller's pending enrollments with the course price for each one's tier,
+# locked so concurrent checkouts of the same enrollments serialize
+_CHECKOUT_ITEMS = select(
+    Enrollment.id,
+    case(
+        (Enrollment.subscription_tier == SubscriptionTier.BASIC, Course.price_basic),
+        (Enrollment.subscription_tier == SubscriptionTier.STANDARD, Course.price_standard),
+        (Enrollment.subscription_tier == SubscriptionTier.PREMIUM, Course.price_premium),
+        (Enrollment.subscription_tier == SubscriptionTier.CORPORATE, Course.price_corporate)
+    )
+).join(
+    Course, Course.id == Enrollment.course_id
+).where(
+    Enrollment.user_id == bindparam("user_id"),
+    Enrollment.id.in_(bindparam("enrollment_ids", expanding=True)),
+    Enrollment.status == EnrollmentStatus.PENDING
+).order_by(Enrollment.id).with_for_update(of=Enrollment)
+
+_CORPORATE_PRICE = select(Course.price_corporate).where(Course.id == bindparam("course_id"))
+
+_PENDING_CHECKOUT = select(Payment).where(
+    Payment.user_id == bindparam("user_id"),
+    Payment.status == PaymentStatus.PENDING,
+    Payment.payment_metadata == bindparam("payment_metadata")
+).limit(1)
+
 
 @router.post("/create-payment-intent")
-def create_payment_intent(
+async def create_payment_intent(
     amount: float,
     enrollment_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a payment intent"""
-    # Calculate VAT
-    vat_amount = amount * settings.VAT_RATE
-    total_amount = amount + vat_amount
-    
-    # Create payment record
-    payment = Payment(
-        user_id=current_user.id,
-        amount=amount,
-        vat_amount=vat_amount,
-        total_amount=total_amount,
-        currency="SAR",
-        status=PaymentStatus.PENDING,
-        enrollment_id=enrollment_id
+    # Create payment record; VAT and total are generated columns read
+    # back by RETURNING in the same round trip
+    payment = await db.scalar(
+        insert(Payment).values(
+            user_id=current_user.id,
+            amount=amount,
+            currency="SAR",
+            status=PaymentStatus.PENDING,
+            enrollment_id=enrollment_id
+        ).returning(Payment)
     )
-    
-    db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    await db.commit()
     
     # In production, integrate with Stripe here
     # For now, return simulated payment intent
     return {
         "payment_id": payment.id,
         "amount": amount,
-        "vat_amount": vat_amount,
-        "total_amount": total_amount,
+        "vat_amount": payment.vat_amount,
+        "total_amount": payment.total_amount,
         "currency": "SAR",
         "status": "pending"
     }
 
 
-@router.get("/my-payments")
-def get_my_payments(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.post("/checkout", response_model=CheckoutResponse)
+async def checkout(
+    order: CheckoutRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """Pay for several pending enrollments with one payment and one Stripe intent"""
+    enrollment_ids = sorted(set(order.enrollment_ids))
+    rows = (await db.execute(
+        _CHECKOUT_ITEMS, {"user_id": current_user.id, "enrollment_ids": enrollment_ids}
+    )).all()
+    if len(rows) != len(enrollment_ids):
+        raise HTTPException(status_code=404, detail="Pending enrollment not found")
+    if any(price is None for _, price in rows):
+        raise HTTPException(status_code=400, detail="Course has no price for this tier")
+    items = [CheckoutItem(enrollment_id=enrollment_id, amount=price) for enrollment_id, price in rows]
+    amounts_minor = [to_minor_units(item.amount) for item in items]
+    subtotal_minor = sum(amounts_minor)
+    
+    # A repeated checkout of the same enrollments reuses its pending payment
+    payment_metadata = orjson.dumps({"enrollment_ids": enrollment_ids}).decode()
+    payment = await db.scalar(
+        _PENDING_CHECKOUT,
+        {"user_id": current_user.id, "payment_metadata": payment_metadata}
+    )
+    if payment is None:
+        payment = await db.scalar(
+            insert(Payment).values(
+                user_id=current_user.id,
+                amount=subtotal_minor / 100,
+                currency="SAR",
+                status=PaymentStatus.PENDING,
+                payment_metadata=payment_metadata
+            ).returning(Payment)
+        )
+    
+    # Stripe charges each item with VAT; metadata keeps the per-item split.
+    # VAT is owed on the subtotal, as the payment row computes it, so the
+    # last item absorbs the halalas lost to rounding each item separately
+    items_vat = [vat_minor_units(amount_minor) for amount_minor in amounts_minor]
+    items_vat[-1] += vat_minor_units(subtotal_minor) - sum(items_vat)
+    line_items = [
+        {"enrollment_id": item.enrollment_id, "amount_minor": amount_minor + vat}
+        for item, amount_minor, vat in zip(items, amounts_minor, items_vat)
+    ]
+    total_minor = sum(line_item["amount_minor"] for line_item in line_items)
+    intent = await PaymentService.create_payment_intent_batch(
+        line_items,
+        order_id=f"payment:{payment.id}",
+        redis_client=redis_client
+    )
+    # A plain UPDATE leaves the generated VAT columns loaded on payment
+    await db.execute(
+        update(Payment).where(Payment.id == payment.id).values(
+            stripe_payment_intent_id=intent["payment_intent_id"]
+        )
+    )
+    await db.commit()
+    
+    return CheckoutResponse(
+        payment_id=payment.id,
+        payment_intent_id=intent["payment_intent_id"],
+        client_secret=intent["client_secret"],
+        items=items,
+        amount=subtotal_minor / 100,
+        vat_amount=(total_minor - subtotal_minor) / 100,
+        total_amount=total_minor / 100,
+        currency=payment.currency
+    )
+
+
+@router.post("/corporate-checkout", response_model=CorporateCheckoutResponse)
+async def corporate_checkout(
+    order: CorporateCheckoutRequest,
+    current_user: CurrentUser = Depends(require_role(UserType.CORPORATE, UserType.ADMIN)),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """Quote seats of a course with discount and VAT, and create their intent"""
+    price = await db.scalar(_CORPORATE_PRICE, {"course_id": order.course_id})
+    if price is None:
+        raise HTTPException(status_code=404, detail="Course has no corporate price")
+    subtotal_minor = to_minor_units(price) * order.seat_count
+    
+    # A repeated quote for the same seats reuses its pending payment
+    payment_metadata = orjson.dumps(
+        {"course_id": order.course_id, "seat_count": order.seat_count}
+    ).decode()
+    payment_id = await db.scalar(
+        _PENDING_CHECKOUT.with_only_columns(Payment.id),
+        {"user_id": current_user.id, "payment_metadata": payment_metadata}
+    )
+    if payment_id is None:
+        payment_id = await db.scalar(
+            insert(Payment).values(
+                user_id=current_user.id,
+                # List price until the discounted quote below replaces it
+                amount=subtotal_minor / 100,
+                currency="SAR",
+                status=PaymentStatus.PENDING,
+                payment_metadata=payment_metadata
+            ).returning(Payment.id)
+        )
+    
+    checkout = await PaymentService.prepare_checkout(
+        f"payment:{payment_id}",
+        subtotal_minor,
+        order.seat_count,
+        metadata={"course_id": order.course_id},
+        redis_client=redis_client
+    )
+    # Store the subtotal Stripe was quoted; the generated VAT and total
+    # round to the halala exactly as the quote does
+    await db.execute(
+        update(Payment).where(Payment.id == payment_id).values(
+            amount=checkout.quote.subtotal,
+            stripe_payment_intent_id=checkout.intent["payment_intent_id"]
+        )
+    )
+    await db.commit()
+    
+    return CorporateCheckoutResponse(
+        payment_id=payment_id,
+        payment_intent_id=checkout.intent["payment_intent_id"],
+        client_secret=checkout.intent["client_secret"],
+        seat_count=checkout.seat_count,
+        subtotal=subtotal_minor / 100,
+        discount_amount=checkout.discount_amount,
+        vat_amount=checkout.quote.vat_amount,
+        total_amount=checkout.quote.total,
+        currency=checkout.quote.currency
+    )
+
+
+@router.get("/my-payments", response_model=List[PaymentSummary])
+async def get_my_payments(
+    request: Request,
+    skip: int = 0,
+    limit: int = 50,
+    current_user: CurrentUser = Depends(get_current_user),
+    sessionmaker: async_sessionmaker = Depends(get_async_sessionmaker),
+    etag: str = Depends(user_rows_etag(Payment))
 ):
-    """Get current user's payments"""
-    payments = db.query(Payment).filter(
-        Payment.user_id == current_user.id
-    ).all()
-    return payments
+    """Get current user's payments, newest first, streamed as a JSON array"""
+    unchanged = private_not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    
+    params = {"user_id": current_user.id, "skip": skip, "limit": limit}
+    return StreamingResponse(
+        _stream_payments(sessionmaker, params),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": PRIVATE_CACHE_CONTROL}
+    )
+
+
+async def _stream_payments(
+    sessionmaker: async_sessionmaker,
+    params: Dict[str, Any]
+) -> AsyncIterator[bytes]:
+    """Emit payments as a JSON array, holding one partition of rows at a time"""
+    yield b"["
+    separator = b""
+    async with sessionmaker() as db:
+        result = await db.stream(_USER_PAYMENTS, params)
+        async for rows in result.mappings().partitions():
+            # Serialize each partition in one pydantic-core pass, without its brackets
+            body = _PAYMENT_LIST.dump_json(_PAYMENT_LIST.validate_python(rows))
+            yield separator + body[1:-1]
+            separator = b","
+    yield b"]"
@@ -5,13 +5,13 @@ from typing import List
 from ...database import get_db
 from ...models.user import User, UserType
 from ...schemas.user import UserResponse, UserUpdate
-from ...core.dependencies import get_current_user, require_role
+from ...core.dependencies import CurrentUser, get_current_user_db, require_role
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+def get_current_user_profile(current_user: User = Depends(get_current_user_db)):
     """Get current user profile"""
     return current_user
 
@@ -19,7 +19,7 @@ def get_current_user_profile(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserResponse)
 def update_current_user_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_db),
     db: Session = Depends(get_db)
 ):
     """Update current user profile"""
@@ -38,7 +38,7 @@ def update_current_user_profile(
 def list_users(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(require_role(UserType.ADMIN)),
+    current_user: CurrentUser = Depends(require_role(UserType.ADMIN)),
     db: Session = Depends(get_db)
 ):
     """List all users (admin only)"""
@@ -49,7 +49,7 @@ def list_users(
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
-    current_user: User = Depends(require_role(UserType.ADMIN)),
+    current_user: CurrentUser = Depends(require_role(UserType.ADMIN)),
     db: Session = Depends(get_db)
 ):
     """Get user by ID (admin only)"""
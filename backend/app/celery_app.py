@@ -5,7 +5,8 @@ from .config import settings
 celery_app = Celery(
     "givc_academy",
     broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.services.enrollment_tasks"]
 )
 
 celery_app.conf.update(
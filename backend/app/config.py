@@ -1,7 +1,7 @@
 """Application Configuration"""
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import Optional
-import os
 
 
 class Settings(BaseSettings):
@@ -13,46 +13,55 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     
     # Database
-    DATABASE_URL: str = os.getenv(
-        "DATABASE_URL", 
-        "sqlite:///./givc_academy.db"
-    )
+    DATABASE_URL: str = "sqlite:///./givc_academy.db"
     
     # PostgreSQL for production
-    POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "localhost")
-    POSTGRES_USER: str = os.getenv("POSTGRES_USER", "givc")
-    POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "givc123")
-    POSTGRES_DB: str = os.getenv("POSTGRES_DB", "givc_academy")
+    POSTGRES_SERVER: str = "localhost"
+    POSTGRES_USER: str = "givc"
+    POSTGRES_PASSWORD: str = "givc123"
+    POSTGRES_DB: str = "givc_academy"
+    
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    DB_POOL_RECYCLE: int = 1800  # seconds
     
     # Redis
-    REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
-    REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
-    REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
-    
-    # Celery
-    CELERY_BROKER_URL: str = os.getenv(
-        "CELERY_BROKER_URL", 
-        f"redis://{REDIS_HOST}:{REDIS_PORT}/1"
-    )
-    CELERY_RESULT_BACKEND: str = os.getenv(
-        "CELERY_RESULT_BACKEND",
-        f"redis://{REDIS_HOST}:{REDIS_PORT}/2"
-    )
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    CATALOG_CACHE_TTL: int = 60  # seconds
+    LEARNING_PATH_CACHE_TTL: int = 86400  # seconds
+    
+    # Celery (default to Redis DBs 1 and 2 on REDIS_HOST)
+    CELERY_BROKER_URL: Optional[str] = None
+    CELERY_RESULT_BACKEND: Optional[str] = None
     
     # Security
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "")
+    SECRET_KEY: str = ""
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.SECRET_KEY and not self.DEBUG:
             raise ValueError("SECRET_KEY must be set in production")
+        if self.CELERY_BROKER_URL is None:
+            self.CELERY_BROKER_URL = f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/1"
+        if self.CELERY_RESULT_BACKEND is None:
+            self.CELERY_RESULT_BACKEND = f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/2"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # bounds staleness of claims in the token
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # defaults to CPU count
+    BCRYPT_ROUNDS: int = 12  # lower only for local development and tests
     
     # MFA
     MFA_ISSUER: str = "GIVC Core Academy"
     
+    # Pre-trained adaptive learning models (joblib pickles)
+    LEARNER_CLUSTER_MODEL_PATH: Optional[str] = None  # fitted KMeans
+    SKILL_GAP_MODEL_PATH: Optional[str] = None  # multi-output regressor, or its .onnx export
+    
     # CORS
     BACKEND_CORS_ORIGINS: list = [
         "http://localhost:3000",
@@ -60,8 +69,9 @@ class Settings(BaseSettings):
     ]
     
     # Stripe
-    STRIPE_API_KEY: str = os.getenv("STRIPE_API_KEY", "")
-    STRIPE_WEBHOOK_SECRET: str = os.getenv("STRIPE_WEBHOOK_SECRET", "")
+    STRIPE_API_KEY: str = ""
+    STRIPE_WEBHOOK_SECRET: str = ""
+    PAYMENT_INTENT_CACHE_TTL: int = 3600  # seconds; Stripe keeps idempotency keys 24h
     
     # VAT
     VAT_RATE: float = 0.15  # Saudi Arabia 15% VAT
@@ -72,14 +82,20 @@ class Settings(BaseSettings):
     SCFHS_API_URL: Optional[str] = None
     
     # Email (for notifications)
-    SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
-    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
-    SMTP_USER: str = os.getenv("SMTP_USER", "")
-    SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 587
+    SMTP_USER: str = ""
+    SMTP_PASSWORD: str = ""
     
     class Config:
         case_sensitive = True
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Settings loaded once per process"""
+    return Settings()
+
+
+settings = get_settings()
@@ -0,0 +1,169 @@
+"""Redis-backed response cache and ETags"""
+import hashlib
+from typing import Any, Optional
+import orjson
+import redis.asyncio as redis
+from fastapi import Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import get_async_db
+from .dependencies import CurrentUser, get_current_user
+
+# Seconds a table version is trusted before MAX(updated_at) is re-read
+VERSION_TTL = 5
+
+# Browsers may reuse user-scoped listings this long without revalidating
+PRIVATE_CACHE_CONTROL = "private, max-age=30"
+
+
+class ResponseCache:
+    """Cache of JSON response bodies in Redis; Redis errors count as misses"""
+    
+    def __init__(self, client: redis.Redis, ttl: int = 60):
+        self.client = client
+        self.ttl = ttl
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a cached body"""
+        try:
+            return await self.client.get(key)
+        except redis.RedisError:
+            return None
+    
+    async def set(self, key: str, value: Any) -> bytes:
+        """Serialize a value once, cache the bytes and return them"""
+        body = orjson.dumps(jsonable_encoder(value))
+        try:
+            await self.client.set(key, body, ex=self.ttl)
+        except redis.RedisError:
+            pass
+        return body
+    
+    async def table_version(self, db: AsyncSession, model) -> str:
+        """
+        Short hash of a table's MAX(updated_at) and row count
+
+        Changes whenever a row is added, edited or deleted. Cached in Redis
+        for VERSION_TTL seconds so most requests skip the aggregate.
+        """
+        key = f"version:{model.__tablename__}"
+        cached = await self.get(key)
+        if cached is not None:
+            return cached.decode()
+        
+        latest, rows = (
+            await db.execute(select(func.max(model.updated_at), func.count()).select_from(model))
+        ).one()
+        version = hashlib.blake2b(f"{latest}:{rows}".encode(), digest_size=8).hexdigest()
+        try:
+            await self.client.set(key, version, ex=VERSION_TTL)
+        except redis.RedisError:
+            pass
+        return version
+    
+    async def clear(self, namespace: str) -> None:
+        """Drop every key in a namespace, e.g. after a catalog edit"""
+        try:
+            keys = [key async for key in self.client.scan_iter(match=f"{namespace}:*")]
+            if keys:
+                await self.client.delete(*keys)
+        except redis.RedisError:
+            pass
+    
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def create_response_cache() -> ResponseCache:
+    """Create the app's response cache"""
+    client = redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5
+    )
+    return ResponseCache(client, ttl=settings.CATALOG_CACHE_TTL)
+
+
+def get_response_cache(request: Request) -> ResponseCache:
+    """Dependency returning the app's response cache"""
+    return request.app.state.cache
+
+
+def get_redis(request: Request) -> redis.Redis:
+    """Dependency returning the app's Redis client"""
+    return request.app.state.cache.client
+
+
+def cached_json(
+    body: bytes,
+    etag: Optional[str] = None,
+    cache_control: Optional[str] = None
+) -> Response:
+    """Response for an already-serialized JSON body"""
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def user_rows_etag(model):
+    """
+    Dependency factory: ETag over the current user's rows of a model
+
+    Hashes MAX(updated_at) and the row count with one aggregate on the
+    model's user_id index, so unchanged listings can 304 before any rows
+    are read.
+    """
+    version_query = select(func.max(model.updated_at), func.count()).where(
+        model.user_id == bindparam("user_id")
+    )
+    
+    async def etag(
+        current_user: CurrentUser = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+    ) -> str:
+        latest, rows = (await db.execute(version_query, {"user_id": current_user.id})).one()
+        return f'"{hashlib.blake2b(f"{latest}:{rows}".encode(), digest_size=8).hexdigest()}"'
+    
+    return etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag
+
+    The header is a comma-separated list of entity tags or "*". Tags are
+    compared weakly (RFC 9110 section 13.1.2), so W/"x" matches "x".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def private_not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 for a user-scoped listing if the client already holds this ETag, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": PRIVATE_CACHE_CONTROL}
+        )
+    return None
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the client already holds this ETag, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -1,37 +1,85 @@
 """FastAPI dependencies"""
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
-from ..database import get_db
+from typing import TYPE_CHECKING, NamedTuple, Optional
+from concurrent.futures import Executor
+from ..database import get_async_db, get_db
 from ..models.user import User, UserType
 from .security import decode_token
 
+if TYPE_CHECKING:
+    from ..services.chi_audit_simulator import CHIAuditSimulator
+
 security = HTTPBearer()
 
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    token = credentials.credentials
-    payload = decode_token(token)
+
+class CurrentUser(NamedTuple):
+    """Authenticated user as described by the access token"""
+    id: int
+    email: str
+    user_type: UserType
+    is_active: bool
+
+
+def get_password_pool(request: Request) -> Executor:
+    """Executor for bcrypt hashing and verification"""
+    return request.app.state.password_pool
+
+
+def _access_token_payload(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decode a bearer access token or raise 401"""
+    payload = decode_token(credentials.credentials)
     
-    if payload is None:
+    if payload is None or payload.get("type") != "access" or payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    return payload
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> CurrentUser:
+    """Get current authenticated user from token claims, without a DB read"""
+    payload = _access_token_payload(credentials)
+    
+    try:
+        user = CurrentUser(
+            id=int(payload["sub"]),
+            email=payload["email"],
+            user_type=UserType(payload["role"]),
+            is_active=payload["active"]
+        )
+    except (KeyError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    
+    return user
+
+
+def get_current_user_db(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user loaded from the DB, for writes and fresh state"""
+    payload = _access_token_payload(credentials)
+    
+    user = db.execute(_USER_BY_ID, {"user_id": int(payload["sub"])}).scalar_one_or_none()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,8 +96,8 @@ def get_current_user(
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -58,7 +106,7 @@ def get_current_active_user(
 
 def require_role(*allowed_roles: UserType):
     """Dependency to check user role"""
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    def role_checker(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
         if current_user.user_type not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -66,3 +114,12 @@ def require_role(*allowed_roles: UserType):
             )
         return current_user
     return role_checker
+
+
+def get_chi_audit_simulator(
+    db: AsyncSession = Depends(get_async_db)
+) -> "CHIAuditSimulator":
+    """Shared CHI audit simulator bound to the request's session"""
+    # Imported on first use so NumPy loads only in processes that audit
+    from ..services.chi_audit_simulator import shared_simulator
+    return shared_simulator().bind(db)
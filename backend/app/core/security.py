@@ -1,23 +1,46 @@
 """Security utilities - JWT, password hashing, MFA"""
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from threading import Lock
+from time import time
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import jwt
+import bcrypt
 import pyotp
 from ..config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Verified token payloads, so repeat requests skip the HMAC check
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL = 30  # seconds
+
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_token_cache_lock = Lock()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against a bcrypt hash"""
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password with bcrypt"""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(settings.BCRYPT_ROUNDS)).decode()
+
+
+def access_token_claims(user) -> dict:
+    """
+    Claims identifying a user in access tokens
+
+    Carries enough for authorization without a database read; keep the
+    token lifetime short so a deactivation takes effect quickly.
+    """
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.user_type.value,
+        "active": user.is_active,
+    }
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -45,12 +68,32 @@ def create_refresh_token(data: dict) -> str:
 
 
 def decode_token(token: str) -> dict:
-    """Decode and verify JWT token"""
+    """
+    Decode and verify JWT token
+
+    Valid payloads are cached for TOKEN_CACHE_TTL seconds, never past the
+    token's own expiry. Callers must not mutate the returned dict.
+    """
+    now = time()
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is not None:
+            if entry[0] > now:
+                _token_cache.move_to_end(token)
+                return entry[1]
+            del _token_cache[token]
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+    except jwt.PyJWTError:
         return None
+    
+    expires_at = min(now + TOKEN_CACHE_TTL, payload.get("exp", now))
+    with _token_cache_lock:
+        _token_cache[token] = (expires_at, payload)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return payload
 
 
 def generate_mfa_secret() -> str:
@@ -58,29 +101,52 @@ def generate_mfa_secret() -> str:
     return pyotp.random_base32()
 
 
+@lru_cache(maxsize=10_000)
+def _totp(secret: str) -> pyotp.TOTP:
+    """TOTP generator for a secret, reused across verifications"""
+    return pyotp.TOTP(secret)
+
+
 def verify_mfa_token(secret: str, token: str) -> bool:
     """Verify MFA TOTP token"""
-    totp = pyotp.TOTP(secret)
-    return totp.verify(token, valid_window=1)
+    return _totp(secret).verify(token, valid_window=1)
 
 
 def get_mfa_provisioning_uri(secret: str, email: str) -> str:
     """Get provisioning URI for MFA setup"""
-    totp = pyotp.TOTP(secret)
-    return totp.provisioning_uri(name=email, issuer_name=settings.MFA_ISSUER)
+    return _totp(secret).provisioning_uri(name=email, issuer_name=settings.MFA_ISSUER)
+
+
+# Digit sum of 2*d for each digit d, used by the national ID checksum
+_DOUBLED_DIGIT_SUM = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+# Per-byte lane constants for checking all ten ID bytes in one integer op
+_LANES = int.from_bytes(b"\x01" * 10, "big")
+_HIGH_BITS = _LANES * 0x80
+_ZERO_CHARS = _LANES * 0x30
+_ABOVE_NINE = _LANES * 0x46
 
 
 def validate_saudi_national_id(national_id: str) -> bool:
-    """Validate Saudi National ID or Iqama number format"""
-    if not national_id or len(national_id) != 10:
+    """Validate Saudi National ID or Iqama number format and check digit"""
+    if not national_id:
         return False
     
-    if not national_id.isdigit():
-        return False
+    digits = national_id.encode()
     
     # Saudi National ID starts with 1
     # Iqama starts with 2
-    if not national_id.startswith(('1', '2')):
+    if len(digits) != 10 or digits[0] not in b"12":
+        return False
+    
+    # SWAR digit check: a lane's high bit ends up set if its byte is below
+    # '0', above '9' or non-ASCII; setting the high bits first stops borrows
+    # crossing lanes
+    v = int.from_bytes(digits, "big")
+    if ((((v | _HIGH_BITS) - _ZERO_CHARS) ^ _HIGH_BITS) | (v + _ABOVE_NINE) | v) & _HIGH_BITS:
         return False
     
-    return True
+    # Luhn checksum: digits at even offsets are doubled via the lookup table
+    total = sum(_DOUBLED_DIGIT_SUM[d - 48] for d in digits[0::2])
+    total += sum(digits[1::2]) - 48 * 5
+    return total % 10 == 0
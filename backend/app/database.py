@@ -1,22 +1,80 @@
 """Database configuration and session management"""
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+# Async drivers for the sync URL schemes used in settings
+_ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a sync database URL to use its async driver"""
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+_IS_SQLITE = "sqlite" in settings.DATABASE_URL
+
+# SQLite uses file-level pools that reject sizing arguments
+_POOL_OPTIONS = {} if _IS_SQLITE else {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+}
+
+# psycopg2 sends INSERT executemany as multi-row VALUES pages and other
+# executemany statements through execute_batch; asyncpg batches natively
+_EXECUTEMANY_OPTIONS = {
+    "executemany_mode": "values_plus_batch",
+    "insertmanyvalues_page_size": 1000,
+    "executemany_batch_page_size": 500,
+} if settings.DATABASE_URL.startswith(("postgresql://", "postgresql+psycopg2://")) else {}
+
 # Create engine
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG
+    connect_args={"check_same_thread": False} if _IS_SQLITE else {},
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    query_cache_size=2000,
+    **_POOL_OPTIONS,
+    **_EXECUTEMANY_OPTIONS
+)
+
+# Async engine for endpoints that run on the event loop
+async_engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL),
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    query_cache_size=2000,
+    **_POOL_OPTIONS
 )
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
 
+# Dialect INSERT constructs, which support ON CONFLICT
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def dialect_insert(dialect_name: str):
+    """INSERT construct with ON CONFLICT support for a dialect"""
+    return _INSERTS[dialect_name]
+
 
 def get_db():
     """Dependency for database sessions"""
@@ -27,6 +85,22 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for async database sessions"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """
+    Dependency for handlers that open their own sessions
+
+    Streaming responses outlive get_async_db's session, which closes
+    before the body is sent.
+    """
+    return AsyncSessionLocal
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
@@ -1,9 +1,13 @@
 """GIVC Core Academy FastAPI Application"""
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 from .config import settings
 from .database import init_db
+from .core.cache import create_response_cache
+from .services.payment_service import close_stripe_client
 
 
 @asynccontextmanager
@@ -13,9 +17,15 @@ async def lifespan(app: FastAPI):
     print("Initializing database...")
     init_db()
     print("Database initialized successfully")
+    app.state.cache = create_response_cache()
+    # bcrypt is CPU-bound; a process pool spreads hashing across cores
+    app.state.password_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
     yield
     # Shutdown
     print("Shutting down...")
+    await app.state.cache.aclose()
+    await close_stripe_client()
+    app.state.password_pool.shutdown(wait=False, cancel_futures=True)
 
 
 app = FastAPI(
@@ -25,7 +35,8 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration
@@ -67,3 +78,19 @@ async def health_check():
         "app_name": settings.APP_NAME,
         "version": settings.APP_VERSION
     }
+
+
+if __name__ == "__main__":
+    import os
+    import uvicorn
+    # One process per core in production; each worker builds its own pools in lifespan
+    workers = 1 if settings.DEBUG else (os.cpu_count() or 2)
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=settings.DEBUG,
+        loop="uvloop",
+        http="httptools",
+        workers=workers
+    )
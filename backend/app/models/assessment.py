@@ -1,5 +1,5 @@
 """Assessment models"""
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, JSON, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, JSON, Float, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -91,6 +91,9 @@ class Question(Base):
 class UserAssessment(Base):
     """User assessment attempts and results"""
     __tablename__ = "user_assessments"
+    __table_args__ = (
+        Index("ix_user_assessments_user_assessment", "user_id", "assessment_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,5 +1,5 @@
 """Enrollment models"""
-from sqlalchemy import Column, Integer, String, DateTime, Enum, JSON, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Enum, JSON, Float, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -26,6 +26,10 @@ class EnrollmentStatus(str, enum.Enum):
 class Enrollment(Base):
     """User course enrollment"""
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # Leading user_id also serves per-user listings
+        Index("ix_enrollments_user_course_status", "user_id", "course_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -68,3 +72,16 @@ class Enrollment(Base):
     # Relationships
     user = relationship("User", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
+
+
+# At most one open enrollment per user and course; create_enrollment
+# relies on this index for its ON CONFLICT DO NOTHING
+_OPEN_ENROLLMENT = Enrollment.status.in_([EnrollmentStatus.PENDING, EnrollmentStatus.ACTIVE])
+Index(
+    "uq_enrollments_user_course_open",
+    Enrollment.user_id,
+    Enrollment.course_id,
+    unique=True,
+    postgresql_where=_OPEN_ENROLLMENT,
+    sqlite_where=_OPEN_ENROLLMENT
+)
@@ -1,10 +1,17 @@
 """Payment and subscription models"""
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Float, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Computed, Integer, String, DateTime, Enum, Float, ForeignKey, Boolean, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
+from ..config import settings
 from ..database import Base
 
+# Generated VAT is computed in integer halalas with the same half-up
+# arithmetic as payment_service.vat_minor_units. The amount is rounded as
+# NUMERIC because PostgreSQL rounds double precision half to even
+_AMOUNT_MINOR = "CAST(ROUND(CAST(amount AS NUMERIC) * 100) AS BIGINT)"
+_VAT_MINOR = f"({_AMOUNT_MINOR} * {round(settings.VAT_RATE * 10_000)} + 5000) / 10000"
+
 
 class PaymentStatus(str, enum.Enum):
     """Payment status"""
@@ -20,12 +27,13 @@ class Payment(Base):
     __tablename__ = "payments"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     # Payment details
     amount = Column(Float, nullable=False)  # in SAR
-    vat_amount = Column(Float)  # 15% VAT
-    total_amount = Column(Float, nullable=False)
+    # Generated by the database from amount; never written by the app
+    vat_amount = Column(Float, Computed(f"{_VAT_MINOR} / 100.0", persisted=True))
+    total_amount = Column(Float, Computed(f"({_AMOUNT_MINOR} + {_VAT_MINOR}) / 100.0", persisted=True))
     currency = Column(String(3), default="SAR")
     
     # Payment processing
@@ -0,0 +1,35 @@
+"""Enrollment schemas"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from ..models.enrollment import EnrollmentStatus, SubscriptionTier
+
+
+class EnrollmentCreate(BaseModel):
+    """Enrollment of one user in one course, as submitted in a bulk request"""
+    user_id: int
+    course_id: int
+    subscription_tier: SubscriptionTier = SubscriptionTier.CORPORATE
+    modality: str
+
+
+class BulkEnrollmentResponse(BaseModel):
+    """Outcome of a bulk enrollment"""
+    created: int
+    skipped: int  # duplicates and users already enrolled
+
+
+class QueuedEnrollmentResponse(BaseModel):
+    """Outcome of a queued bulk enrollment"""
+    queued: int
+    skipped: int  # duplicates and users already enrolled
+
+
+class EnrollmentSummary(BaseModel):
+    """Enrollment row as listed for its user"""
+    id: int
+    course_id: int
+    subscription_tier: SubscriptionTier
+    status: EnrollmentStatus
+    progress_percentage: Optional[float]
+    enrolled_at: Optional[datetime]
@@ -0,0 +1,58 @@
+"""Payment schemas"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from ..models.payment import PaymentStatus
+
+
+class PaymentSummary(BaseModel):
+    """Payment row as listed for its user"""
+    id: int
+    enrollment_id: Optional[int]
+    total_amount: float
+    currency: Optional[str]
+    status: Optional[PaymentStatus]
+    created_at: Optional[datetime]
+    paid_at: Optional[datetime]
+
+
+class CheckoutRequest(BaseModel):
+    """Pending enrollments paid for together"""
+    enrollment_ids: List[int] = Field(min_length=1, max_length=50)
+
+
+class CheckoutItem(BaseModel):
+    """One enrollment in a checkout, priced for its tier"""
+    enrollment_id: int
+    amount: float
+
+
+class CheckoutResponse(BaseModel):
+    """Payment and Stripe intent for a checkout"""
+    payment_id: int
+    payment_intent_id: str
+    client_secret: str
+    items: List[CheckoutItem]
+    amount: float
+    vat_amount: float
+    total_amount: float
+    currency: str
+
+
+class CorporateCheckoutRequest(BaseModel):
+    """Seats of one course bought together at the corporate price"""
+    course_id: int
+    seat_count: int = Field(ge=1, le=10_000)
+
+
+class CorporateCheckoutResponse(BaseModel):
+    """Discounted quote and Stripe intent for a corporate checkout"""
+    payment_id: int
+    payment_intent_id: str
+    client_secret: str
+    seat_count: int
+    subtotal: float
+    discount_amount: float
+    vat_amount: float
+    total_amount: float
+    currency: str
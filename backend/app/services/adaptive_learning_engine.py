@@ -1,64 +1,157 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+import hashlib
+import zlib
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestRegressor
+import orjson
+import redis.asyncio as redis
+from ..config import settings
+from ..core.cache import ResponseCache
+
+# Distinct feature vectors whose learning plans are kept per engine
+PLAN_CACHE_SIZE = 4096
+
+# Competencies scored in learner profiles, in the skill-gap model's output order
+SKILL_NAMES = (
+    "medical_terminology", "anatomy_knowledge", "sbs_coding",
+    "icd_10_am", "chi_regulations"
+)
+
+
+@lru_cache(maxsize=None)
+def _load_model(path: str):
+    """Unpickle a trained model once per process, memory-mapping its arrays"""
+    import joblib
+    return joblib.load(path, mmap_mode="r")
+
+
+class _OnnxRegressor:
+    """predict() over an ONNX export of the skill-gap regressor"""
+
+    def __init__(self, path: str):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: features.astype(np.float32)})[0]
+
+
+@lru_cache(maxsize=None)
+def _load_skill_gap_model(path: str):
+    """Skill-gap regressor from an ONNX export or a joblib pickle, loaded once"""
+    if path.endswith(".onnx"):
+        return _OnnxRegressor(path)
+    return _load_model(path)
+
+
+@lru_cache(maxsize=None)
+def _cluster_centers(path: str) -> np.ndarray:
+    """Centers of a fitted KMeans, as a contiguous float32 array"""
+    return np.ascontiguousarray(_load_model(path).cluster_centers_, dtype=np.float32)
+
 
 class AdaptiveLearningEngine:
     """AI-powered adaptive learning path engine"""
 
-    def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.clusterer = KMeans(n_clusters=5, random_state=42)
+    def __init__(
+        self,
+        cluster_model_path: Optional[str] = settings.LEARNER_CLUSTER_MODEL_PATH,
+        skill_gap_model_path: Optional[str] = settings.SKILL_GAP_MODEL_PATH,
+        redis_client: Optional[redis.Redis] = None
+    ):
+        # Models are trained offline; requests only run inference
+        self.model = _load_skill_gap_model(skill_gap_model_path) if skill_gap_model_path else None
+        self.centers = _cluster_centers(cluster_model_path) if cluster_model_path else None
+        self._plan = lru_cache(maxsize=PLAN_CACHE_SIZE)(self._plan_for)
+        # Plans shared across workers, scoped to the models that produced them
+        self.cache = (
+            ResponseCache(redis_client, ttl=settings.LEARNING_PATH_CACHE_TTL)
+            if redis_client is not None else None
+        )
+        self._models_key = hashlib.blake2b(
+            f"{cluster_model_path}:{skill_gap_model_path}".encode(), digest_size=4
+        ).hexdigest()
 
     async def generate_learning_path(self, learner_profile: Dict) -> Dict:
         """Generate a personalized learning path based on learner profile"""
         # 1. Feature extraction
         features = self._extract_features(learner_profile)
-        # 2. Predict skill gaps
-        skill_gap_scores = self._predict_skill_gaps(features)
-        # 3. Cluster learners for similar pathways
-        cluster_id = self._assign_cluster(features)
-        # 4. Build path
-        path = self._build_path(skill_gap_scores, cluster_id)
+        # 2-4. Skill gaps, cluster and path; learners with identical
+        # features share one cached plan
+        skill_gap_scores, cluster_id, path = await self._cached_plan(features.tobytes())
         return {
             "learner_id": learner_profile.get("learner_id"),
-            "learning_path": path,
-            "skill_gaps": skill_gap_scores,
+            "learning_path": [dict(step) for step in path],
+            "skill_gaps": dict(skill_gap_scores),
             "cluster_id": cluster_id,
             "generated_at": datetime.utcnow().isoformat()
         }
 
+    async def _cached_plan(self, key: bytes) -> Tuple[Dict, int, List[Dict]]:
+        """Plan from Redis when another worker already built it, else computed here"""
+        if self.cache is None:
+            return self._plan(key)
+        cache_key = (
+            f"learning-path:{self._models_key}:"
+            f"{hashlib.blake2b(key, digest_size=8).hexdigest()}"
+        )
+        body = await self.cache.get(cache_key)
+        if body is not None:
+            return tuple(orjson.loads(body))
+        plan = self._plan(key)
+        await self.cache.set(cache_key, plan)
+        return plan
+
+    def _plan_for(self, key: bytes) -> Tuple[Dict, int, List[Dict]]:
+        features = np.frombuffer(key).reshape(1, -1)
+        # 2. Predict skill gaps
+        gaps = self._predict_skill_gaps(features)
+        # 3. Cluster learners for similar pathways
+        cluster_id = self._assign_cluster(features)
+        # 4. Build path
+        skill_gap_scores = {name: float(gap) for name, gap in zip(SKILL_NAMES, gaps)}
+        return skill_gap_scores, cluster_id, self._build_path(gaps, cluster_id)
+
     def _extract_features(self, profile: Dict) -> np.ndarray:
         # Simplified feature vector: years_experience, competency scores, region encoding
-        years = profile.get("years_experience", 0)
-        comps = [profile.get(key, 5) for key in [
-            "medical_terminology", "anatomy_knowledge", "sbs_coding",
-            "icd_10_am", "chi_regulations"
-        ]]
-        region = hash(profile.get("region", "")) % 1000 / 1000.0
-        return np.array([years] + comps + [region]).reshape(1, -1)
-
-    def _predict_skill_gaps(self, features: np.ndarray) -> Dict:
-        # Dummy prediction using random values for illustration
-        preds = np.random.rand(5)
-        skill_names = ["medical_terminology", "anatomy_knowledge", "sbs_coding", "icd_10_am", "chi_regulations"]
-        return {name: round(float(p) * 10, 2) for name, p in zip(skill_names, preds)}
+        # Whole years and a normalized region, so near-identical profiles
+        # share a cached plan
+        years = round(profile.get("years_experience", 0))
+        comps = [profile.get(key, 5) for key in SKILL_NAMES]
+        # crc32 rather than hash(): str hashes are salted per process, so the
+        # same region would land in a different bucket on every worker
+        region = zlib.crc32(profile.get("region", "").strip().lower().encode()) % 1000 / 1000.0
+        return np.array([years] + comps + [region], dtype=np.float64).reshape(1, -1)
+
+    def _predict_skill_gaps(self, features: np.ndarray) -> np.ndarray:
+        # Gap per skill in SKILL_NAMES order, rounded to 2 places
+        if self.model is not None:
+            preds = self.model.predict(features)[0]
+        else:
+            # Dummy prediction using random values for illustration
+            preds = np.random.rand(len(SKILL_NAMES)) * 10
+        return np.round(np.asarray(preds, dtype=np.float64), 2)
 
     def _assign_cluster(self, features: np.ndarray) -> int:
-        # Fit clusterer on the fly (in production would be pre-trained)
-        self.clusterer.fit(features)
-        return int(self.clusterer.labels_[0])
-
-    def _build_path(self, skill_gaps: Dict, cluster_id: int) -> List[Dict]:
-        # Create a simple sequential path based on highest gaps
-        sorted_skills = sorted(skill_gaps.items(), key=lambda x: x[1], reverse=True)
-        path = []
-        for idx, (skill, gap) in enumerate(sorted_skills):
-            path.append({
-                "step": idx + 1,
-                "skill": skill,
-                "estimated_hours": max(1, int(gap)),
-                "module_id": f"MOD-{cluster_id}-{skill.upper()}"
-            })
-        return path
+        # Nearest pre-trained center; same answer as KMeans.predict without
+        # sklearn's per-call input validation
+        if self.centers is None:
+            return 0
+        distances = ((features.astype(np.float32) - self.centers) ** 2).sum(axis=1)
+        return int(np.argmin(distances))
+
+    def _build_path(self, gaps: np.ndarray, cluster_id: int) -> List[Dict]:
+        # Create a simple sequential path based on highest gaps; a stable
+        # sort keeps tied skills in SKILL_NAMES order
+        order = np.argsort(-gaps, kind="stable")
+        return [
+            {
+                "step": step,
+                "skill": SKILL_NAMES[i],
+                "estimated_hours": max(1, int(gaps[i])),
+                "module_id": f"MOD-{cluster_id}-{SKILL_NAMES[i].upper()}"
+            }
+            for step, i in enumerate(order, start=1)
+        ]
@@ -1,30 +1,96 @@
 """Analytics Service for dashboard metrics"""
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from functools import wraps
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Optional
+import orjson
+import redis.asyncio as redis
+from ..core.cache import ResponseCache
 from ..models.user import User, UserType
 from ..models.enrollment import Enrollment, EnrollmentStatus
 from ..models.payment import Payment, PaymentStatus
 from ..models.course import Course
 
+# Seconds a dashboard figure is served from cache before re-querying
+METRICS_TTL = 60
+
+
+def _count_users(*criteria):
+    return select(func.count()).select_from(User).where(*criteria).scalar_subquery()
+
+
+# Each metric set is one statement: enrollment aggregates with the other
+# tables' figures as scalar subqueries
+_INDIVIDUAL_METRICS = select(
+    _count_users(User.user_type == UserType.STUDENT),
+    func.count(case((Enrollment.status == EnrollmentStatus.ACTIVE, 1))),
+    func.count(case((Enrollment.status == EnrollmentStatus.COMPLETED, 1)))
+).select_from(Enrollment)
+
+_CORPORATE_METRICS = select(
+    _count_users(User.user_type == UserType.CORPORATE),
+    func.count(case((Enrollment.is_bulk_enrollment == True, 1)))
+).select_from(Enrollment)
+
+_PLATFORM_METRICS = select(
+    _count_users(),
+    select(func.count()).select_from(Course).where(Course.is_active == True).scalar_subquery(),
+    func.count(Enrollment.id),
+    select(func.sum(Payment.total_amount)).where(
+        Payment.status == PaymentStatus.COMPLETED
+    ).scalar_subquery()
+).select_from(Enrollment)
+
+
+MetricsQuery = Callable[[AsyncSession], Awaitable[Dict]]
+CachedMetricsQuery = Callable[[AsyncSession, Optional[redis.Redis]], Awaitable[Dict]]
+
+
+def _cached(name: str) -> Callable[[MetricsQuery], CachedMetricsQuery]:
+    """
+    Serve a metrics method's result from cache for METRICS_TTL seconds
+
+    With a Redis client the figures live under analytics:{name}:v1 and
+    are shared by every worker; without one they are kept in memory.
+    """
+    key = f"analytics:{name}:v1"
+    
+    def decorator(fn: MetricsQuery) -> CachedMetricsQuery:
+        entry = {}
+        
+        @wraps(fn)
+        async def wrapper(db: AsyncSession, redis_client: Optional[redis.Redis] = None) -> Dict:
+            if redis_client is not None:
+                cache = ResponseCache(redis_client, ttl=METRICS_TTL)
+                cached = await cache.get(key)
+                if cached is not None:
+                    return orjson.loads(cached)
+                result = await fn(db)
+                await cache.set(key, result)
+                return result
+            
+            cached = entry.get("value")
+            if cached is None or cached[0] < monotonic():
+                cached = entry["value"] = (monotonic() + METRICS_TTL, await fn(db))
+            return dict(cached[1])
+        
+        wrapper.cache_clear = entry.clear
+        return wrapper
+    
+    return decorator
+
 
 class AnalyticsService:
     """Service for generating analytics and metrics"""
     
     @staticmethod
-    def get_individual_learner_metrics(db: Session) -> Dict:
+    @_cached("individual")
+    async def get_individual_learner_metrics(db: AsyncSession) -> Dict:
         """Get metrics for individual learners"""
-        total_students = db.query(User).filter(
-            User.user_type == UserType.STUDENT
-        ).count()
-        
-        active_enrollments = db.query(Enrollment).filter(
-            Enrollment.status == EnrollmentStatus.ACTIVE
-        ).count()
-        
-        completed_enrollments = db.query(Enrollment).filter(
-            Enrollment.status == EnrollmentStatus.COMPLETED
-        ).count()
+        total_students, active_enrollments, completed_enrollments = (
+            (await db.execute(_INDIVIDUAL_METRICS)).one()
+        )
         
         completion_rate = (
             (completed_enrollments / active_enrollments * 100)
@@ -39,15 +105,10 @@ class AnalyticsService:
         }
     
     @staticmethod
-    def get_corporate_metrics(db: Session) -> Dict:
+    @_cached("corporate")
+    async def get_corporate_metrics(db: AsyncSession) -> Dict:
         """Get metrics for corporate accounts"""
-        corporate_users = db.query(User).filter(
-            User.user_type == UserType.CORPORATE
-        ).count()
-        
-        corporate_enrollments = db.query(Enrollment).filter(
-            Enrollment.is_bulk_enrollment == True
-        ).count()
+        corporate_users, corporate_enrollments = (await db.execute(_CORPORATE_METRICS)).one()
         
         return {
             "corporate_accounts": corporate_users,
@@ -55,22 +116,16 @@ class AnalyticsService:
         }
     
     @staticmethod
-    def get_platform_metrics(db: Session) -> Dict:
+    @_cached("platform")
+    async def get_platform_metrics(db: AsyncSession) -> Dict:
         """Get overall platform metrics"""
-        total_users = db.query(User).count()
-        total_courses = db.query(Course).filter(Course.is_active == True).count()
-        total_enrollments = db.query(Enrollment).count()
-        
-        # Revenue calculation
-        total_revenue = db.query(
-            func.sum(Payment.total_amount)
-        ).filter(
-            Payment.status == PaymentStatus.COMPLETED
-        ).scalar() or 0
+        total_users, total_courses, total_enrollments, total_revenue = (
+            (await db.execute(_PLATFORM_METRICS)).one()
+        )
         
         return {
             "total_users": total_users,
             "total_courses": total_courses,
             "total_enrollments": total_enrollments,
-            "total_revenue_sar": round(total_revenue, 2)
+            "total_revenue_sar": round(total_revenue or 0, 2)
         }
@@ -1,15 +1,175 @@
 import asyncio
-from typing import Dict, List, Optional, Tuple
+import copy
+import heapq
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from time import monotonic
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import numpy as np
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.audit import (
-    AuditFramework, AuditSample, AuditFinding, 
-    CorrectiveActionPlan, ProviderProfile
+from app.services.fraud_detection import FraudDetectionEngine
+
+# Claims whose record-level validators may be in flight at once
+AUDIT_CONCURRENCY = 32
+# Claims audited per batch; only aggregates outlive a batch
+AUDIT_BATCH_SIZE = 500
+# Full case results kept for the report, highest penalties first
+WORST_CASES_KEPT = 20
+
+SEVERITY_WEIGHTS = {"low": 1, "medium": 3, "high": 5, "critical": 10}
+
+# Fixed validation errors as (code, severity, Arabic, English), in the
+# column order used by _audit_cases
+_ERROR_TEMPLATES = (
+    ("SBS001", "critical",
+     "الكود غير موجود في نظام الفوترة السعودي",
+     "Code does not exist in Saudi Billing System"),
+    ("SBS002", "high",
+     "عدم توافق الإجراء مع التشخيص",
+     "Procedure not appropriate for diagnosis"),
+    ("SBS003", "medium",
+     "توثيق سريري غير مكتمل",
+     "Incomplete clinical documentation"),
+    ("SBS005", "medium",
+     "انتهاك قواعد التوقيت للإجراءات المتعددة",
+     "Violation of timing rules for multiple procedures"),
+)
+
+_FIXED_ERROR_PENALTIES = np.array(
+    [SEVERITY_WEIGHTS[severity] for _, severity, _, _ in _ERROR_TEMPLATES], dtype=np.int64
 )
 
+def _make_error(code: str, severity: str, description_ar: str, description_en: str) -> Dict:
+    """Audit finding with its severity-weighted penalty"""
+    return {
+        "code": code,
+        "description_ar": description_ar,
+        "description_en": description_en,
+        "severity": severity,
+        "penalty_points": SEVERITY_WEIGHTS[severity]
+    }
+
+# Findings that trigger the documentation and billing-system corrective actions
+DOCUMENTATION_ERROR_CODES = ("SBS003",)
+SYSTEM_ERROR_CODES = ("SBS001",)
+
+# Claim-derived risk inputs for one provider in a single round trip: unlisted
+# code ratio, per-code volumes, month-over-month revenue growth and the
+# provider's average claim against its regional peers
+_PROVIDER_CLAIM_STATS = text("""
+    WITH provider_claims AS (
+        SELECT sbs_code, amount, is_unlisted,
+               date_trunc('month', service_date) AS month
+        FROM claims
+        WHERE provider_id = :provider_id
+    ),
+    monthly AS (
+        SELECT month, revenue,
+               revenue / NULLIF(LAG(revenue) OVER (ORDER BY month), 0) - 1 AS growth
+        FROM (
+            SELECT month, SUM(amount) AS revenue
+            FROM provider_claims
+            GROUP BY month
+        ) totals
+    ),
+    codes AS (
+        SELECT sbs_code, COUNT(*) AS claim_count, AVG(amount) AS avg_amount
+        FROM provider_claims
+        GROUP BY sbs_code
+    ),
+    peers AS (
+        SELECT provider_id,
+               AVG(amount) AS avg_amount,
+               AVG(AVG(amount)) OVER (PARTITION BY region) AS region_avg_amount,
+               STDDEV_POP(AVG(amount)) OVER (PARTITION BY region) AS region_stddev_amount
+        FROM claims
+        GROUP BY provider_id, region
+    )
+    SELECT
+        (SELECT COUNT(*) FILTER (WHERE is_unlisted)::float / NULLIF(COUNT(*), 0)
+         FROM provider_claims) AS unlisted_ratio,
+        (SELECT json_agg(json_build_object(
+                    'sbs_code', sbs_code,
+                    'claim_count', claim_count,
+                    'avg_amount', avg_amount))
+         FROM codes) AS coding_patterns,
+        (SELECT json_agg(json_build_object(
+                    'month', month,
+                    'revenue', revenue,
+                    'growth', growth) ORDER BY month)
+         FROM monthly) AS revenue_trend,
+        (SELECT json_build_object(
+                    'avg_amount', avg_amount,
+                    'region_avg_amount', region_avg_amount,
+                    'region_stddev_amount', region_stddev_amount)
+         FROM peers
+         WHERE provider_id = :provider_id) AS peer_benchmark
+""")
+
+# SBS reference data changes with catalogue releases, so a process keeps
+# each version's code list and necessity pairs for an hour
+SBS_CODES_TTL = 3600
+SBS_CODES_CACHE_SIZE = 8
+
+_VALID_SBS_CODES = text("SELECT code FROM sbs_codes WHERE version = :version")
+# Diagnosis-procedure pairs that establish medical necessity
+_MEDICAL_NECESSITY_PAIRS = text(
+    "SELECT diagnosis_code, sbs_code FROM sbs_medical_necessity WHERE version = :version"
+)
+
+_reference_sets: "OrderedDict[Tuple[str, str], Tuple[float, FrozenSet]]" = OrderedDict()
+
+async def _load_reference_set(db: AsyncSession, statement, version: str) -> FrozenSet:
+    """
+    Rows of a per-version reference query, read at most once per TTL
+
+    Single-column rows are stored as bare values, wider rows as tuples.
+    """
+    key = (statement.text, version)
+    cached = _reference_sets.get(key)
+    if cached is None or cached[0] < monotonic():
+        result = await db.execute(statement, {"version": version})
+        rows = frozenset(row[0] if len(row) == 1 else tuple(row) for row in result)
+        cached = _reference_sets[key] = (monotonic() + SBS_CODES_TTL, rows)
+    _reference_sets.move_to_end(key)
+    while len(_reference_sets) > SBS_CODES_CACHE_SIZE:
+        _reference_sets.popitem(last=False)
+    return cached[1]
+
+async def _load_valid_sbs_codes(db: AsyncSession, version: str) -> FrozenSet[str]:
+    """Valid codes for an SBS version"""
+    return await _load_reference_set(db, _VALID_SBS_CODES, version)
+
+async def _load_medical_necessity_pairs(db: AsyncSession, version: str) -> FrozenSet[Tuple[str, str]]:
+    """(diagnosis_code, sbs_code) pairs accepted as medically necessary"""
+    return await _load_reference_set(db, _MEDICAL_NECESSITY_PAIRS, version)
+
+# Maximum penalty a single case can accumulate
+MAX_PENALTY_PER_CASE = 25
+
+def compliance_score(total_penalty_points: int, sample_size: int) -> float:
+    """CHI compliance score (0-100) for the penalties over a sample"""
+    max_total_penalty = sample_size * MAX_PENALTY_PER_CASE
+    if max_total_penalty == 0:
+        return 100.0
+    raw_score = 100 - total_penalty_points * 100 / max_total_penalty
+    if raw_score > 90:
+        return min(100.0, raw_score * 1.05)  # Bonus for excellent compliance
+    if raw_score > 70:
+        return raw_score
+    return max(0.0, raw_score * 0.9)  # Penalty for poor compliance
+
+def _sample_claims(rng: np.random.Generator, pool: List[Dict], size: int) -> List[Dict]:
+    """Sample up to size claims without replacement by drawing positions"""
+    size = min(size, len(pool))
+    if size <= 0:
+        return []
+    return [pool[i] for i in rng.choice(len(pool), size=size, replace=False)]
+
 class AuditRiskLevel(str, Enum):
     LOW = 'low'           # Compliance score > 90%
     MEDIUM = 'medium'     # Compliance score 75-90%
@@ -27,6 +187,77 @@ class AuditConfiguration:
     region: str = "Riyadh"
     sbs_version: str = "2.0"
 
+# Per-case columns kept for every claim, for cross-case fraud statistics
+_CASE_COLUMNS = (
+    ("claim_id", object),
+    ("patient_id", object),
+    ("sbs_code", object),
+    ("billed_amount", np.float64),
+    ("penalty_points", np.int32),
+    ("has_errors", np.bool_),
+)
+
+@dataclass
+class AuditAggregate:
+    """
+    Audited cases as parallel column arrays plus running error counters
+
+    Columns are preallocated for the sample size; only the worst cases
+    keep their full findings.
+    """
+    capacity: int
+    worst_case_limit: int = WORST_CASES_KEPT
+    case_count: int = 0
+    error_counts: Counter = field(default_factory=Counter)
+    severity_counts: Counter = field(default_factory=Counter)
+    severity_penalties: Counter = field(default_factory=Counter)
+    _columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    _worst: List[Tuple[int, int, Dict]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._columns = {
+            name: np.empty(self.capacity, dtype=dtype) for name, dtype in _CASE_COLUMNS
+        }
+
+    def add(self, case_result: Dict) -> None:
+        i = self.case_count
+        for name, column in self._columns.items():
+            column[i] = case_result[name]
+        self.case_count += 1
+        if not case_result["has_errors"]:
+            return
+        for e in case_result["errors"]:
+            self.error_counts[e["code"]] += 1
+            self.severity_counts[e["severity"]] += 1
+            self.severity_penalties[e["severity"]] += e["penalty_points"]
+        # case_count breaks penalty ties so result dicts are never compared
+        entry = (case_result["penalty_points"], self.case_count, case_result)
+        if len(self._worst) < self.worst_case_limit:
+            heapq.heappush(self._worst, entry)
+        else:
+            heapq.heappushpop(self._worst, entry)
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Filled part of each case column"""
+        return {name: column[:self.case_count] for name, column in self._columns.items()}
+
+    @property
+    def total_penalty_points(self) -> int:
+        return int(self._columns["penalty_points"][:self.case_count].sum())
+
+    @property
+    def cases_with_errors(self) -> int:
+        return int(self._columns["has_errors"][:self.case_count].sum())
+
+    @property
+    def has_severe_errors(self) -> bool:
+        return self.severity_counts["high"] > 0 or self.severity_counts["critical"] > 0
+
+    @property
+    def worst_cases(self) -> List[Dict]:
+        return [case for _, _, case in sorted(self._worst, reverse=True)]
+
 class CHIAuditSimulator:
     """
     Complete CHI Audit Simulation Engine implementing:
@@ -36,55 +267,73 @@ class CHIAuditSimulator:
     - Arabic/English Audit Reporting
     """
 
-    def __init__(self, db_session: AsyncSession):
+    def __init__(
+        self,
+        db_session: Optional[AsyncSession] = None,
+        fraud_engine: Optional[FraudDetectionEngine] = None
+    ):
         self.db = db_session
         self.risk_weights = self._load_risk_weights()
+        self.fraud_engine = fraud_engine or FraudDetectionEngine()
+
+    def bind(self, db_session: AsyncSession) -> "CHIAuditSimulator":
+        """Copy of this simulator on a request's session, sharing loaded state"""
+        bound = copy.copy(self)
+        bound.db = db_session
+        return bound
 
     async def simulate_full_audit(
         self, 
         config: AuditConfiguration
     ) -> Dict:
         """Execute complete CHI audit simulation"""
-        audit_id = f"CHI-AUDIT-{datetime.now().strftime('%Y%m%d')}-{config.provider_id[:8]}"
+        # One clock reading stamps the whole audit, so its records agree
+        now = datetime.now()
+        audit_date = now.isoformat()
+        audit_id = f"CHI-AUDIT-{now.strftime('%Y%m%d')}-{config.provider_id[:8]}"
         # 1. RISK ASSESSMENT: Calculate provider risk profile
         risk_profile = await self._assess_provider_risk(config.provider_id)
         # 2. SAMPLING: Generate risk-based sample
         sample_cases = await self._generate_audit_sample(config, risk_profile)
-        # 3. VALIDATION: Audit each case against SBSCS
-        audit_results = []
-        total_penalty_points = 0
-        for case in sample_cases:
-            case_result = await self._audit_single_case(case, config.sbs_version)
-            audit_results.append(case_result)
-            total_penalty_points += case_result["penalty_points"]
-            # Real-time fraud detection
-            if await self._detect_potential_fraud(case_result):
-                await self._flag_for_immediate_review(case_result, audit_id)
+        # 3. VALIDATION: Audit each case against SBSCS, in batches, keeping
+        # running aggregates instead of every case's findings
+        audit = AuditAggregate(capacity=len(sample_cases))
+        for start in range(0, len(sample_cases), AUDIT_BATCH_SIZE):
+            batch = sample_cases[start:start + AUDIT_BATCH_SIZE]
+            for case_result in await self._audit_cases(batch, config.sbs_version, audit_date):
+                audit.add(case_result)
+        # Fraud patterns are statistical, so they are scored over the whole sample
+        audit_columns = audit.columns
+        fraud_report = await self.fraud_engine.detect_potential_fraud(audit_columns)
+        if fraud_report["risk_level"] in ("high", "critical"):
+            await self._flag_for_immediate_review(audit_columns["claim_id"], audit_id)
         # 4. SCORING: Calculate compliance score (0-100)
         compliance_score = self._calculate_compliance_score(
-            total_penalty_points, len(sample_cases)
+            audit.total_penalty_points, audit.case_count
         )
         # 5. DETERMINE AUDIT OUTCOME
-        audit_outcome = self._determine_audit_outcome(compliance_score, audit_results)
+        audit_outcome = self._determine_audit_outcome(compliance_score, audit)
         # 6. GENERATE CORRECTIVE ACTION PLAN
         corrective_actions = await self._generate_corrective_actions(
-            audit_results, compliance_score, config.provider_id
+            audit, compliance_score, config.provider_id, now
         )
         # 7. CREATE AUDIT REPORT (Arabic/English)
         audit_report = self._generate_audit_report(
-            audit_id, config, audit_results, compliance_score, 
+            audit_id, config, audit, compliance_score, 
             corrective_actions, audit_outcome
         )
         return {
             "audit_id": audit_id,
-            "audit_date": datetime.now().isoformat(),
+            "audit_date": audit_date,
             "provider_id": config.provider_id,
             "compliance_score": compliance_score,
             "risk_level": risk_profile["overall_risk"],
             "audit_outcome": audit_outcome,
             "sample_size": len(sample_cases),
-            "total_errors": len([r for r in audit_results if r["has_errors"]]),
-            "penalty_summary": self._summarize_penalties(audit_results),
+            "total_errors": audit.cases_with_errors,
+            "penalty_summary": self._summarize_penalties(audit),
+            "worst_cases": audit.worst_cases,
+            "fraud_assessment": fraud_report,
             "corrective_actions": corrective_actions,
             "arabic_report": audit_report["arabic"],
             "english_report": audit_report["english"],
@@ -99,18 +348,26 @@ class CHIAuditSimulator:
         risk_factors["historical_compliance"] = self._calculate_historical_risk(
             historical_audits
         )
+        # Factors 2-5 come from one aggregate query over the provider's claims
+        claim_stats = (
+            await self.db.execute(_PROVIDER_CLAIM_STATS, {"provider_id": provider_id})
+        ).mappings().one()
         # Factor 2: Coding pattern anomalies
-        coding_patterns = await self._analyze_coding_patterns(provider_id)
-        risk_factors["pattern_anomalies"] = self._detect_anomalies(coding_patterns)
+        risk_factors["pattern_anomalies"] = self._detect_anomalies(
+            claim_stats["coding_patterns"] or []
+        )
         # Factor 3: Unlisted code usage (high risk per CHI)
-        unlisted_ratio = await self._calculate_unlisted_code_ratio(provider_id)
-        risk_factors["unlisted_code_risk"] = self._calculate_unlisted_risk(unlisted_ratio)
+        risk_factors["unlisted_code_risk"] = self._calculate_unlisted_risk(
+            claim_stats["unlisted_ratio"] or 0.0
+        )
         # Factor 4: Rapid revenue growth (potential upcoding indicator)
-        revenue_trend = await self._analyze_revenue_trend(provider_id)
-        risk_factors["revenue_growth_risk"] = self._assess_revenue_risk(revenue_trend)
+        risk_factors["revenue_growth_risk"] = self._assess_revenue_risk(
+            claim_stats["revenue_trend"] or []
+        )
         # Factor 5: Peer comparison
-        peer_benchmark = await self._compare_to_peers(provider_id)
-        risk_factors["peer_deviation"] = self._calculate_peer_deviation(peer_benchmark)
+        risk_factors["peer_deviation"] = self._calculate_peer_deviation(
+            claim_stats["peer_benchmark"] or {}
+        )
         # Calculate overall risk score (0-100)
         overall_risk = self._calculate_overall_risk(risk_factors)
         return {
@@ -129,64 +386,59 @@ class CHIAuditSimulator:
         all_claims = await self._get_claims_for_period(
             config.provider_id, config.audit_period
         )
+        rng = np.random.default_rng()
         if not config.risk_based_sampling:
-            return np.random.choice(
-                all_claims, 
-                size=min(config.sample_size, len(all_claims)), 
-                replace=False
-            ).tolist()
-        weighted_sample = []
-        # 1. High-value claims oversampling (claims > 10,000 SAR)
-        high_value_claims = [c for c in all_claims if c["amount"] > 10000]
-        if high_value_claims:
-            weighted_sample.extend(
-                np.random.choice(
-                    high_value_claims,
-                    size=int(config.sample_size * 0.3),  # 30% of sample
-                    replace=False
-                ).tolist()
+            return _sample_claims(rng, all_claims, config.sample_size)
+        # Strata are sampled as positions into all_claims; a boolean mask
+        # keeps them disjoint and yields the unsampled remainder directly
+        positions = {id(c): i for i, c in enumerate(all_claims)}
+        sampled = np.zeros(len(all_claims), dtype=bool)
+        selected: List[int] = []
+
+        def positions_of(claims: List[Dict]) -> np.ndarray:
+            return np.fromiter(
+                (positions[id(c)] for c in claims), dtype=np.intp, count=len(claims)
             )
+
+        def take(candidates: np.ndarray, size: int) -> None:
+            candidates = candidates[~sampled[candidates]]
+            size = min(size, candidates.size)
+            if size <= 0:
+                return
+            picked = rng.choice(candidates, size=size, replace=False)
+            sampled[picked] = True
+            selected.extend(picked.tolist())
+
+        # 1. High-value claims oversampling (claims > 10,000 SAR)
+        amounts = np.fromiter(
+            (c["amount"] for c in all_claims), dtype=np.float64, count=len(all_claims)
+        )
+        take(np.flatnonzero(amounts > 10000), int(config.sample_size * 0.3))  # 30% of sample
         # 2. Focus area sampling
         if config.focus_areas:
             for focus_area in config.focus_areas:
                 focus_claims = await self._get_claims_by_focus_area(
                     all_claims, focus_area
                 )
-                if focus_claims:
-                    weighted_sample.extend(
-                        np.random.choice(
-                            focus_claims,
-                            size=int(config.sample_size * 0.2 / len(config.focus_areas)),
-                            replace=False
-                        ).tolist()
-                    )
+                take(
+                    positions_of(focus_claims),
+                    int(config.sample_size * 0.2 / len(config.focus_areas))
+                )
         # 3. High-risk procedure sampling (from risk profile)
         high_risk_areas = risk_profile.get("high_risk_areas", [])
         for risk_area in high_risk_areas:
             risk_claims = await self._get_claims_by_risk_pattern(
                 all_claims, risk_area
             )
-            if risk_claims:
-                weighted_sample.extend(
-                    np.random.choice(
-                        risk_claims,
-                        size=int(config.sample_size * 0.25 / len(high_risk_areas)),
-                        replace=False
-                    ).tolist()
-                )
+            take(
+                positions_of(risk_claims),
+                int(config.sample_size * 0.25 / len(high_risk_areas))
+            )
         # 4. Random sample for remaining
-        remaining_slots = config.sample_size - len(weighted_sample)
+        remaining_slots = config.sample_size - len(selected)
         if remaining_slots > 0:
-            remaining_claims = [c for c in all_claims if c not in weighted_sample]
-            if remaining_claims:
-                weighted_sample.extend(
-                    np.random.choice(
-                        remaining_claims,
-                        size=min(remaining_slots, len(remaining_claims)),
-                        replace=False
-                    ).tolist()
-                )
-        return weighted_sample[:config.sample_size]
+            take(np.flatnonzero(~sampled), remaining_slots)
+        return [all_claims[i] for i in selected[:config.sample_size]]
 
     async def _audit_single_case(
         self, 
@@ -194,82 +446,116 @@ class CHIAuditSimulator:
         sbs_version: str
     ) -> Dict:
         """Audit a single medical claim against SBSCS standards"""
-        errors = []
-        penalty_points = 0
-        severity_weights = {"low": 1, "medium": 3, "high": 5, "critical": 10}
+        return (await self._audit_cases([claim], sbs_version))[0]
+
+    async def _audit_cases(
+        self,
+        claims: List[Dict],
+        sbs_version: str,
+        audit_timestamp: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Audit a batch of medical claims against SBSCS standards
+
+        Code existence and diagnosis-procedure linkage are set lookups
+        against reference data loaded once per batch; penalties are summed
+        as arrays and error lists are only built for failing claims. The
+        per-claim validators run concurrently, up to AUDIT_CONCURRENCY at a
+        time, so they must not issue statements on the shared self.db.
+        """
+        n = len(claims)
+        if n == 0:
+            return []
+        valid_codes = await _load_valid_sbs_codes(self.db, sbs_version)
+        necessity_pairs = await _load_medical_necessity_pairs(self.db, sbs_version)
+        sbs_codes = [claim["sbs_code"] for claim in claims]
         # VALIDATION 1: Code exists in SBS version
-        code_validation = await self._validate_sbs_code_exists(
-            claim["sbs_code"], sbs_version
+        code_missing = ~np.fromiter(
+            (code in valid_codes for code in sbs_codes), dtype=bool, count=n
         )
-        if not code_validation["is_valid"]:
-            errors.append({
-                "code": "SBS001",
-                "description_ar": "الكود غير موجود في نظام الفوترة السعودي",
-                "description_en": "Code does not exist in Saudi Billing System",
-                "severity": "critical",
-                "penalty_points": 10
-            })
-            penalty_points += 10
         # VALIDATION 2: Medical necessity (diagnosis-procedure linkage)
-        medical_necessity = await self._validate_medical_necessity(
-            claim["diagnosis_codes"], claim["sbs_code"]
+        not_necessary = ~np.fromiter(
+            (
+                any((dx, code) in necessity_pairs for dx in claim["diagnosis_codes"])
+                for claim, code in zip(claims, sbs_codes)
+            ),
+            dtype=bool,
+            count=n
         )
-        if not medical_necessity["is_appropriate"]:
-            errors.append({
-                "code": "SBS002",
-                "description_ar": "عدم توافق الإجراء مع التشخيص",
-                "description_en": "Procedure not appropriate for diagnosis",
-                "severity": "high",
-                "penalty_points": 5
-            })
-            penalty_points += 5
-        # VALIDATION 3: Documentation completeness
-        documentation_check = await self._validate_documentation(
-            claim["medical_record"]
+        # VALIDATIONS 3-5 depend on each claim's record and history
+        incomplete_docs = np.zeros(n, dtype=bool)
+        timing_violations = np.zeros(n, dtype=bool)
+        billing_violations: List[List[Dict]] = [[] for _ in range(n)]
+        semaphore = asyncio.Semaphore(AUDIT_CONCURRENCY)
+
+        async def validate(i: int, claim: Dict) -> None:
+            async with semaphore:
+                # VALIDATION 3: Documentation completeness
+                documentation_check = await self._validate_documentation(
+                    claim["medical_record"]
+                )
+                incomplete_docs[i] = not documentation_check["is_complete"]
+                # VALIDATION 4: Billing compliance (unbundling, upcoding)
+                billing_compliance = await self._validate_billing_compliance(claim)
+                if not billing_compliance["is_compliant"]:
+                    billing_violations[i] = billing_compliance["violations"]
+                # VALIDATION 5: Time-based rules (multiple procedures same day)
+                time_rules = await self._validate_time_based_rules(claim)
+                timing_violations[i] = not time_rules["is_compliant"]
+
+        await asyncio.gather(*(validate(i, claim) for i, claim in enumerate(claims)))
+        flags = np.column_stack(
+            (code_missing, not_necessary, incomplete_docs, timing_violations)
         )
-        if not documentation_check["is_complete"]:
-            errors.append({
-                "code": "SBS003",
-                "description_ar": "توثيق سريري غير مكتمل",
-                "description_en": "Incomplete clinical documentation",
-                "severity": "medium",
-                "penalty_points": 3
-            })
-            penalty_points += 3
-        # VALIDATION 4: Billing compliance (unbundling, upcoding)
-        billing_compliance = await self._validate_billing_compliance(claim)
-        if not billing_compliance["is_compliant"]:
-            for violation in billing_compliance["violations"]:
-                errors.append({
-                    "code": violation["code"],
-                    "description_ar": violation["description_ar"],
-                    "description_en": violation["description_en"],
-                    "severity": violation["severity"],
-                    "penalty_points": severity_weights[violation["severity"]]
-                })
-                penalty_points += severity_weights[violation["severity"]]
-        # VALIDATION 5: Time-based rules (multiple procedures same day)
-        time_rules = await self._validate_time_based_rules(claim)
-        if not time_rules["is_compliant"]:
-            errors.append({
-                "code": "SBS005",
-                "description_ar": "انتهاك قواعد التوقيت للإجراءات المتعددة",
-                "description_en": "Violation of timing rules for multiple procedures",
-                "severity": "medium",
-                "penalty_points": 3
+        penalty_points = flags @ _FIXED_ERROR_PENALTIES
+        penalty_points += np.fromiter(
+            (
+                sum(SEVERITY_WEIGHTS[v["severity"]] for v in violations)
+                for violations in billing_violations
+            ),
+            dtype=np.int64,
+            count=n
+        )
+        has_fixed_errors = flags.any(axis=1)
+        audit_timestamp = audit_timestamp or datetime.now().isoformat()
+        results = []
+        for i, claim in enumerate(claims):
+            errors = []
+            if has_fixed_errors[i] or billing_violations[i]:
+                # Keep the report order: SBS001-003, billing violations, SBS005
+                errors = [
+                    _make_error(*template)
+                    for template, flag in zip(_ERROR_TEMPLATES[:3], flags[i, :3])
+                    if flag
+                ]
+                errors.extend(
+                    _make_error(v["code"], v["severity"], v["description_ar"], v["description_en"])
+                    for v in billing_violations[i]
+                )
+                if timing_violations[i]:
+                    errors.append(_make_error(*_ERROR_TEMPLATES[3]))
+            results.append({
+                "claim_id": claim["id"],
+                "patient_id": claim["patient_id"],
+                "sbs_code": claim["sbs_code"],
+                "billed_amount": claim["amount"],
+                "has_errors": len(errors) > 0,
+                "total_errors": len(errors),
+                "errors": errors,
+                "penalty_points": int(penalty_points[i]),
+                "audit_timestamp": audit_timestamp,
+                "recommendations": self._generate_case_recommendations(errors)
             })
-            penalty_points += 3
+        return results
+
+    def _summarize_penalties(self, audit: AuditAggregate) -> Dict:
+        """Penalty breakdown from the counters kept while auditing"""
         return {
-            "claim_id": claim["id"],
-            "patient_id": claim["patient_id"],
-            "sbs_code": claim["sbs_code"],
-            "billed_amount": claim["amount"],
-            "has_errors": len(errors) > 0,
-            "total_errors": len(errors),
-            "errors": errors,
-            "penalty_points": penalty_points,
-            "audit_timestamp": datetime.now().isoformat(),
-            "recommendations": self._generate_case_recommendations(errors)
+            "total_penalty_points": audit.total_penalty_points,
+            "cases_with_errors": audit.cases_with_errors,
+            "errors_by_code": dict(audit.error_counts),
+            "errors_by_severity": dict(audit.severity_counts),
+            "penalty_points_by_severity": dict(audit.severity_penalties)
         }
 
     def _calculate_compliance_score(
@@ -278,30 +564,23 @@ class CHIAuditSimulator:
         sample_size: int
     ) -> float:
         """Calculate CHI compliance score (0-100)"""
-        max_penalty_per_case = 25  # Maximum penalty per case
-        max_total_penalty = sample_size * max_penalty_per_case
-        if max_total_penalty == 0:
-            return 100.0
-        raw_score = 100 - ((total_penalty_points / max_total_penalty) * 100)
-        if raw_score > 90:
-            return min(100, raw_score * 1.05)  # Bonus for excellent compliance
-        elif raw_score > 70:
-            return raw_score
-        else:
-            return max(0, raw_score * 0.9)  # Penalty for poor compliance
+        return compliance_score(total_penalty_points, sample_size)
 
     async def _generate_corrective_actions(
         self, 
-        audit_results: List[Dict], 
+        audit: AuditAggregate,
         compliance_score: float,
-        provider_id: str
+        provider_id: str,
+        now: Optional[datetime] = None
     ) -> Dict:
         """Generate Corrective Action Plan (CAP) per CHI requirements"""
-        cap_id = f"CAP-{datetime.now().strftime('%Y%m%d')}-{provider_id[:8]}"
-        error_patterns = self._analyze_error_patterns(audit_results)
+        now = now or datetime.now()
+        cap_id = f"CAP-{now.strftime('%Y%m%d')}-{provider_id[:8]}"
+        error_patterns = self._analyze_error_patterns(audit.error_counts)
         corrective_actions = []
+        error_codes = audit.error_counts
         # ACTION 1: Training requirements
-        if any(e["severity"] in ["high", "critical"] for r in audit_results for e in r["errors"]):
+        if audit.has_severe_errors:
             corrective_actions.append({
                 "action_id": f"{cap_id}-001",
                 "type": "mandatory_training",
@@ -314,8 +593,7 @@ class CHIAuditSimulator:
                 "verification_required": True
             })
         # ACTION 2: Documentation improvement
-        doc_errors = [e for r in audit_results for e in r["errors"] if "توثيق" in e["description_ar"]]
-        if doc_errors:
+        if any(error_codes[code] for code in DOCUMENTATION_ERROR_CODES):
             corrective_actions.append({
                 "action_id": f"{cap_id}-002",
                 "type": "clinical_documentation_improvement",
@@ -328,8 +606,7 @@ class CHIAuditSimulator:
                 "verification_required": True
             })
         # ACTION 3: System configuration updates
-        system_errors = [e for r in audit_results for e in r["errors"] if "system" in e["description_en"].lower()]
-        if system_errors:
+        if any(error_codes[code] for code in SYSTEM_ERROR_CODES):
             corrective_actions.append({
                 "action_id": f"{cap_id}-003",
                 "type": "system_reconfiguration",
@@ -357,14 +634,19 @@ class CHIAuditSimulator:
         max_deadline = max([ca["deadline_days"] for ca in corrective_actions], default=0)
         return {
             "cap_id": cap_id,
-            "generation_date": datetime.now().isoformat(),
+            "generation_date": now.isoformat(),
             "compliance_score_trigger": compliance_score,
             "corrective_actions": corrective_actions,
             "implementation_timeline": {
-                "start_date": datetime.now().isoformat(),
-                "estimated_completion": (datetime.now() + timedelta(days=max_deadline)).isoformat(),
+                "start_date": now.isoformat(),
+                "estimated_completion": (now + timedelta(days=max_deadline)).isoformat(),
                 "critical_path": self._calculate_critical_path(corrective_actions)
             },
             "success_criteria": self._define_success_criteria(compliance_score),
             "escalation_procedure": self._get_escalation_procedure(compliance_score)
         }
+
+@lru_cache(maxsize=None)
+def shared_simulator() -> CHIAuditSimulator:
+    """Process-wide simulator; risk weights and the fraud engine load once"""
+    return CHIAuditSimulator()
@@ -0,0 +1,114 @@
+"""Write-behind enrollment queue drained by Celery in large batches"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import orjson
+import redis
+import redis.asyncio as aioredis
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from ..celery_app import celery_app
+from ..config import settings
+from ..database import SessionLocal, dialect_insert
+from ..models.enrollment import Enrollment, EnrollmentStatus, SubscriptionTier
+
+ENROLL_QUEUE = "enroll_queue"
+FLUSH_BATCH_SIZE = 10_000
+FLUSH_DELAY = 2  # seconds a queued enrollment waits for others to batch with
+
+_FLUSH_SCHEDULED = f"{ENROLL_QUEUE}:flush_scheduled"
+_OPEN_STATUSES = [EnrollmentStatus.PENDING, EnrollmentStatus.ACTIVE]
+
+
+def bulk_enrollment_row(
+    user_id: int,
+    course_id: int,
+    subscription_tier: SubscriptionTier,
+    modality: str,
+    corporate_account_id: Optional[int],
+    now: datetime
+) -> Dict[str, Any]:
+    """
+    Column values for one bulk enrollment
+
+    Every defaulted column is set explicitly, since COPY skips
+    Python-side defaults.
+    """
+    return {
+        "user_id": user_id,
+        "course_id": course_id,
+        "subscription_tier": SubscriptionTier(subscription_tier),
+        "modality": modality,
+        "status": EnrollmentStatus.PENDING,
+        "progress_percentage": 0.0,
+        "completed_modules": [],
+        "icd10am_mastery": 0.0,
+        "sbs_mastery": 0.0,
+        "ardrg_mastery": 0.0,
+        "enrolled_at": now,
+        "corporate_account_id": corporate_account_id,
+        "is_bulk_enrollment": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def enqueue_enrollments(client: aioredis.Redis, payloads: List[Dict[str, Any]]) -> None:
+    """
+    Queue bulk_enrollment_row arguments (without now) for the flush task
+
+    A flush runs as soon as a full batch is waiting, otherwise at most
+    FLUSH_DELAY seconds after the first enrollment queued since the last one.
+    """
+    length = await client.rpush(ENROLL_QUEUE, *(orjson.dumps(p) for p in payloads))
+    if length >= FLUSH_BATCH_SIZE:
+        await run_in_threadpool(flush_enrollments.delay)
+    elif await client.set(_FLUSH_SCHEDULED, 1, nx=True, ex=FLUSH_DELAY):
+        await run_in_threadpool(flush_enrollments.apply_async, countdown=FLUSH_DELAY)
+
+
+def insert_enrollments(db: Session, payloads: List[Dict[str, Any]]) -> None:
+    """Insert queued enrollments in one executemany; open duplicates are skipped"""
+    now = datetime.utcnow()
+    rows = [bulk_enrollment_row(**p, now=now) for p in payloads]
+    statement = dialect_insert(db.bind.dialect.name)(Enrollment).on_conflict_do_nothing(
+        index_elements=["user_id", "course_id"],
+        index_where=Enrollment.status.in_(_OPEN_STATUSES)
+    )
+    db.execute(statement, rows)
+
+
+@celery_app.task(name="enrollments.flush")
+def flush_enrollments() -> int:
+    """Drain the enrollment queue in batches of FLUSH_BATCH_SIZE"""
+    client = redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB
+    )
+    # Anything queued from here on schedules its own flush
+    client.delete(_FLUSH_SCHEDULED)
+    
+    flushed = 0
+    while True:
+        pipe = client.pipeline()
+        pipe.lrange(ENROLL_QUEUE, 0, FLUSH_BATCH_SIZE - 1)
+        pipe.ltrim(ENROLL_QUEUE, FLUSH_BATCH_SIZE, -1)
+        items, _ = pipe.execute()
+        if not items:
+            break
+        
+        try:
+            with SessionLocal() as db:
+                insert_enrollments(db, [orjson.loads(item) for item in items])
+                db.commit()
+        except Exception:
+            # Put the batch back so a retry does not lose enrollments
+            client.lpush(ENROLL_QUEUE, *reversed(items))
+            raise
+        
+        flushed += len(items)
+        if len(items) < FLUSH_BATCH_SIZE:
+            break
+    
+    client.close()
+    return flushed
@@ -1,13 +1,41 @@
-from typing import List, Dict
+import math
+from typing import List, Dict, Mapping
+import numpy as np
+
+# Audited cases as parallel arrays keyed by field, e.g. "billed_amount"
+AuditColumns = Mapping[str, np.ndarray]
+
+# Expected first-digit frequencies for digits 1-9 under Benford's Law
+BENFORD_FREQUENCIES = np.log10(1 + 1 / np.arange(1, 10))
+# Chi-square critical value at p=0.05 with 8 degrees of freedom
+BENFORD_CHI2_THRESHOLD = 15.507
+# Fewer positive amounts than this cannot show a meaningful deviation
+BENFORD_MIN_SAMPLE = 50
+
+
+def _leading_digits(amounts: np.ndarray) -> np.ndarray:
+    """First significant digit of each positive amount"""
+    digits = (amounts / 10.0 ** np.floor(np.log10(amounts))).astype(np.int64)
+    # log10 rounding can land one decade off near exact powers of ten
+    digits[digits >= 10] = 1
+    digits[digits == 0] = 9
+    return digits
+
+
+def _chi2_sf_8dof(x: float) -> float:
+    """Chi-square survival function for 8 degrees of freedom (closed form)"""
+    half = x / 2
+    return math.exp(-half) * sum(half ** i / math.factorial(i) for i in range(4))
+
 
 class FraudDetectionEngine:
     """Advanced fraud detection using machine learning patterns"""
 
-    async def detect_potential_fraud(self, audit_results: List[Dict]) -> Dict:
+    async def detect_potential_fraud(self, audit_columns: AuditColumns) -> Dict:
         """Detect potential fraud patterns using multiple algorithms"""
         fraud_indicators = []
         # PATTERN 1: Unusual billing patterns (Benford's Law)
-        benford_violation = await self._check_benfords_law(audit_results)
+        benford_violation = await self._check_benfords_law(audit_columns)
         if benford_violation["is_violated"]:
             fraud_indicators.append({
                 "pattern": "benfords_law_violation",
@@ -16,16 +44,16 @@ class FraudDetectionEngine:
                 "description_en": "Deviation from Benford's Law suggests potential manipulation"
             })
         # PATTERN 2: Unbundling detection
-        unbundling_patterns = await self._detect_unbundling(audit_results)
+        unbundling_patterns = await self._detect_unbundling(audit_columns)
         fraud_indicators.extend(unbundling_patterns)
         # PATTERN 3: Upcoding detection
-        upcoding_patterns = await self._detect_upcoding(audit_results)
+        upcoding_patterns = await self._detect_upcoding(audit_columns)
         fraud_indicators.extend(upcoding_patterns)
         # PATTERN 4: Time-based anomalies (services outside normal hours)
-        time_anomalies = await self._detect_time_anomalies(audit_results)
+        time_anomalies = await self._detect_time_anomalies(audit_columns)
         fraud_indicators.extend(time_anomalies)
         # PATTERN 5: Patient sharing patterns (same patients across multiple providers)
-        patient_sharing = await self._detect_patient_sharing(audit_results)
+        patient_sharing = await self._detect_patient_sharing(audit_columns)
         fraud_indicators.extend(patient_sharing)
         # Calculate overall fraud risk score
         fraud_risk_score = self._calculate_fraud_risk_score(fraud_indicators)
@@ -36,20 +64,30 @@ class FraudDetectionEngine:
             "recommended_actions": self._get_fraud_response_actions(fraud_risk_score)
         }
 
-    # Placeholder methods for detection algorithms – implementations would be added later
-    async def _check_benfords_law(self, audit_results: List[Dict]) -> Dict:
-        return {"is_violated": False, "confidence": 0.0}
+    async def _check_benfords_law(self, audit_columns: AuditColumns) -> Dict:
+        amounts = np.asarray(audit_columns["billed_amount"], dtype=np.float64)
+        amounts = amounts[amounts > 0]
+        if amounts.size < BENFORD_MIN_SAMPLE:
+            return {"is_violated": False, "confidence": 0.0}
+        counts = np.bincount(_leading_digits(amounts), minlength=10)[1:]
+        expected = BENFORD_FREQUENCIES * amounts.size
+        chi2 = float(((counts - expected) ** 2 / expected).sum())
+        return {
+            "is_violated": chi2 > BENFORD_CHI2_THRESHOLD,
+            "confidence": round(1 - _chi2_sf_8dof(chi2), 4)
+        }
 
-    async def _detect_unbundling(self, audit_results: List[Dict]) -> List[Dict]:
+    # Placeholder methods for detection algorithms – implementations would be added later
+    async def _detect_unbundling(self, audit_columns: AuditColumns) -> List[Dict]:
         return []
 
-    async def _detect_upcoding(self, audit_results: List[Dict]) -> List[Dict]:
+    async def _detect_upcoding(self, audit_columns: AuditColumns) -> List[Dict]:
         return []
 
-    async def _detect_time_anomalies(self, audit_results: List[Dict]) -> List[Dict]:
+    async def _detect_time_anomalies(self, audit_columns: AuditColumns) -> List[Dict]:
         return []
 
-    async def _detect_patient_sharing(self, audit_results: List[Dict]) -> List[Dict]:
+    async def _detect_patient_sharing(self, audit_columns: AuditColumns) -> List[Dict]:
         return []
 
     def _calculate_fraud_risk_score(self, indicators: List[Dict]) -> float:
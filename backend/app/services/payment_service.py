@@ -1,53 +1,248 @@
 """Payment Service for Stripe integration"""
-from typing import Dict, Optional
+import bisect
+import hashlib
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import httpx
+import orjson
+import redis.asyncio as redis
 from ..config import settings
+from ..core.cache import ResponseCache
+
+STRIPE_API_BASE = "https://api.stripe.com/v1"
+
+# Stripe allows 50 metadata keys per object; each batched item takes one
+MAX_INTENT_ITEMS = 50
+
+# Read once at import; settings are fixed for the life of the process
+VAT_RATE = settings.VAT_RATE
+
+# VAT in basis points, so money math stays in integer halalas
+VAT_RATE_BP = round(VAT_RATE * 10_000)
+
+# Corporate discounts: seat-count thresholds, ascending, and the percent of
+# the price charged below the first threshold and from each one upwards
+_DISCOUNT_SEAT_THRESHOLDS = (10, 20, 50)
+_DISCOUNT_CHARGED_PERCENT = (100, 90, 80, 70)
+
+# One pooled client per process, so payment intents reuse TLS connections
+_stripe_client: Optional[httpx.AsyncClient] = None
+
+
+def get_stripe_client() -> httpx.AsyncClient:
+    """Process-wide HTTP client for the Stripe REST API"""
+    global _stripe_client
+    if _stripe_client is None:
+        _stripe_client = httpx.AsyncClient(
+            base_url=STRIPE_API_BASE,
+            auth=(settings.STRIPE_API_KEY, ""),
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+    return _stripe_client
+
+
+async def close_stripe_client() -> None:
+    """Close the pooled Stripe client, if one was created"""
+    global _stripe_client
+    if _stripe_client is not None:
+        await _stripe_client.aclose()
+        _stripe_client = None
+
+
+def to_minor_units(amount: float) -> int:
+    """SAR amount as integer halalas"""
+    return round(amount * 100)
+
+
+def vat_minor_units(amount_minor: int) -> int:
+    """VAT on an amount in halalas, rounded half up to the halala"""
+    return (amount_minor * VAT_RATE_BP + 5_000) // 10_000
+
+
+class VatQuote(NamedTuple):
+    """Subtotal, VAT and total for a quote, in SAR"""
+    subtotal: float
+    vat_rate: float
+    vat_amount: float
+    total: float
+    currency: str = "SAR"
+
+
+class PreparedCheckout(NamedTuple):
+    """Discounted, VAT-inclusive quote and the Stripe intent that charges it"""
+    intent: Dict
+    seat_count: int
+    discount_amount: float
+    quote: VatQuote
 
 
 class PaymentService:
     """Service for handling payments with Stripe"""
     
     @staticmethod
-    def create_payment_intent(
-        amount: float,
+    async def create_payment_intent(
+        amount_minor: int,
         currency: str = "SAR",
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        order_id: Optional[str] = None,
+        redis_client: Optional[redis.Redis] = None
     ) -> Dict:
-        """Create a Stripe payment intent"""
-        # In production, integrate with Stripe SDK
-        # For now, return simulated response
+        """
+        Create a Stripe payment intent; simulated when no API key is set
+
+        Amounts are integer minor units (halalas for SAR), as Stripe takes
+        them; the returned "amount" is in major units for display.
+
+        With an order_id, repeat calls for the same order, amount and
+        currency yield one intent: Stripe receives a deterministic
+        Idempotency-Key, and the intent is cached in Redis so refreshes
+        skip the Stripe round trip entirely.
+        """
+        if not settings.STRIPE_API_KEY:
+            # Simulated IDs stay unique per order, like real intents
+            suffix = order_id if order_id is not None else amount_minor
+            return {
+                "payment_intent_id": f"pi_simulated_{suffix}",
+                "client_secret": "simulated_secret",
+                "amount": amount_minor / 100,
+                "currency": currency,
+                "status": "requires_payment_method"
+            }
         
-        return {
-            "payment_intent_id": f"pi_simulated_{amount}",
-            "client_secret": "simulated_secret",
-            "amount": amount,
+        idempotency_key = None
+        cache = None
+        if order_id is not None:
+            idempotency_key = hashlib.sha256(
+                f"{order_id}:{amount_minor}:{currency}".encode()
+            ).hexdigest()
+            if redis_client is not None:
+                cache = ResponseCache(redis_client, ttl=settings.PAYMENT_INTENT_CACHE_TTL)
+                cached = await cache.get(f"payment-intent:{idempotency_key}")
+                if cached is not None:
+                    return orjson.loads(cached)
+        
+        form = {
+            "amount": amount_minor,
+            "currency": currency.lower(),
+            "automatic_payment_methods[enabled]": "true"
+        }
+        for key, value in (metadata or {}).items():
+            form[f"metadata[{key}]"] = str(value)
+        
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        response = await get_stripe_client().post("/payment_intents", data=form, headers=headers)
+        response.raise_for_status()
+        intent = response.json()
+        result = {
+            "payment_intent_id": intent["id"],
+            "client_secret": intent["client_secret"],
+            "amount": amount_minor / 100,
             "currency": currency,
-            "status": "requires_payment_method"
+            "status": intent["status"]
         }
+        if cache is not None:
+            await cache.set(f"payment-intent:{idempotency_key}", result)
+        return result
     
     @staticmethod
-    def calculate_total_with_vat(amount: float) -> Dict:
-        """Calculate total amount including VAT"""
-        vat_amount = amount * settings.VAT_RATE
-        total_amount = amount + vat_amount
-        
+    async def create_payment_intent_batch(
+        items: List[Dict],
+        currency: str = "SAR",
+        order_id: Optional[str] = None,
+        redis_client: Optional[redis.Redis] = None
+    ) -> Dict:
+        """
+        Create one Stripe payment intent covering several line items
+
+        Each item needs an integer "amount_minor"; the intent charges their sum and
+        records every item in its metadata, so a checkout costs one Stripe
+        round trip however many items it holds.
+        """
+        if not items:
+            raise ValueError("A payment intent needs at least one item")
+        if len(items) > MAX_INTENT_ITEMS:
+            raise ValueError(f"A payment intent holds at most {MAX_INTENT_ITEMS} items")
+        amount_minor = sum(item["amount_minor"] for item in items)
+        metadata = {
+            f"item_{i}": orjson.dumps(item).decode() for i, item in enumerate(items)
+        }
+        return await PaymentService.create_payment_intent(
+            amount_minor, currency, metadata, order_id=order_id, redis_client=redis_client
+        )
+    
+    @staticmethod
+    def calculate_total_with_vat(amount_minor: int) -> VatQuote:
+        """Calculate total amount including VAT, from a subtotal in halalas"""
+        vat_minor = vat_minor_units(amount_minor)
+        return VatQuote(
+            amount_minor / 100,
+            VAT_RATE,
+            vat_minor / 100,
+            (amount_minor + vat_minor) / 100
+        )
+    
+    @staticmethod
+    def calculate_total_with_vat_bulk(amounts_minor: Sequence[int]) -> Dict:
+        """
+        VAT and totals for many subtotals in halalas, as int64 arrays
+
+        One vectorized pass for bulk quotes such as seat renewals; rounds
+        exactly like vat_minor_units. NumPy is imported on first use, so
+        only processes that quote in bulk need it.
+        """
+        import numpy as np
+        subtotal = np.asarray(amounts_minor, dtype=np.int64)
+        vat = (subtotal * VAT_RATE_BP + 5_000) // 10_000
         return {
-            "subtotal": amount,
-            "vat_rate": settings.VAT_RATE,
-            "vat_amount": round(vat_amount, 2),
-            "total": round(total_amount, 2),
+            "subtotal_minor": subtotal,
+            "vat_minor": vat,
+            "total_minor": subtotal + vat,
             "currency": "SAR"
         }
     
+    @classmethod
+    async def prepare_checkout(
+        cls,
+        order_id: str,
+        amount_minor: int,
+        seat_count: int = 1,
+        currency: str = "SAR",
+        metadata: Optional[Dict] = None,
+        redis_client: Optional[redis.Redis] = None
+    ) -> PreparedCheckout:
+        """
+        Discount, add VAT and create the payment intent in one call
+
+        Clients get everything a checkout page shows from one request
+        instead of separate discount, VAT and intent calls. The intent
+        charges the VAT-inclusive total and is idempotent per order_id.
+        """
+        if amount_minor <= 0:
+            raise ValueError("Checkout amount must be positive")
+        if seat_count < 1:
+            raise ValueError("Checkout needs at least one seat")
+        
+        discounted_minor = cls.apply_corporate_discount(amount_minor, seat_count)
+        vat_minor = vat_minor_units(discounted_minor)
+        intent = await cls.create_payment_intent(
+            discounted_minor + vat_minor,
+            currency,
+            {**(metadata or {}), "seat_count": seat_count},
+            order_id=order_id,
+            redis_client=redis_client
+        )
+        return PreparedCheckout(
+            intent,
+            seat_count,
+            (amount_minor - discounted_minor) / 100,
+            cls.calculate_total_with_vat(discounted_minor)
+        )
+    
     @staticmethod
     def apply_corporate_discount(
-        amount: float,
+        amount_minor: int,
         seat_count: int
-    ) -> float:
-        """Apply corporate discount based on seat count"""
-        if seat_count >= 50:
-            return amount * 0.70  # 30% discount
-        elif seat_count >= 20:
-            return amount * 0.80  # 20% discount
-        elif seat_count >= 10:
-            return amount * 0.90  # 10% discount
-        return amount
+    ) -> int:
+        """Apply corporate discount based on seat count, in halalas"""
+        percent = _DISCOUNT_CHARGED_PERCENT[bisect.bisect_right(_DISCOUNT_SEAT_THRESHOLDS, seat_count)]
+        return (amount_minor * percent + 50) // 100
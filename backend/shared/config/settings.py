@@ -162,6 +162,11 @@ class N8NSettings(BaseSettings):
     connection_timeout: int = 10
     max_retries: int = 3
     retry_delay: int = 1
+    batch_enabled: bool = False
+    batch_max_size: int = 64
+    batch_max_wait_ms: float = 5.0
+    breaker_fail_max: int = 5
+    breaker_reset_timeout: float = 30.0
     enabled: bool = True
     use_for_openai: bool = True
     use_for_nphies: bool = True
@@ -178,6 +183,12 @@ class AgentSettings(BaseSettings):
     masterlinc_health_check_interval: int = 300
     masterlinc_retry_attempts: int = 3
     masterlinc_timeout: int = 30
+    masterlinc_forward_requests: bool = False
+    masterlinc_max_concurrent_calls: int = 50
+    masterlinc_batch_max_size: int = 32
+    masterlinc_batch_max_wait_ms: float = 5.0
+    # Agents that serve POST /batch; calls to any other agent are never coalesced
+    masterlinc_batch_agents: List[str] = []
     
     # HEALTHCARELINC
     healthcarelinc_port: int = 8001
@@ -188,6 +199,8 @@ class AgentSettings(BaseSettings):
     claimlinc_port: int = 8002
     claimlinc_auto_resubmit: bool = False
     claimlinc_manual_review_threshold: float = 0.7
+    claimlinc_analysis_cache_size: int = 4096
+    claimlinc_analysis_cache_ttl: int = 3600
     
     # TTLINC
     ttlinc_port: int = 8003
@@ -201,10 +214,14 @@ class AgentSettings(BaseSettings):
     # CLINICALLINC
     clinicallinc_port: int = 8005
     clinicallinc_use_guidelines: bool = True
+    clinicallinc_interaction_table_path: Optional[str] = None
     
     # RADIOLINC
     radiolinc_port: int = 8006
     radiolinc_dicom_support: bool = True
+    
+    # Bundle: POLICYLINC, RADIOLINC and TTLINC in one process
+    bundle_port: int = 8010
 
 
 class Settings(BaseSettings):
@@ -297,3 +314,7 @@ def get_settings() -> Settings:
 
 # Export settings instance
 settings = get_settings()
+
+# Model names resolved once; settings are fixed for the process lifetime
+MODEL_GPT4 = settings.openai.model_gpt4
+MODEL_GPT4_TURBO = settings.openai.model_gpt4_turbo
@@ -0,0 +1,11 @@
+"""
+External service integrations for BrainSAIT LINC agents
+"""
+
+from .n8n_client import N8NClient, N8NError, get_n8n_client
+
+__all__ = [
+    "N8NClient",
+    "N8NError",
+    "get_n8n_client",
+]
@@ -0,0 +1,224 @@
+"""
+n8n workflow client
+Triggers n8n webhook workflows used by the LINC agents
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set, Union
+
+import httpx
+import orjson
+from fastapi import Request
+
+from shared.config.settings import settings
+from shared.utils.batching import DynamicBatcher
+from shared.utils.circuit_breaker import CircuitBreaker
+from shared.utils.http import create_http_client
+from shared.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Workflow input: a dict, or a JSON object already encoded to bytes
+WorkflowData = Union[Dict[str, Any], bytes]
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class N8NError(Exception):
+    """Raised when an n8n workflow call fails"""
+
+    def __init__(self, workflow_name: str, message: str, status_code: Optional[int] = None):
+        self.workflow_name = workflow_name
+        self.status_code = status_code
+        super().__init__(f"n8n workflow '{workflow_name}' failed: {message}")
+
+
+class N8NClient:
+    """Client for triggering n8n workflows over a shared connection pool"""
+
+    def __init__(
+        self,
+        server_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        api_key: str = "",
+        max_response_bytes: int = 16 * 1024 * 1024,
+        batch_enabled: bool = False,
+        batch_max_size: int = 64,
+        batch_max_wait_ms: float = 5.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.server_url = server_url.rstrip("/")
+        self.api_key = api_key
+        self.max_response_bytes = max_response_bytes
+        self.batch_enabled = batch_enabled
+        self.breaker = breaker or CircuitBreaker("n8n")
+        self._owns_client = client is None
+        # Workflows whose /batch webhook is missing; triggered one by one
+        self._unbatched: Set[str] = set()
+        self._client = client
+        self._batcher = DynamicBatcher(
+            self._trigger_batch,
+            max_batch_size=batch_max_size,
+            max_wait_ms=batch_max_wait_ms,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Injected client, or a lazily created pooled one"""
+        if self._client is None:
+            self._client = create_http_client()
+        return self._client
+
+    def _headers(self) -> Dict[str, str]:
+        """Request headers for n8n"""
+        if self.api_key:
+            return {"X-N8N-API-KEY": self.api_key}
+        return {}
+
+    def webhook_url(self, workflow_name: str) -> str:
+        """Webhook URL for a workflow"""
+        return f"{self.server_url}/webhook/{workflow_name}"
+
+    async def trigger_workflow(
+        self,
+        workflow_name: str,
+        data: WorkflowData,
+        files: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Trigger a workflow and return its JSON response"""
+        if files:
+            form_data = data.decode() if isinstance(data, bytes) else json.dumps(data)
+            request_kwargs = {"data": {"data": form_data}, "files": files}
+        elif isinstance(data, bytes):
+            request_kwargs = {"content": data, "headers": _JSON_HEADERS}
+        else:
+            request_kwargs = {"json": data}
+        return await self._post(workflow_name, self.webhook_url(workflow_name), request_kwargs)
+
+    async def trigger_workflow_batched(
+        self,
+        workflow_name: str,
+        data: WorkflowData,
+    ) -> Dict[str, Any]:
+        """
+        Trigger a workflow, coalescing concurrent calls into one bulk POST
+
+        Requires the workflow to expose a /batch webhook that accepts
+        {"batch": [...]} and returns one result per item, in order. Falls
+        back to a plain trigger when batching is disabled, and to one call
+        per item once the /batch webhook has answered 404.
+        """
+        if not self.batch_enabled or workflow_name in self._unbatched:
+            return await self.trigger_workflow(workflow_name, data)
+        return await self._batcher.submit(workflow_name, data)
+
+    async def _trigger_batch(
+        self,
+        workflow_name: str,
+        items: List[WorkflowData],
+    ) -> List[Dict[str, Any]]:
+        """Send one batch for a workflow and split the results"""
+        if len(items) == 1 or workflow_name in self._unbatched:
+            return await self._trigger_each(workflow_name, items)
+
+        # Splice already-encoded items into the body instead of re-encoding them
+        encoded = [i if isinstance(i, bytes) else orjson.dumps(i) for i in items]
+        try:
+            result = await self._post(
+                workflow_name,
+                f"{self.webhook_url(workflow_name)}/batch",
+                {"content": b'{"batch":[' + b",".join(encoded) + b"]}", "headers": _JSON_HEADERS},
+            )
+        except N8NError as e:
+            if e.status_code != 404:
+                raise
+            logger.warning("n8n batch webhook missing, triggering singly", workflow=workflow_name)
+            self._unbatched.add(workflow_name)
+            return await self._trigger_each(workflow_name, items)
+        return result["results"] if isinstance(result, dict) else result
+
+    async def _trigger_each(
+        self,
+        workflow_name: str,
+        items: List[WorkflowData],
+    ) -> List[Any]:
+        """Trigger items concurrently; failures are returned per item"""
+        return await asyncio.gather(
+            *(self.trigger_workflow(workflow_name, item) for item in items),
+            return_exceptions=True,
+        )
+
+    async def _post(
+        self,
+        workflow_name: str,
+        url: str,
+        request_kwargs: Dict[str, Any],
+    ) -> Any:
+        """
+        POST to an n8n webhook and decode the JSON body
+
+        Raises CircuitOpenError without calling n8n while the breaker is
+        open. Only transport errors and 5xx responses count as failures.
+        """
+        self.breaker.before_call()
+        headers = {**self._headers(), **request_kwargs.pop("headers", {})}
+        try:
+            async with self.client.stream(
+                "POST", url, headers=headers, **request_kwargs
+            ) as response:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                response.raise_for_status()
+                body = await self._read_body(response)
+            return orjson.loads(body)
+        except httpx.TransportError as e:
+            self.breaker.record_failure()
+            logger.error("n8n workflow call failed", workflow=workflow_name, error=str(e))
+            raise N8NError(workflow_name, str(e)) from e
+        except httpx.HTTPStatusError as e:
+            logger.error("n8n workflow call failed", workflow=workflow_name, error=str(e))
+            raise N8NError(workflow_name, str(e), e.response.status_code) from e
+        except (httpx.HTTPError, orjson.JSONDecodeError, ValueError) as e:
+            logger.error("n8n workflow call failed", workflow=workflow_name, error=str(e))
+            raise N8NError(workflow_name, str(e)) from e
+
+    async def _read_body(self, response: httpx.Response) -> bytes:
+        """Receive the body chunk by chunk, aborting once it exceeds the size cap"""
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > self.max_response_bytes:
+                raise ValueError(f"response exceeded {self.max_response_bytes} bytes")
+        return bytes(body)
+
+    async def aclose(self) -> None:
+        """Stop batch consumers and close the client if this instance created it"""
+        await self._batcher.aclose()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_n8n_client(client: httpx.AsyncClient) -> N8NClient:
+    """N8NClient over a shared HTTP client, configured from settings.n8n"""
+    return N8NClient(
+        settings.n8n.server_url,
+        client=client,
+        api_key=settings.n8n.api_key,
+        batch_enabled=settings.n8n.batch_enabled,
+        batch_max_size=settings.n8n.batch_max_size,
+        batch_max_wait_ms=settings.n8n.batch_max_wait_ms,
+        breaker=CircuitBreaker(
+            "n8n",
+            fail_max=settings.n8n.breaker_fail_max,
+            reset_timeout=settings.n8n.breaker_reset_timeout,
+        ),
+    )
+
+
+def get_n8n_client(request: Request) -> N8NClient:
+    """FastAPI dependency returning the app's shared N8NClient"""
+    return request.app.state.n8n
@@ -13,6 +13,8 @@ __all__ = [
     "BaseModel",
     "TimestampMixin",
     "OrchestrationContext",
+    "OrchestrateResponse",
+    "MultiAgentOrchestrateResponse",
     "HealthCheckResponse",
     "ErrorResponse",
     
@@ -29,6 +31,7 @@ __all__ = [
     "ClaimResponse",
     "RejectionCode",
     "ClaimAnalysis",
+    "ClaimResubmissionResponse",
     
     # Translation models
     "TranslationRequest",
@@ -93,6 +93,24 @@ class OrchestrationContext(BaseModel):
             self.agents_chain.append(agent)
 
 
+class OrchestrateResponse(BaseModel):
+    """Result of a single-agent orchestration"""
+    
+    request_id: str
+    status: str
+    agent: str
+    result: Dict[str, Any]
+
+
+class MultiAgentOrchestrateResponse(BaseModel):
+    """Result of a multi-agent fan-out orchestration"""
+    
+    request_id: str
+    status: str
+    agents: List[str]
+    results: Dict[str, Dict[str, Any]]
+
+
 class HealthCheckResponse(BaseModel):
     """Standard health check response"""
     
@@ -178,7 +196,7 @@ class PaginatedResponse(BaseModel):
         )
 
 
-class AuditLog(BaseModel, TimestampMixin):
+class AuditLog(TimestampMixin):
     """Audit log entry for HIPAA compliance"""
     
     id: UUID = Field(default_factory=uuid4)
@@ -3,7 +3,7 @@ Clinical models for CLINICALLINC
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from enum import Enum
 from uuid import UUID, uuid4
 
@@ -33,7 +33,7 @@ class ClinicalDecisionRequest(BaseModel):
     current_medications: List[str] = Field(default_factory=list)
 
 
-class ClinicalDecisionResponse(BaseModel, TimestampMixin):
+class ClinicalDecisionResponse(TimestampMixin):
     """Response from clinical decision support"""
     
     request_id: UUID
@@ -57,7 +57,7 @@ class DrugInteractionCheck(BaseModel):
     medications: List[str]
 
 
-class DrugInteractionResponse(BaseModel, TimestampMixin):
+class DrugInteractionResponse(TimestampMixin):
     """Response from drug interaction check"""
     
     request_id: UUID
@@ -82,7 +82,7 @@ class CarePathwayRequest(BaseModel):
     comorbidities: List[str] = Field(default_factory=list)
 
 
-class CarePathwayResponse(BaseModel, TimestampMixin):
+class CarePathwayResponse(TimestampMixin):
     """Response with care pathway"""
     
     request_id: UUID
@@ -100,6 +100,15 @@ class CarePathwayResponse(BaseModel, TimestampMixin):
     n8n_workflow_id: Optional[str] = None
 
 
+class DiagnosticSuggestionRequest(BaseModel):
+    """Request for diagnostic suggestions"""
+    
+    symptoms: List[str]
+    patient_age: int
+    gender: Literal["M", "F", "O"]
+    vital_signs: Optional[Dict[str, float]] = None
+
+
 class DiagnosticSuggestion(BaseModel):
     """Diagnostic suggestion"""
     
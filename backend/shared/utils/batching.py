@@ -0,0 +1,99 @@
+"""
+Dynamic request batching for BrainSAIT LINC agents
+Coalesces concurrent calls that share a key into a single downstream call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+BatchHandler = Callable[[Hashable, List[Any]], Awaitable[List[Any]]]
+
+
+class DynamicBatcher:
+    """
+    Per-key batcher backed by an asyncio.Queue and a background consumer.
+
+    Callers ``submit`` an item and await its result. The consumer for that key
+    drains up to ``max_batch_size`` items, or whatever arrived within
+    ``max_wait_ms`` of the first one, and hands the whole batch to ``handler``,
+    which must return one result per item in the same order. An exception
+    instance in the results fails only that item's caller.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self._handler = handler
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queues: Dict[Hashable, asyncio.Queue] = {}
+        self._consumers: Dict[Hashable, asyncio.Task] = {}
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """Queue an item for the given key and wait for its result"""
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._consumers[key] = asyncio.create_task(self._consume(key, queue))
+
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((item, future))
+        return await future
+
+    async def _consume(self, key: Hashable, queue: asyncio.Queue) -> None:
+        """Drain the queue for a key into batches"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Any, asyncio.Future]] = [await queue.get()]
+            deadline = loop.time() + self._max_wait
+
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(key, batch)
+
+    async def _dispatch(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run the handler for one batch and resolve every waiter"""
+        items = [item for item, _ in batch]
+        try:
+            results = await self._handler(key, items)
+            if len(results) != len(items):
+                raise ValueError(
+                    f"Batch handler returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Cancel all consumers; pending callers receive CancelledError"""
+        for task in self._consumers.values():
+            task.cancel()
+        await asyncio.gather(*self._consumers.values(), return_exceptions=True)
+
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, future = queue.get_nowait()
+                future.cancel()
+
+        self._consumers.clear()
+        self._queues.clear()
@@ -0,0 +1,73 @@
+"""
+Circuit breaker for outbound calls from BrainSAIT LINC agents
+Fails fast while a dependency is down instead of queueing on its timeout
+"""
+
+from time import monotonic
+from typing import Optional
+
+from shared.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"circuit '{name}' is open; retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker with a single half-open probe
+
+    After ``fail_max`` consecutive failures the circuit opens and calls are
+    rejected for ``reset_timeout`` seconds. The first call after that is let
+    through as a probe: success closes the circuit, failure re-opens it. A
+    probe that never reports back (e.g. cancelled) just lets another through
+    after the next ``reset_timeout``.
+    State is per process and per event loop, so no locking is needed.
+    """
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._probing else "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through"""
+        if self._opened_at is None:
+            return
+        now = monotonic()
+        remaining = self.reset_timeout - (now - self._opened_at)
+        if remaining > 0:
+            raise CircuitOpenError(self.name, max(remaining, 1.0))
+        # Re-arm so only this call probes until the next window
+        self._opened_at = now
+        self._probing = True
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Circuit closed", circuit=self.name)
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self.fail_max):
+            logger.warning("Circuit opened", circuit=self.name, failures=self._failures)
+            self._opened_at = monotonic()
+            self._probing = False
@@ -0,0 +1,20 @@
+"""
+CORS middleware tuned for frequent preflight requests
+"""
+
+from starlette.middleware.cors import CORSMiddleware
+
+
+class FrozenCORSMiddleware(CORSMiddleware):
+    """
+    CORSMiddleware with origins, methods and headers held in frozensets
+
+    Starlette keeps these as lists, so every preflight does linear scans;
+    freezing them after init makes each membership test O(1).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.allow_origins = frozenset(self.allow_origins)
+        self.allow_methods = frozenset(self.allow_methods)
+        self.allow_headers = frozenset(self.allow_headers)
@@ -0,0 +1,72 @@
+"""
+Local drug-drug interaction lookup for CLINICALLINC
+Answers interaction checks in-process when every medication is known
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Severities at or above this rank make a combination unsafe to prescribe
+SEVERITY_RANK = {"minor": 0, "moderate": 1, "major": 2, "contraindicated": 3}
+UNSAFE_SEVERITY_RANK = SEVERITY_RANK["moderate"]
+
+
+def _normalize(drug: str) -> str:
+    return drug.strip().lower()
+
+
+class DrugInteractionTable:
+    """
+    Pairwise interaction table over integer-encoded drug IDs
+
+    The table is authoritative for its vocabulary: two known drugs with no
+    entry do not interact. Lists containing any unknown drug return None so
+    the caller can fall back to the n8n workflow.
+    """
+
+    def __init__(self, drugs: Iterable[str], interactions: Iterable[Dict[str, Any]]):
+        self._ids: Dict[str, int] = {}
+        self._pairs: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+        for drug in drugs:
+            self._encode(drug)
+
+        for interaction in interactions:
+            a = self._encode(interaction["drug_a"])
+            b = self._encode(interaction["drug_b"])
+            self._pairs[(min(a, b), max(a, b))] = interaction
+
+    @classmethod
+    def from_file(cls, path: str) -> "DrugInteractionTable":
+        """Load a table from a JSON file with 'drugs' and 'interactions' keys"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("drugs", []), data.get("interactions", []))
+
+    def _encode(self, drug: str) -> int:
+        return self._ids.setdefault(_normalize(drug), len(self._ids))
+
+    def find_interactions(self, medications: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Return all interacting pairs, or None if any medication is unknown"""
+        ids = []
+        for medication in medications:
+            drug_id = self._ids.get(_normalize(medication))
+            if drug_id is None:
+                return None
+            ids.append(drug_id)
+
+        found = []
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                interaction = self._pairs.get((a, b) if a < b else (b, a))
+                if interaction is not None:
+                    found.append(interaction)
+        return found
+
+    @staticmethod
+    def is_safe(interactions: List[Dict[str, Any]]) -> bool:
+        """True if no interaction reaches the unsafe severity threshold"""
+        return all(
+            SEVERITY_RANK.get(i.get("severity", "major"), UNSAFE_SEVERITY_RANK) < UNSAFE_SEVERITY_RANK
+            for i in interactions
+        )
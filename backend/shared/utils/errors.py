@@ -0,0 +1,31 @@
+"""
+Error responses shared by BrainSAIT LINC agents
+"""
+
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+
+from shared.utils.circuit_breaker import CircuitOpenError
+
+# Prebuilt 500 body; exception text is logged, never echoed to callers
+INTERNAL_ERROR = ORJSONResponse({"detail": "internal_error"}, status_code=500)
+
+
+def register_error_handlers(app: FastAPI, logger) -> None:
+    """
+    Log unexpected errors with a traceback and answer with INTERNAL_ERROR;
+    calls rejected by an open circuit get a 503 with Retry-After
+    """
+
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open(request: Request, exc: CircuitOpenError):
+        return ORJSONResponse(
+            {"detail": "service_unavailable"},
+            status_code=503,
+            headers={"Retry-After": str(int(exc.retry_after))},
+        )
+
+    @app.exception_handler(Exception)
+    async def unhandled_exception(request: Request, exc: Exception):
+        logger.exception("Unhandled error", path=request.url.path)
+        return INTERNAL_ERROR
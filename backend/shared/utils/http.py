@@ -0,0 +1,52 @@
+"""
+Pooled HTTP client factory for BrainSAIT LINC agents
+"""
+
+from typing import Optional
+
+import httpx
+
+
+def create_http_client(
+    timeout: float = 5.0,
+    connect_timeout: float = 1.0,
+    max_connections: int = 200,
+    max_keepalive_connections: int = 100,
+    **kwargs,
+) -> httpx.AsyncClient:
+    """
+    Create a shared AsyncClient with keep-alive pooling and HTTP/2
+
+    Build one per process in the app lifespan and close it on shutdown,
+    so every outbound call reuses warm connections. Responses may come
+    back gzip- or brotli-compressed; httpx decodes them transparently.
+    """
+    headers = {"Accept-Encoding": "gzip, br", **kwargs.pop("headers", {})}
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+        http2=True,
+        headers=headers,
+        **kwargs,
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag
+
+    The header is a comma-separated list of entity tags or "*". Tags are
+    compared weakly (RFC 9110 section 13.1.2), so W/"x" matches "x".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
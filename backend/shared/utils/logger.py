@@ -2,18 +2,69 @@
 Structured logging setup for BrainSAIT LINC agents
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict
+import orjson
 import structlog
 
 from shared.config.settings import settings
 
+# Calls below this level are no-ops on the filtering bound logger
+LOG_LEVEL = getattr(logging, settings.log_level.upper(), logging.INFO)
 
-def setup_logger(name: str) -> structlog.BoundLogger:
-    """Setup structured logger with HIPAA compliance"""
-    
-    # Configure structlog
+# Records waiting for the writer thread; beyond this, new records are dropped
+LOG_QUEUE_SIZE = 10000
+
+_configured = False
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def _render(event_dict: Dict[str, Any], **kwargs: Any) -> str:
+    # orjson renders UUIDs and datetimes natively, so callers pass them as-is
+    return orjson.dumps(event_dict).decode()
+
+
+def _configure_handlers() -> None:
+    """
+    Route the root logger through a queue
+
+    Request handlers only render and enqueue; a QueueListener thread does
+    the stream writes, so slow stdout never stalls the event loop.
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.handlers = [_DroppingQueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+
+
+def _configure() -> None:
+    """Configure structlog once per process"""
+    global _configured
+    if _configured:
+        return
+
+    _configure_handlers()
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
@@ -21,17 +72,23 @@ def setup_logger(name: str) -> structlog.BoundLogger:
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer()
+            structlog.processors.JSONRenderer(serializer=_render)
         ],
-        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+        wrapper_class=structlog.make_filtering_bound_logger(LOG_LEVEL),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
-    
+    _configured = True
+
+
+def setup_logger(name: str) -> structlog.BoundLogger:
+    """Setup structured logger with HIPAA compliance"""
+    _configure()
     return structlog.get_logger(name)
 
 
 def get_logger(name: str) -> structlog.BoundLogger:
     """Get logger instance"""
+    _configure()
     return structlog.get_logger(name)
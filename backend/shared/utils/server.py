@@ -0,0 +1,27 @@
+"""
+Uvicorn entry point for BrainSAIT LINC agents
+"""
+
+import os
+
+from shared.config.settings import settings
+
+
+def run_agent(app_path: str, port: int) -> None:
+    """
+    Serve an agent app with uvicorn
+
+    One process per core in production; each worker builds its own clients
+    in lifespan. Debug runs a single reloading process.
+    """
+    import uvicorn
+
+    uvicorn.run(
+        app_path,
+        host=settings.api_host,
+        port=port,
+        reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=1 if settings.debug else (os.cpu_count() or 2),
+    )
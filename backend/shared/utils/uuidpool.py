@@ -0,0 +1,42 @@
+"""
+Pooled UUID4 generation for BrainSAIT LINC agents
+Amortizes the os.urandom syscall across a block of identifiers
+"""
+
+import os
+from typing import List
+from uuid import UUID
+
+
+class UUIDPool:
+    """
+    Hands out random (version 4) UUIDs carved from one urandom read per block
+
+    Synchronous on purpose: a queue and pump task would cost more per ID
+    than the syscall it saves. Pending IDs are dropped in forked children so
+    workers never share a block.
+    """
+
+    def __init__(self, block_size: int = 256):
+        self.block_size = block_size
+        self._pending: List[UUID] = []
+        os.register_at_fork(after_in_child=self._reset)
+
+    def __call__(self) -> UUID:
+        if not self._pending:
+            self._refill()
+        return self._pending.pop()
+
+    def _reset(self) -> None:
+        self._pending = []
+
+    def _refill(self) -> None:
+        buf = bytearray(os.urandom(16 * self.block_size))
+        for i in range(0, len(buf), 16):
+            buf[i + 6] = (buf[i + 6] & 0x0F) | 0x40  # version 4
+            buf[i + 8] = (buf[i + 8] & 0x3F) | 0x80  # RFC 4122 variant
+        self._pending = [UUID(bytes=bytes(buf[i:i + 16])) for i in range(0, len(buf), 16)]
+
+
+# Process-wide pool; drop-in for uuid.uuid4()
+pooled_uuid4 = UUIDPool()
@@ -1,15 +1,24 @@
 """Pytest configuration and fixtures"""
+import os
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+
+# Minimum bcrypt cost keeps password hashing out of test time
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_async_db, get_async_sessionmaker, get_db, to_async_url
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL))
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 
 def override_get_db():
@@ -21,6 +30,12 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """Override async database dependency for testing"""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def db():
     """Database fixture"""
@@ -29,11 +44,41 @@ def db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest_asyncio.fixture
+async def async_db(db):
+    """Async session on the same test database"""
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+
 @pytest.fixture(scope="function")
 def client():
     """Test client fixture"""
     Base.metadata.create_all(bind=engine)
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_sessionmaker] = lambda: TestingAsyncSessionLocal
     with TestClient(app) as test_client:
         yield test_client
     Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def learner(client: TestClient):
+    """Registered user whose access token authenticates the client"""
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "learner@example.com",
+            "password": "testpass123",
+            "full_name": "Learner",
+            "preferred_language": "ar"
+        }
+    )
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "learner@example.com", "password": "testpass123"}
+    )
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+    yield response.json()
+    del client.headers["Authorization"]
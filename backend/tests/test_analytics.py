@@ -0,0 +1,74 @@
+"""Tests for analytics service"""
+import pytest
+from app.models.course import Course, CourseType
+from app.models.enrollment import Enrollment, EnrollmentStatus, SubscriptionTier
+from app.models.payment import Payment, PaymentStatus
+from app.models.user import User, UserType
+from app.services.analytics_service import AnalyticsService
+
+
+@pytest.mark.asyncio
+async def test_platform_and_learner_metrics(db, async_db):
+    """Test metrics are counted in one query each and cached"""
+    student = User(email="s@example.com", hashed_password="x", full_name="S", user_type=UserType.STUDENT)
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS, is_active=True)
+    db.add_all([student, course])
+    db.flush()
+    db.add_all([
+        Enrollment(user_id=student.id, course_id=course.id, subscription_tier=SubscriptionTier.BASIC,
+                   status=EnrollmentStatus.ACTIVE),
+        Enrollment(user_id=student.id, course_id=course.id, subscription_tier=SubscriptionTier.BASIC,
+                   status=EnrollmentStatus.COMPLETED),
+        Payment(user_id=student.id, amount=100, status=PaymentStatus.COMPLETED),
+    ])
+    db.commit()
+    AnalyticsService.get_individual_learner_metrics.cache_clear()
+    AnalyticsService.get_platform_metrics.cache_clear()
+    
+    assert await AnalyticsService.get_individual_learner_metrics(async_db) == {
+        "total_students": 1,
+        "active_enrollments": 1,
+        "completed_enrollments": 1,
+        "completion_rate": 100.0
+    }
+    assert await AnalyticsService.get_platform_metrics(async_db) == {
+        "total_users": 1,
+        "total_courses": 1,
+        "total_enrollments": 2,
+        "total_revenue_sar": 115.0
+    }
+    
+    # Served from memory until METRICS_TTL passes
+    db.query(Enrollment).delete()
+    db.commit()
+    assert (await AnalyticsService.get_platform_metrics(async_db))["total_enrollments"] == 2
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio.Redis for ResponseCache get and set"""
+    
+    def __init__(self):
+        self.data = {}
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.mark.asyncio
+async def test_metrics_shared_through_redis(db, async_db):
+    """Test metrics cached in Redis are served to every worker"""
+    db.add(User(email="c@example.com", hashed_password="x", full_name="C", user_type=UserType.CORPORATE))
+    db.commit()
+    redis_client = _FakeRedis()
+    
+    expected = {"corporate_accounts": 1, "corporate_enrollments": 0}
+    assert await AnalyticsService.get_corporate_metrics(async_db, redis_client) == expected
+    assert "analytics:corporate:v1" in redis_client.data
+    
+    # Any worker now reads the shared figures instead of the database
+    db.query(User).delete()
+    db.commit()
+    assert await AnalyticsService.get_corporate_metrics(async_db, redis_client) == expected
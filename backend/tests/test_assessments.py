@@ -0,0 +1,36 @@
+"""Tests for assessment endpoints"""
+from fastapi.testclient import TestClient
+from app.models.assessment import Assessment, AssessmentType
+from app.models.course import Course, CourseType
+
+
+def test_start_assessment_attempt_limit(client: TestClient, db, learner):
+    """Test attempts are numbered and capped at max_attempts"""
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS)
+    db.add(course)
+    db.flush()
+    assessment = Assessment(
+        course_id=course.id,
+        title="Quiz",
+        title_ar="اختبار",
+        assessment_type=AssessmentType.QUIZ,
+        max_attempts=2
+    )
+    db.add(assessment)
+    db.commit()
+    
+    url = f"/api/v1/assessments/{assessment.id}/start"
+    first = client.post(url)
+    second = client.post(url)
+    third = client.post(url)
+    
+    assert first.status_code == 200
+    assert first.json()["attempt_number"] == 1
+    assert second.json()["attempt_number"] == 2
+    assert third.status_code == 400
+
+
+def test_start_missing_assessment(client: TestClient, learner):
+    """Test starting an unknown assessment"""
+    response = client.post("/api/v1/assessments/999/start")
+    assert response.status_code == 404
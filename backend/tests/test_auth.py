@@ -94,3 +94,60 @@ def test_health_check(client: TestClient):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+
+
+def test_register_duplicate_national_id(client: TestClient):
+    """Test registration with duplicate national ID"""
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "first@example.com",
+            "password": "testpass123",
+            "full_name": "First User",
+            "saudi_national_id": "1234567897",
+            "preferred_language": "ar"
+        }
+    )
+    
+    response = client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "second@example.com",
+            "password": "testpass123",
+            "full_name": "Second User",
+            "saudi_national_id": "1234567897",
+            "preferred_language": "ar"
+        }
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "National ID already registered"
+
+
+def test_access_token_reads_current_user(client: TestClient):
+    """Test access token claims authenticate /users/me"""
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "password": "testpass123",
+            "full_name": "Test User",
+            "preferred_language": "ar"
+        }
+    )
+    login = client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "test@example.com",
+            "password": "testpass123"
+        }
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+    
+    # Refresh tokens are not accepted as access tokens
+    headers = {"Authorization": f"Bearer {login.json()['refresh_token']}"}
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
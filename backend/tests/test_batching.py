@@ -0,0 +1,89 @@
+"""Tests for the dynamic request batcher"""
+import asyncio
+import pytest
+from shared.utils.batching import DynamicBatcher
+
+
+class _RecordingHandler:
+    """Batch handler that records each batch and echoes items doubled"""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    async def __call__(self, key, items):
+        self.batches.append((key, list(items)))
+        return [
+            ValueError(f"bad item {item}") if item == self.fail_on else item * 2
+            for item in items
+        ]
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full():
+    """Test a full batch is dispatched without waiting for the timeout"""
+    handler = _RecordingHandler()
+    batcher = DynamicBatcher(handler, max_batch_size=3, max_wait_ms=10_000)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit("agent", i) for i in range(3))), timeout=1
+    )
+    await batcher.aclose()
+
+    assert results == [0, 2, 4]
+    assert handler.batches == [("agent", [0, 1, 2])]
+
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_after_wait():
+    """Test a partial batch is dispatched once max_wait_ms has passed"""
+    handler = _RecordingHandler()
+    batcher = DynamicBatcher(handler, max_batch_size=10, max_wait_ms=20)
+
+    results = await asyncio.gather(batcher.submit("agent", 1), batcher.submit("agent", 2))
+    await batcher.aclose()
+
+    assert results == [2, 4]
+    assert handler.batches == [("agent", [1, 2])]
+
+
+@pytest.mark.asyncio
+async def test_batches_per_key():
+    """Test items for different keys never share a batch"""
+    handler = _RecordingHandler()
+    batcher = DynamicBatcher(handler, max_batch_size=10, max_wait_ms=5)
+
+    await asyncio.gather(batcher.submit("a", 1), batcher.submit("b", 2), batcher.submit("a", 3))
+    await batcher.aclose()
+
+    assert sorted(handler.batches) == [("a", [1, 3]), ("b", [2])]
+
+
+@pytest.mark.asyncio
+async def test_exception_result_fails_only_its_caller():
+    """Test an exception in the results is raised for that item alone"""
+    batcher = DynamicBatcher(_RecordingHandler(fail_on=2), max_batch_size=3, max_wait_ms=10_000)
+
+    results = await asyncio.gather(
+        *(batcher.submit("agent", i) for i in (1, 2, 3)), return_exceptions=True
+    )
+    await batcher.aclose()
+
+    assert results[0] == 2 and results[2] == 6
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_wrong_result_count_fails_whole_batch():
+    """Test results that cannot be matched to callers fail every caller"""
+    async def short_handler(key, items):
+        return items[:-1]
+
+    batcher = DynamicBatcher(short_handler, max_batch_size=2, max_wait_ms=10_000)
+
+    results = await asyncio.gather(
+        batcher.submit("agent", 1), batcher.submit("agent", 2), return_exceptions=True
+    )
+    await batcher.aclose()
+
+    assert all(isinstance(r, ValueError) for r in results)
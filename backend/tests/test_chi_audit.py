@@ -0,0 +1,115 @@
+"""Tests for the CHI audit simulator's batched case audit"""
+import pytest
+from sqlalchemy import text
+
+pytest.importorskip("numpy")
+
+from app.services import chi_audit_simulator
+from app.services.chi_audit_simulator import AuditAggregate, CHIAuditSimulator
+
+
+class _FixtureSimulator(CHIAuditSimulator):
+    """Simulator whose record-level validators read their answers from the claim"""
+
+    def _load_risk_weights(self):
+        return {}
+
+    async def _validate_documentation(self, medical_record):
+        return {"is_complete": medical_record["complete"]}
+
+    async def _validate_billing_compliance(self, claim):
+        violations = claim.get("violations", [])
+        return {"is_compliant": not violations, "violations": violations}
+
+    async def _validate_time_based_rules(self, claim):
+        return {"is_compliant": not claim.get("same_day_conflict", False)}
+
+    def _generate_case_recommendations(self, errors):
+        return [e["code"] for e in errors]
+
+
+def _claim(i, sbs_code, diagnosis_code, complete=True, **extra):
+    return {
+        "id": f"C{i}",
+        "patient_id": f"P{i}",
+        "sbs_code": sbs_code,
+        "diagnosis_codes": [diagnosis_code],
+        "amount": 100.0 * i,
+        "medical_record": {"complete": complete},
+        **extra
+    }
+
+
+_UNBUNDLING = {
+    "code": "SBS004",
+    "severity": "high",
+    "description_ar": "فصل الإجراءات المجمعة",
+    "description_en": "Unbundled procedures"
+}
+
+# Clean; unknown code; unnecessary and undocumented; billing and timing findings
+_CLAIMS = [
+    _claim(1, "1001", "I10"),
+    _claim(2, "9999", "I10"),
+    _claim(3, "1002", "I10", complete=False),
+    _claim(4, "1001", "I10", violations=[_UNBUNDLING], same_day_conflict=True),
+]
+
+
+@pytest.fixture
+def reference_data(db):
+    """SBS code list and necessity pairs for version 2.0"""
+    db.execute(text("CREATE TABLE sbs_codes (code TEXT, version TEXT)"))
+    db.execute(text(
+        "CREATE TABLE sbs_medical_necessity (diagnosis_code TEXT, sbs_code TEXT, version TEXT)"
+    ))
+    db.execute(text("INSERT INTO sbs_codes VALUES ('1001', '2.0'), ('1002', '2.0')"))
+    db.execute(text(
+        "INSERT INTO sbs_medical_necessity VALUES ('I10', '1001', '2.0'), ('E11', '1002', '2.0')"
+    ))
+    db.commit()
+    chi_audit_simulator._reference_sets.clear()
+    yield
+    chi_audit_simulator._reference_sets.clear()
+    db.execute(text("DROP TABLE sbs_codes"))
+    db.execute(text("DROP TABLE sbs_medical_necessity"))
+    db.commit()
+
+
+@pytest.mark.asyncio
+async def test_audit_cases_scores_each_claim(reference_data, async_db):
+    """Test a batch is checked against the reference data and scored per claim"""
+    simulator = _FixtureSimulator(async_db)
+    results = await simulator._audit_cases(_CLAIMS, "2.0", "2026-01-01T00:00:00")
+
+    assert [r["claim_id"] for r in results] == ["C1", "C2", "C3", "C4"]
+    assert [[e["code"] for e in r["errors"]] for r in results] == [
+        [], ["SBS001", "SBS002"], ["SBS002", "SBS003"], ["SBS004", "SBS005"]
+    ]
+    assert [r["penalty_points"] for r in results] == [0, 15, 8, 8]
+    assert [r["has_errors"] for r in results] == [False, True, True, True]
+    assert {r["audit_timestamp"] for r in results} == {"2026-01-01T00:00:00"}
+
+    single = await simulator._audit_single_case(_CLAIMS[1], "2.0")
+    assert single["penalty_points"] == 15
+
+
+@pytest.mark.asyncio
+async def test_audit_aggregate_keeps_counters_and_worst_cases(reference_data, async_db):
+    """Test the aggregate's columns, counters and worst-case heap"""
+    results = await _FixtureSimulator(async_db)._audit_cases(_CLAIMS, "2.0")
+    audit = AuditAggregate(capacity=len(results), worst_case_limit=2)
+    for case_result in results:
+        audit.add(case_result)
+
+    assert audit.case_count == 4
+    assert audit.columns["penalty_points"].tolist() == [0, 15, 8, 8]
+    assert audit.columns["billed_amount"].tolist() == [100.0, 200.0, 300.0, 400.0]
+    assert audit.total_penalty_points == 31
+    assert audit.cases_with_errors == 3
+    assert audit.error_counts == {"SBS001": 1, "SBS002": 2, "SBS003": 1, "SBS004": 1, "SBS005": 1}
+    assert audit.severity_counts == {"critical": 1, "high": 3, "medium": 2}
+    assert audit.severity_penalties == {"critical": 10, "high": 15, "medium": 6}
+    assert audit.has_severe_errors
+    # Ties keep the later case
+    assert [case["claim_id"] for case in audit.worst_cases] == ["C2", "C4"]
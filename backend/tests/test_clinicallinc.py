@@ -0,0 +1,68 @@
+"""Tests for CLINICALLINC's drug interaction endpoint"""
+from uuid import uuid4
+import pytest
+
+pytest.importorskip("msgspec")
+
+from agents.clinicallinc.main import check_drug_interactions
+from shared.models.clinical import DrugInteractionCheck
+from shared.utils.drug_interactions import DrugInteractionTable
+
+
+class _RecordingN8N:
+    """Stands in for N8NClient; records workflow calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def trigger_workflow_batched(self, workflow_name, data):
+        self.calls.append(workflow_name)
+        return {"data": {"has_interactions": False, "safe_to_prescribe": True}, "workflow_id": "wf-1"}
+
+
+@pytest.fixture
+def table():
+    return DrugInteractionTable(
+        ["warfarin", "aspirin"],
+        [{"drug_a": "warfarin", "drug_b": "aspirin", "severity": "major", "description": "Bleeding"}]
+    )
+
+
+@pytest.mark.asyncio
+async def test_known_drugs_without_patient_are_answered_locally(table):
+    """Test a patient-less check over known drugs never reaches n8n"""
+    n8n = _RecordingN8N()
+
+    response = await check_drug_interactions(
+        DrugInteractionCheck(medications=["warfarin", "aspirin"]), n8n, table
+    )
+
+    assert n8n.calls == []
+    assert response.has_interactions and not response.safe_to_prescribe
+    assert response.severity_summary == {"major": 1}
+    assert response.warnings == ["Bleeding"]
+
+
+@pytest.mark.asyncio
+async def test_patient_checks_fall_back_to_n8n(table):
+    """Test a check with a patient ID goes to n8n even when the drugs are known"""
+    n8n = _RecordingN8N()
+
+    response = await check_drug_interactions(
+        DrugInteractionCheck(patient_id=uuid4(), medications=["warfarin", "aspirin"]), n8n, table
+    )
+
+    assert n8n.calls == ["drug_interaction_check"]
+    assert response.n8n_workflow_id == "wf-1"
+
+
+@pytest.mark.asyncio
+async def test_unknown_drugs_fall_back_to_n8n(table):
+    """Test a medication outside the table defers to n8n"""
+    n8n = _RecordingN8N()
+
+    await check_drug_interactions(
+        DrugInteractionCheck(medications=["warfarin", "ibuprofen"]), n8n, table
+    )
+
+    assert n8n.calls == ["drug_interaction_check"]
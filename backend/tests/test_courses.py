@@ -0,0 +1,65 @@
+"""Tests for course endpoints"""
+from fastapi.testclient import TestClient
+from app.models.course import Course, CourseType
+
+
+def test_list_courses_empty(client: TestClient):
+    """Test listing courses with none published"""
+    response = client.get("/api/v1/courses/")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_get_course_not_found(client: TestClient):
+    """Test fetching a missing course"""
+    response = client.get("/api/v1/courses/999")
+    assert response.status_code == 404
+
+
+def test_list_courses_published(client: TestClient, db):
+    """Test listing returns published, active courses"""
+    db.add(Course(
+        title="Coding",
+        title_ar="الترميز",
+        course_type=CourseType.FUNDAMENTALS,
+        is_active=True,
+        is_published=True
+    ))
+    db.commit()
+    
+    response = client.get("/api/v1/courses/")
+    assert response.status_code == 200
+    assert [c["title"] for c in response.json()] == ["Coding"]
+
+
+def test_list_courses_etag(client: TestClient):
+    """Test conditional GET returns 304 for a matching ETag"""
+    response = client.get("/api/v1/courses/")
+    etag = response.headers["etag"]
+    
+    response = client.get("/api/v1/courses/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_list_courses_etag_list_and_weak_forms(client: TestClient):
+    """Test If-None-Match lists, weak tags and "*" are matched per RFC 9110"""
+    etag = client.get("/api/v1/courses/").headers["etag"]
+    
+    for header in (f'"stale", {etag}', f"W/{etag}", f'W/"stale",W/{etag}', "*"):
+        response = client.get("/api/v1/courses/", headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+    
+    response = client.get("/api/v1/courses/", headers={"If-None-Match": '"stale", W/"other"'})
+    assert response.status_code == 200
+
+
+def test_get_course(client: TestClient, db):
+    """Test fetching a course by ID"""
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS)
+    db.add(course)
+    db.commit()
+    
+    response = client.get(f"/api/v1/courses/{course.id}")
+    assert response.status_code == 200
+    assert response.json()["title_ar"] == "الترميز"
+    assert "etag" in response.headers
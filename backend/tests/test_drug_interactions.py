@@ -0,0 +1,41 @@
+"""Tests for the local drug interaction table"""
+from shared.utils.drug_interactions import DrugInteractionTable
+
+WARFARIN_ASPIRIN = {"drug_a": "Warfarin", "drug_b": "Aspirin", "severity": "major"}
+METFORMIN_ASPIRIN = {"drug_a": "metformin", "drug_b": "aspirin", "severity": "minor"}
+
+
+def _table():
+    return DrugInteractionTable(
+        ["warfarin", "aspirin", "metformin", "paracetamol"],
+        [WARFARIN_ASPIRIN, METFORMIN_ASPIRIN]
+    )
+
+
+def test_unknown_drug_returns_none():
+    """Test any medication outside the vocabulary defers to the caller"""
+    assert _table().find_interactions(["warfarin", "ibuprofen"]) is None
+
+
+def test_pairs_are_found_in_either_order():
+    """Test a pair is found whichever drug is listed first, ignoring case"""
+    table = _table()
+
+    assert table.find_interactions(["warfarin", "aspirin"]) == [WARFARIN_ASPIRIN]
+    assert table.find_interactions([" ASPIRIN", "Warfarin"]) == [WARFARIN_ASPIRIN]
+
+
+def test_known_drugs_without_entry_do_not_interact():
+    """Test the table is authoritative for drugs it knows"""
+    assert _table().find_interactions(["warfarin", "metformin", "paracetamol"]) == []
+
+
+def test_is_safe_applies_severity_threshold():
+    """Test moderate and worse interactions are unsafe, minor ones are not"""
+    assert DrugInteractionTable.is_safe([])
+    assert DrugInteractionTable.is_safe([{"severity": "minor"}])
+    assert not DrugInteractionTable.is_safe([{"severity": "moderate"}])
+    assert not DrugInteractionTable.is_safe([{"severity": "minor"}, {"severity": "major"}])
+    # Missing or unrecognised severities are treated as unsafe
+    assert not DrugInteractionTable.is_safe([{}])
+    assert not DrugInteractionTable.is_safe([{"severity": "unknown"}])
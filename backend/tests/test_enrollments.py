@@ -0,0 +1,343 @@
+"""Tests for enrollment and payment endpoints"""
+from fastapi.testclient import TestClient
+from app.api.v1 import enrollments as enrollments_api
+from app.models.course import Course, CourseType
+from app.models.enrollment import Enrollment, SubscriptionTier
+from app.models.user import User
+from app.services.enrollment_tasks import insert_enrollments
+from app.services.payment_service import PaymentService
+
+
+def test_create_enrollment(client: TestClient, db, learner):
+    """Test enrolling once and listing the enrollment"""
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS)
+    db.add(course)
+    db.commit()
+    
+    params = {"course_id": course.id, "subscription_tier": "basic", "modality": "online"}
+    first = client.post("/api/v1/enrollments/", params=params)
+    second = client.post("/api/v1/enrollments/", params=params)
+    
+    assert first.status_code == 200
+    assert first.json()["status"] == "pending"
+    assert second.status_code == 400
+    
+    response = client.get("/api/v1/enrollments/my-enrollments")
+    assert [e["course_id"] for e in response.json()] == [course.id]
+    assert "learning_path" not in response.json()[0]
+    
+    response = client.get("/api/v1/enrollments/my-enrollments", params={"skip": 1})
+    assert response.json() == []
+
+
+def test_enroll_missing_course(client: TestClient, learner):
+    """Test enrolling in an unknown course"""
+    params = {"course_id": 999, "subscription_tier": "basic", "modality": "online"}
+    response = client.post("/api/v1/enrollments/", params=params)
+    assert response.status_code == 404
+
+
+def test_create_payment_intent(client: TestClient, learner):
+    """Test payment intent adds VAT and is listed"""
+    assert client.get("/api/v1/payments/my-payments").json() == []
+    
+    response = client.post(
+        "/api/v1/payments/create-payment-intent",
+        params={"amount": 100, "enrollment_id": 1}
+    )
+    assert response.status_code == 200
+    assert response.json()["total_amount"] == 115
+    
+    listing = client.get("/api/v1/payments/my-payments")
+    assert [p["id"] for p in listing.json()] == [response.json()["payment_id"]]
+    assert listing.headers["cache-control"] == "private, max-age=30"
+    
+    etag = listing.headers["etag"]
+    cached = client.get("/api/v1/payments/my-payments", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    
+    # VAT is rounded to the halala, as Stripe is charged
+    uneven = client.post(
+        "/api/v1/payments/create-payment-intent",
+        params={"amount": 99.99, "enrollment_id": 1}
+    )
+    assert uneven.json()["vat_amount"] == 15.0
+    assert uneven.json()["total_amount"] == 114.99
+    changed = client.get("/api/v1/payments/my-payments", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()) == 2
+
+
+def test_bulk_enrollment(client: TestClient, db):
+    """Test bulk enrollment skips duplicates and rejects unknown courses"""
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS)
+    db.add(course)
+    db.commit()
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "hr@example.com",
+            "password": "testpass123",
+            "full_name": "HR",
+            "user_type": "corporate",
+            "preferred_language": "ar"
+        }
+    )
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "hr@example.com", "password": "testpass123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+    
+    item = {"user_id": user_id, "course_id": course.id, "modality": "online"}
+    response = client.post("/api/v1/enrollments/bulk", json=[item, item], headers=headers)
+    assert response.json() == {"created": 1, "skipped": 1}
+    
+    response = client.post("/api/v1/enrollments/bulk", json=[item], headers=headers)
+    assert response.json() == {"created": 0, "skipped": 1}
+    
+    enrollment = db.query(Enrollment).one()
+    assert enrollment.is_bulk_enrollment is True
+    assert enrollment.corporate_account_id == user_id
+    
+    item["course_id"] = 999
+    response = client.post("/api/v1/enrollments/bulk", json=[item], headers=headers)
+    assert response.status_code == 404
+
+
+def test_corporate_bulk_enrollment_stays_in_organization(client: TestClient, db):
+    """Test corporate accounts only enroll users of their own organization"""
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS)
+    db.add_all([
+        course,
+        User(email="colleague@example.com", hashed_password="x", full_name="Colleague",
+             organization="Acme Hospital"),
+        User(email="outsider@example.com", hashed_password="x", full_name="Outsider",
+             organization="Other Clinic")
+    ])
+    db.commit()
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "hr@example.com",
+            "password": "testpass123",
+            "full_name": "HR",
+            "user_type": "corporate",
+            "preferred_language": "ar"
+        }
+    )
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "hr@example.com", "password": "testpass123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    db.query(User).filter(User.email == "hr@example.com").update({"organization": "Acme Hospital"})
+    db.commit()
+    users = {u.email: u.id for u in db.query(User)}
+    
+    def enroll(user_id):
+        item = {"user_id": user_id, "course_id": course.id, "modality": "online"}
+        return client.post("/api/v1/enrollments/bulk", json=[item], headers=headers)
+    
+    assert enroll(users["colleague@example.com"]).json() == {"created": 1, "skipped": 0}
+    outsider = enroll(users["outsider@example.com"])
+    missing = enroll(999)
+    assert outsider.status_code == missing.status_code == 404
+    assert outsider.json() == missing.json() == {"detail": "Users not found"}
+    assert db.query(Enrollment).count() == 1
+
+
+def test_bulk_enrollment_skips_pairs_enrolled_concurrently(client: TestClient, db, monkeypatch):
+    """Test a pair enrolled after the duplicate check is skipped, not a 500"""
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS)
+    db.add(course)
+    db.commit()
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "hr@example.com",
+            "password": "testpass123",
+            "full_name": "HR",
+            "user_type": "corporate",
+            "preferred_language": "ar"
+        }
+    )
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "hr@example.com", "password": "testpass123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+    
+    checked = enrollments_api._new_enrollments
+    
+    async def enrolled_meanwhile(*args):
+        payloads = await checked(*args)
+        # Another request enrolls the same pair before this one inserts
+        db.add(Enrollment(user_id=user_id, course_id=course.id,
+                          subscription_tier=SubscriptionTier.BASIC, modality="online"))
+        db.commit()
+        return payloads
+    
+    monkeypatch.setattr(enrollments_api, "_new_enrollments", enrolled_meanwhile)
+    item = {"user_id": user_id, "course_id": course.id, "modality": "online"}
+    response = client.post("/api/v1/enrollments/bulk", json=[item], headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"created": 0, "skipped": 1}
+    assert db.query(Enrollment).count() == 1
+
+
+def test_bulk_enrollment_requires_role(client: TestClient, learner):
+    """Test students cannot bulk enroll"""
+    response = client.post("/api/v1/enrollments/bulk", json=[])
+    assert response.status_code == 403
+
+
+def test_insert_queued_enrollments(db):
+    """Test the flush task's insert skips pairs already enrolled"""
+    course = Course(title="Coding", title_ar="الترميز", course_type=CourseType.FUNDAMENTALS)
+    db.add(course)
+    db.commit()
+    payload = {
+        "user_id": 1,
+        "course_id": course.id,
+        "subscription_tier": "corporate",
+        "modality": "online",
+        "corporate_account_id": 7
+    }
+    
+    insert_enrollments(db, [payload])
+    insert_enrollments(db, [payload, {**payload, "user_id": 2}])
+    db.commit()
+    
+    assert sorted(e.user_id for e in db.query(Enrollment)) == [1, 2]
+
+
+def test_checkout_pays_enrollments_together(client: TestClient, db, learner):
+    """Test one payment covers several pending enrollments and is reused"""
+    courses = [
+        Course(title=f"Course {i}", title_ar="دورة", course_type=CourseType.FUNDAMENTALS,
+               price_basic=100.0 * (i + 1), price_premium=500.0)
+        for i in range(2)
+    ]
+    db.add_all(courses)
+    db.commit()
+    enrollment_ids = [
+        client.post(
+            "/api/v1/enrollments/",
+            params={"course_id": course.id, "subscription_tier": tier, "modality": "online"}
+        ).json()["id"]
+        for course, tier in zip(courses, ["basic", "premium"])
+    ]
+    
+    response = client.post("/api/v1/payments/checkout", json={"enrollment_ids": enrollment_ids})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["amount"] for item in body["items"]] == [100.0, 500.0]
+    assert body["amount"] == 600.0
+    assert body["total_amount"] == 690.0
+    
+    again = client.post("/api/v1/payments/checkout", json={"enrollment_ids": enrollment_ids[::-1]})
+    assert again.json()["payment_id"] == body["payment_id"]
+    assert again.json()["payment_intent_id"] == body["payment_intent_id"]
+    
+    missing = client.post("/api/v1/payments/checkout", json={"enrollment_ids": [999]})
+    assert missing.status_code == 404
+
+
+def test_checkout_charges_vat_to_the_halala(client: TestClient, db, learner, monkeypatch):
+    """Test checkout VAT is rounded once on the subtotal and stored as charged"""
+    charged = []
+    create_batch = PaymentService.create_payment_intent_batch
+    
+    async def recording_batch(items, **kwargs):
+        charged.append(sum(item["amount_minor"] for item in items))
+        return await create_batch(items, **kwargs)
+    
+    monkeypatch.setattr(PaymentService, "create_payment_intent_batch", staticmethod(recording_batch))
+    courses = [
+        Course(title=f"Course {i}", title_ar="دورة", course_type=CourseType.FUNDAMENTALS,
+               price_basic=10.03)
+        for i in range(2)
+    ]
+    db.add_all(courses)
+    db.commit()
+    enrollment_ids = [
+        client.post(
+            "/api/v1/enrollments/",
+            params={"course_id": course.id, "subscription_tier": "basic", "modality": "online"}
+        ).json()["id"]
+        for course in courses
+    ]
+    
+    # Rounding each item's VAT would give 3.00; VAT on 20.06 is 3.01
+    body = client.post("/api/v1/payments/checkout", json={"enrollment_ids": enrollment_ids}).json()
+    assert body["amount"] == 20.06
+    assert body["vat_amount"] == 3.01
+    assert body["total_amount"] == 23.07
+    assert charged == [2307]
+    
+    listing = client.get("/api/v1/payments/my-payments").json()
+    assert [p["total_amount"] for p in listing] == [23.07]
+
+
+def test_corporate_checkout_requires_role(client: TestClient, learner):
+    """Test students cannot buy at the corporate price"""
+    response = client.post(
+        "/api/v1/payments/corporate-checkout",
+        json={"course_id": 1, "seat_count": 20}
+    )
+    assert response.status_code == 403
+
+
+def test_corporate_checkout_in_one_call(client: TestClient, db):
+    """Test a corporate checkout returns discount, VAT and intent together"""
+    course = Course(title="Course", title_ar="دورة", course_type=CourseType.FUNDAMENTALS,
+                    price_corporate=199.99)
+    db.add(course)
+    db.commit()
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "hr@example.com",
+            "password": "testpass123",
+            "full_name": "HR",
+            "user_type": "corporate",
+            "preferred_language": "ar"
+        }
+    )
+    login = client.post(
+        "/api/v1/auth/login",
+        data={"username": "hr@example.com", "password": "testpass123"}
+    )
+    client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+    
+    response = client.post(
+        "/api/v1/payments/corporate-checkout",
+        json={"course_id": course.id, "seat_count": 20}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["subtotal"] == 3999.8
+    assert body["discount_amount"] == 799.96
+    assert body["vat_amount"] == 479.98
+    assert body["total_amount"] == 3679.82
+    assert body["payment_intent_id"] == f"pi_simulated_payment:{body['payment_id']}"
+    
+    again = client.post(
+        "/api/v1/payments/corporate-checkout",
+        json={"course_id": course.id, "seat_count": 20}
+    )
+    assert again.json()["payment_id"] == body["payment_id"]
+    
+    # The stored payment matches the quote Stripe charges
+    listing = client.get("/api/v1/payments/my-payments").json()
+    assert [p["total_amount"] for p in listing] == [3679.82]
+    
+    missing = client.post(
+        "/api/v1/payments/corporate-checkout",
+        json={"course_id": 999, "seat_count": 20}
+    )
+    assert missing.status_code == 404
+    del client.headers["Authorization"]
@@ -0,0 +1,91 @@
+"""Tests for MASTERLINC's batched forwarding to agents"""
+import json
+import httpx
+import pytest
+
+pytest.importorskip("msgspec")
+
+from agents.masterlinc import main as masterlinc
+from shared.config.settings import settings
+from shared.models.base import AgentType
+
+AGENT = AgentType.CLAIMLINC
+
+
+def _payloads(n):
+    return [{"request_id": f"req-{i}", "agent_type": AGENT.value} for i in range(n)]
+
+
+@pytest.fixture
+def agent_http(monkeypatch):
+    """Forwarding to CLAIMLINC through a mock transport; yields the requests sent"""
+    sent = []
+    replies = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        reply = replies.get(request.url.path)
+        if reply is not None:
+            return reply(request)
+        return httpx.Response(200, json={"request_id": request.headers["X-Request-ID"]})
+
+    monkeypatch.setattr(settings.agents, "masterlinc_forward_requests", True)
+    monkeypatch.setattr(masterlinc, "_batch_agents", {AGENT})
+    monkeypatch.setattr(
+        masterlinc.app.state, "http", httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        raising=False
+    )
+    yield sent, replies
+
+
+@pytest.mark.asyncio
+async def test_batch_posts_payloads_in_body(agent_http):
+    """Test a batch is one POST whose body carries each payload's request ID"""
+    sent, replies = agent_http
+    replies["/batch"] = lambda request: httpx.Response(200, json={"results": [{"n": 0}, {"n": 1}]})
+
+    results = await masterlinc._batched_route(AGENT, _payloads(2))
+
+    assert results == [{"n": 0}, {"n": 1}]
+    assert len(sent) == 1
+    batch = json.loads(sent[0].content)["batch"]
+    assert [p["request_id"] for p in batch] == ["req-0", "req-1"]
+    assert "X-Request-ID" not in sent[0].headers
+
+
+@pytest.mark.asyncio
+async def test_missing_batch_endpoint_falls_back_to_single_calls(agent_http):
+    """Test a 404 from /batch routes the payloads singly from then on"""
+    sent, replies = agent_http
+    replies["/batch"] = lambda request: httpx.Response(404)
+
+    results = await masterlinc._batched_route(AGENT, _payloads(2))
+
+    assert results == [{"request_id": "req-0"}, {"request_id": "req-1"}]
+    assert AGENT not in masterlinc._batch_agents
+    assert [r.url.path for r in sent] == ["/batch", "/", "/"]
+
+    sent.clear()
+    await masterlinc._batched_route(AGENT, _payloads(2))
+    assert [r.url.path for r in sent] == ["/", "/"]
+
+
+@pytest.mark.asyncio
+async def test_unconfigured_agent_is_never_batched(agent_http, monkeypatch):
+    """Test agents not listed in masterlinc_batch_agents skip /batch entirely"""
+    sent, _ = agent_http
+    monkeypatch.setattr(masterlinc, "_batch_agents", set())
+
+    await masterlinc._batched_route(AGENT, _payloads(2))
+
+    assert [r.url.path for r in sent] == ["/", "/"]
+
+
+@pytest.mark.asyncio
+async def test_result_count_mismatch_is_rejected(agent_http):
+    """Test a /batch reply with the wrong number of results fails the batch"""
+    _, replies = agent_http
+    replies["/batch"] = lambda request: httpx.Response(200, json={"results": [{"n": 0}]})
+
+    with pytest.raises(ValueError):
+        await masterlinc._batched_route(AGENT, _payloads(2))
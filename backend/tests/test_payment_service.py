@@ -0,0 +1,82 @@
+"""Tests for the Stripe payment service"""
+import httpx
+import pytest
+from app.config import settings
+from app.services import payment_service
+from app.services.payment_service import PaymentService
+
+
+@pytest.mark.asyncio
+async def test_create_payment_intent_posts_to_stripe(monkeypatch):
+    """Test intents are created over the pooled client in minor units"""
+    requests = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={
+            "id": "pi_123",
+            "client_secret": "pi_123_secret",
+            "status": "requires_payment_method"
+        })
+    
+    client = httpx.AsyncClient(base_url=payment_service.STRIPE_API_BASE, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(settings, "STRIPE_API_KEY", "sk_test")
+    monkeypatch.setattr(payment_service, "_stripe_client", client)
+    
+    intent = await PaymentService.create_payment_intent(11550, metadata={"payment_id": 7})
+    await payment_service.close_stripe_client()
+    
+    assert intent == {
+        "payment_intent_id": "pi_123",
+        "client_secret": "pi_123_secret",
+        "amount": 115.5,
+        "currency": "SAR",
+        "status": "requires_payment_method"
+    }
+    assert requests[0].url.path == "/v1/payment_intents"
+    assert dict(httpx.QueryParams(requests[0].content.decode())) == {
+        "amount": "11550",
+        "currency": "sar",
+        "automatic_payment_methods[enabled]": "true",
+        "metadata[payment_id]": "7"
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_payment_intent_is_idempotent_per_order(monkeypatch):
+    """Test repeat calls for an order send the same Idempotency-Key"""
+    keys = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        keys.append(request.headers.get("Idempotency-Key"))
+        return httpx.Response(200, json={"id": "pi_1", "client_secret": "s", "status": "requires_payment_method"})
+    
+    client = httpx.AsyncClient(base_url=payment_service.STRIPE_API_BASE, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(settings, "STRIPE_API_KEY", "sk_test")
+    monkeypatch.setattr(payment_service, "_stripe_client", client)
+    
+    await PaymentService.create_payment_intent(10000, order_id="order-1")
+    await PaymentService.create_payment_intent(10000, order_id="order-1")
+    await PaymentService.create_payment_intent(10000, order_id="order-2")
+    await PaymentService.create_payment_intent(10000)
+    await payment_service.close_stripe_client()
+    
+    assert keys[0] is not None and keys[0] == keys[1]
+    assert keys[2] not in (None, keys[0])
+    assert keys[3] is None
+
+
+def test_vat_and_discounts_in_minor_units():
+    """Test VAT and corporate discounts round to the halala without floats"""
+    assert PaymentService.calculate_total_with_vat(1999)._asdict() == {
+        "subtotal": 19.99,
+        "vat_rate": 0.15,
+        "vat_amount": 3.0,
+        "total": 22.99,
+        "currency": "SAR"
+    }
+    assert PaymentService.apply_corporate_discount(1999, 50) == 1399
+    assert PaymentService.apply_corporate_discount(1999, 5) == 1999
+    assert [PaymentService.apply_corporate_discount(1000, seats) for seats in (9, 10, 19, 20, 49, 50)] == [
+        1000, 900, 900, 800, 800, 700
+    ]
@@ -0,0 +1,26 @@
+"""Tests for security utilities"""
+from datetime import timedelta
+from app.core.security import create_access_token, decode_token, validate_saudi_national_id
+
+
+def test_validate_saudi_national_id():
+    """Test national ID / Iqama format and check digit"""
+    assert validate_saudi_national_id("1234567897")
+    assert validate_saudi_national_id("2000000006")
+    assert not validate_saudi_national_id("1234567890")  # bad check digit
+    assert not validate_saudi_national_id("3234567897")  # bad prefix
+    assert not validate_saudi_national_id("123456789")
+    assert not validate_saudi_national_id("12345678:7")  # just above '9'
+    assert not validate_saudi_national_id("1/34567897")  # just below '0'
+    assert not validate_saudi_national_id("12345678٩")  # non-ASCII digit
+    assert not validate_saudi_national_id("")
+
+
+def test_decode_token_cache():
+    """Test cached payloads are reused and expired tokens are rejected"""
+    token = create_access_token({"sub": "1"})
+    assert decode_token(token) is decode_token(token)
+    assert decode_token(token + "x") is None
+    
+    expired = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    assert decode_token(expired) is None